@@ -0,0 +1,327 @@
+"""
+The adventure_env module wraps Turtle's Adventure as a reinforcement learning
+environment, following the reset()/step() conventions of Gymnasium without
+depending on it:
+
+    env = TurtleAdventureEnv(level=2)
+    obs, info = env.reset(seed=1)
+    while True:
+        obs, reward, terminated, truncated, info = env.step((700, 250))
+        if terminated or truncated:
+            break
+
+An action is a waypoint target (x, y), or with action="heading", a heading in
+degrees (0 points right, 90 points down) towards which the waypoint is put
+HEADING_REACH pixels ahead of the player; NaN leaves the waypoint as it is.
+
+Observations are NumPy arrays allocated once and refilled in place by every
+step, so copy them to keep them:
+
+    "player"   (3,)                    x, y, heading
+    "home"     (3,)                    x, y, size
+    "enemies"  (kinds, max_enemies, 3) x, y, size of every enemy by kind, in
+                                       ENEMY_KINDS order, zero padded
+    "counts"   (kinds,)                number of live enemies of every kind,
+                                       including those beyond max_enemies
+
+VectorTurtleAdventureEnv steps many games in lock-step, with their enemies in
+one shared enemy_batch.BatchGroup, and fills (num_envs, ...) arrays instead.
+"""
+import math
+from typing import Any, Final, Optional
+from turtle_adventure import (TurtleAdventureGame, ENEMY_KINDS, OUTCOMES, SCREEN_WIDTH,
+                              SCREEN_HEIGHT)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HEADING_REACH: Final = 50
+
+Observation = dict[str, "np.ndarray"]
+
+
+def allocate(max_enemies: int, shape: tuple[int, ...] = ()) -> Observation:
+    """
+    Allocate the arrays of an observation, or of a batch of observations with
+    the given leading shape
+    """
+    if np is None:
+        raise RuntimeError("the environment requires numpy")
+    return {
+        "player": np.zeros(shape + (3,), dtype=np.float32),
+        "home": np.zeros(shape + (3,), dtype=np.float32),
+        "enemies": np.zeros(shape + (len(ENEMY_KINDS), max_enemies, 3), dtype=np.float32),
+        "counts": np.zeros(shape + (len(ENEMY_KINDS),), dtype=np.int32),
+    }
+
+
+def observe(game: TurtleAdventureGame, obs: Observation) -> None:
+    """
+    Fill the observation arrays with the game's current state
+    """
+    player, home = game.player, game.home
+    obs["player"][:] = (player.x, player.y, player.heading)
+    obs["home"][:] = (home.x, home.y, home.size)
+    enemies, counts = obs["enemies"], obs["counts"]
+    capacity = enemies.shape[1]
+    manager = game.enemy_batches
+    if manager is None:
+        enemies.fill(0)
+        counts.fill(0)
+        for enemy in game.enemies:
+            if type(enemy) not in ENEMY_KINDS:
+                continue
+            kind = ENEMY_KINDS.index(type(enemy))
+            index = counts[kind]
+            if index < capacity:
+                enemies[kind, index] = (enemy.x, enemy.y, enemy.size)
+            counts[kind] = index + 1
+        return
+    for kind, enemy_class in enumerate(ENEMY_KINDS):
+        batch = manager.batches[enemy_class]
+        xs, ys, sizes = batch.array("x"), batch.array("y"), batch.array("size")
+        if manager.is_shared:
+            mine = batch.array("lane") == manager.lane
+            xs, ys, sizes = xs[mine], ys[mine], sizes[mine]
+        count = len(xs)
+        shown = min(count, capacity)
+        counts[kind] = count
+        rows = enemies[kind]
+        rows[:shown, 0] = xs[:shown]
+        rows[:shown, 1] = ys[:shown]
+        rows[:shown, 2] = sizes[:shown]
+        rows[shown:] = 0
+
+
+def act(game: TurtleAdventureGame, action: Any, heading: bool) -> None:
+    """
+    Move the game's waypoint as the action asks
+    """
+    if heading:
+        angle = float(action)
+        if math.isnan(angle):
+            return
+        player = game.player
+        x = player.x + HEADING_REACH * math.cos(math.radians(angle))
+        y = player.y + HEADING_REACH * math.sin(math.radians(angle))
+    else:
+        x, y = float(action[0]), float(action[1])
+        if math.isnan(x) or math.isnan(y):
+            return
+    game.click(min(max(x, 0), game.screen_width - 1),
+               min(max(y, 0), game.screen_height - 1))
+
+
+class TurtleAdventureEnv:
+    """
+    A single headless game as an environment.  Every step applies the action
+    and runs frame_skip simulation steps; the reward is step_reward per
+    simulation step survived, plus win_reward or lose_reward when the game
+    ends.  An episode is truncated after max_ticks simulation steps.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, level: int = 1, stage: str = "default", batched: bool = False,
+                 action: str = "waypoint", frame_skip: int = 1, max_ticks: int = 3000,
+                 max_enemies: int = 64, step_reward: float = 0.0,
+                 win_reward: float = 1.0, lose_reward: float = -1.0):
+        if action not in ("waypoint", "heading"):
+            raise ValueError(f"unknown action kind: {action}")
+        self.level: int = level
+        self.stage: str = stage
+        self.batched: bool = batched
+        self.heading_actions: bool = action == "heading"
+        self.frame_skip: int = frame_skip
+        self.max_ticks: int = max_ticks
+        self.step_reward: float = step_reward
+        self.win_reward: float = win_reward
+        self.lose_reward: float = lose_reward
+        self.__obs: Observation = allocate(max_enemies)
+        self.__game: Optional[TurtleAdventureGame] = None
+
+    @property
+    def game(self) -> Optional[TurtleAdventureGame]:
+        """
+        Get the game of the current episode
+        """
+        return self.__game
+
+    @property
+    def observation(self) -> Observation:
+        """
+        Get the observation arrays, refilled by every reset() and step()
+        """
+        return self.__obs
+
+    def reset(self, seed: Optional[int] = None) -> tuple[Observation, dict]:
+        """
+        Start a new episode, and return its first observation and an info
+        dict
+        """
+        self.__game = TurtleAdventureGame(None, SCREEN_WIDTH, SCREEN_HEIGHT,
+                                          level=self.level, batched=self.batched,
+                                          seed=seed, stage=self.stage)
+        self.__game.start()
+        observe(self.__game, self.__obs)
+        return self.__obs, {"ticks": 0, "outcome": None}
+
+    def step(self, action: Any) -> tuple[Observation, float, bool, bool, dict]:
+        """
+        Apply the action and advance the game, and return the observation,
+        the reward, whether the game ended, whether the episode was cut short
+        and an info dict
+        """
+        game = self.__game
+        if game is None or not game.is_started:
+            raise RuntimeError("step() called without a running episode; call reset()")
+        act(game, action, self.heading_actions)
+        reward = 0.0
+        for _ in range(self.frame_skip):
+            game.step()
+            reward += self.step_reward
+            if not game.is_started:
+                break
+        terminated = game.outcome is not None
+        truncated = not terminated and game.ticks >= self.max_ticks
+        if game.outcome == "win":
+            reward += self.win_reward
+        elif game.outcome == "lose":
+            reward += self.lose_reward
+        if truncated:
+            game.stop()
+        observe(game, self.__obs)
+        return self.__obs, reward, terminated, truncated, {"ticks": game.ticks,
+                                                           "outcome": game.outcome}
+
+
+class VectorTurtleAdventureEnv:
+    """
+    Many games stepped in lock-step as one environment.  step() takes one
+    action per game, e.g., an (num_envs, 2) array of waypoints, and returns
+    preallocated (num_envs, ...) arrays.  A game whose episode ends is reset
+    right away, so the observation of a finished game is the first one of
+    its next episode; with a seed given to reset(), the next episodes get the
+    following seeds.  The info dict holds the ticks and outcome codes (see
+    OUTCOMES) of the step's episodes.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, num_envs: int, level: int = 1, stage: str = "default",
+                 batched: bool = True, action: str = "waypoint", frame_skip: int = 1,
+                 max_ticks: int = 3000, max_enemies: int = 64, step_reward: float = 0.0,
+                 win_reward: float = 1.0, lose_reward: float = -1.0):
+        if action not in ("waypoint", "heading"):
+            raise ValueError(f"unknown action kind: {action}")
+        self.num_envs: int = num_envs
+        self.level: int = level
+        self.stage: str = stage
+        self.heading_actions: bool = action == "heading"
+        self.frame_skip: int = frame_skip
+        self.max_ticks: int = max_ticks
+        self.step_reward: float = step_reward
+        self.win_reward: float = win_reward
+        self.lose_reward: float = lose_reward
+        self.__obs: Observation = allocate(max_enemies, (num_envs,))
+        # every game fills its row of the batch arrays directly
+        self.__rows: list[Observation] = [{name: array[index]
+                                           for name, array in self.__obs.items()}
+                                          for index in range(num_envs)]
+        self.__rewards = np.zeros(num_envs, dtype=np.float32)
+        self.__terminated = np.zeros(num_envs, dtype=bool)
+        self.__truncated = np.zeros(num_envs, dtype=bool)
+        self.__info: dict[str, "np.ndarray"] = {
+            "ticks": np.zeros(num_envs, dtype=np.int64),
+            "outcome": np.zeros(num_envs, dtype=np.int8),
+        }
+        self.__group = None
+        if batched:
+            # pylint: disable=import-outside-toplevel
+            from enemy_batch import BatchGroup, EnemyBatchManager
+            self.__group = BatchGroup(EnemyBatchManager.batch_classes)
+        self.__games: list[Optional[TurtleAdventureGame]] = [None] * num_envs
+        self.__next_seed: Optional[int] = None
+
+    @property
+    def games(self) -> list[Optional[TurtleAdventureGame]]:
+        """
+        Get the game of every environment
+        """
+        return self.__games
+
+    def __start(self, index: int, seed: Optional[int]) -> None:
+        """
+        Replace an environment's game with a new one
+        """
+        old = self.__games[index]
+        if old is not None:
+            old.stop()
+            if self.__group is not None:
+                old.enemy_batches.leave()
+        game = TurtleAdventureGame(None, SCREEN_WIDTH, SCREEN_HEIGHT, level=self.level,
+                                   seed=seed, stage=self.stage,
+                                   batch_group=self.__group)
+        game.start()
+        self.__games[index] = game
+        observe(game, self.__rows[index])
+
+    def __seed(self) -> Optional[int]:
+        """
+        Get the seed of the next episode
+        """
+        seed = self.__next_seed
+        if seed is not None:
+            self.__next_seed = seed + 1
+        return seed
+
+    def reset(self, seed: Optional[int] = None) -> tuple[Observation, dict]:
+        """
+        Start a new episode in every environment, the i-th one with seed + i
+        """
+        self.__next_seed = seed
+        for index in range(self.num_envs):
+            self.__start(index, self.__seed())
+        self.__info["ticks"].fill(0)
+        self.__info["outcome"].fill(0)
+        return self.__obs, self.__info
+
+    def step(self, actions: Any) -> tuple[Observation, "np.ndarray", "np.ndarray",
+                                          "np.ndarray", dict]:
+        """
+        Apply one action per environment and advance all games, and return
+        the observations, rewards, terminated and truncated flags and info
+        """
+        games = self.__games
+        if games[0] is None:
+            raise RuntimeError("step() called before reset()")
+        rewards = self.__rewards
+        rewards.fill(0)
+        for game, action in zip(games, actions):
+            act(game, action, self.heading_actions)
+        for _ in range(self.frame_skip):
+            for index, game in enumerate(games):
+                if game.is_started:
+                    game.step()
+                    rewards[index] += self.step_reward
+            # the shared batches step the enemies of every environment at once
+            if self.__group is not None:
+                self.__group.step()
+
+        ticks, outcomes = self.__info["ticks"], self.__info["outcome"]
+        for index, game in enumerate(games):
+            terminated = game.outcome is not None
+            truncated = not terminated and game.ticks >= self.max_ticks
+            self.__terminated[index] = terminated
+            self.__truncated[index] = truncated
+            ticks[index] = game.ticks
+            outcomes[index] = OUTCOMES.index(game.outcome)
+            if game.outcome == "win":
+                rewards[index] += self.win_reward
+            elif game.outcome == "lose":
+                rewards[index] += self.lose_reward
+            if terminated or truncated:
+                self.__start(index, self.__seed())
+            else:
+                observe(game, self.__rows[index])
+        return self.__obs, rewards, self.__terminated, self.__truncated, self.__info
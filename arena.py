@@ -0,0 +1,322 @@
+"""
+The arena module hosts many headless Turtle's Adventure games in a single
+process, e.g., for bot tournaments.  The games, one per lane, are stepped in
+lock-step by one loop, and the enemies of all of them live in one shared
+enemy_batch.BatchGroup, so that every simulation step moves the enemies of
+every game in a single vectorized pass per enemy kind.  Every lane is driven
+by a queue of waypoint clicks, and the arena reports its aggregate throughput
+in game ticks per second.
+
+Without --serve, the arena benchmarks itself with random clicks queued for
+every lane.  With --serve, it is driven through stdin and stdout, one JSON
+object per line:
+
+    {"cmd": "click", "lane": 0, "x": 120, "y": 300}      queue a click; an
+                                                         optional "tick" holds
+                                                         it until that step,
+                                                         and "append": true
+                                                         queues the waypoint
+                                                         after the others
+    {"cmd": "step", "ticks": 10}                         step all lanes, reply
+                                                         with their state
+    {"cmd": "reset", "lane": 0, "seed": 5}               start a new game
+    {"cmd": "stats"}                                     reply with throughput
+    {"cmd": "quit"}
+
+Usage:
+    python arena.py [--games 64] [--ticks 1000] [--level 2] [--stage STAGE]
+                    [--seed 0] [--restart] [--serve]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import deque
+from typing import Optional, TextIO
+from turtle_adventure import TurtleAdventureGame, SCREEN_WIDTH, SCREEN_HEIGHT
+from enemy_batch import BatchGroup, EnemyBatchManager
+
+
+class Lane:
+    """
+    One game of an arena, with the queue of (tick, x, y, append) clicks
+    driving it; a click with a tick of None is applied at the next step
+    """
+
+    __slots__ = ("index", "game", "inputs", "result")
+
+    def __init__(self, index: int, game: TurtleAdventureGame):
+        self.index: int = index
+        self.game: TurtleAdventureGame = game
+        self.inputs: deque[tuple[Optional[int], float, float, bool]] = deque()
+        self.result: Optional[dict] = None
+
+    def feed(self) -> None:
+        """
+        Apply the queued clicks that are due at the game's current step
+        """
+        inputs, game = self.inputs, self.game
+        while inputs and (inputs[0][0] is None or inputs[0][0] <= game.ticks):
+            _, x, y, append = inputs.popleft()
+            game.click(x, y, append)
+
+    def state(self) -> dict:
+        """
+        Describe the lane's game, e.g., for a client of the arena
+        """
+        game = self.game
+        return {
+            "lane": self.index,
+            "seed": game.seed,
+            "ticks": game.ticks,
+            "outcome": game.outcome,
+            "player": [game.player.x, game.player.y],
+            "home": [game.home.x, game.home.y],
+            "enemies": len(game.enemies),
+            "queued": len(self.inputs),
+        }
+
+
+class Arena:
+    """
+    Step many headless games in lock-step, sharing one group of enemy
+    batches.  A game that ends keeps its lane until reset(), unless the arena
+    restarts finished games with the next seed by itself.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, games: int, level: int = 1, stage: str = "default",
+                 seed: int = 0, restart: bool = False):
+        self.__level: int = level
+        self.__stage: str = stage
+        self.__restart: bool = restart
+        self.__next_seed: int = seed
+        self.__group = BatchGroup(EnemyBatchManager.batch_classes)
+        self.__lanes: list[Lane] = []
+        self.__results: list[dict] = []
+        self.__ticks: int = 0
+        self.__game_ticks: int = 0
+        self.__seconds: float = 0
+        for index in range(games):
+            self.__lanes.append(Lane(index, self.__new_game(None)))
+
+    @property
+    def lanes(self) -> list[Lane]:
+        """
+        Get the lanes of the arena
+        """
+        return self.__lanes
+
+    @property
+    def results(self) -> list[dict]:
+        """
+        Get the results of the games that ended, in the order they ended
+        """
+        return self.__results
+
+    @property
+    def ticks(self) -> int:
+        """
+        Get the number of lock-step ticks run so far
+        """
+        return self.__ticks
+
+    @property
+    def game_ticks(self) -> int:
+        """
+        Get the number of simulation steps run so far over all games
+        """
+        return self.__game_ticks
+
+    @property
+    def ticks_per_second(self) -> float:
+        """
+        Get the aggregate throughput in simulation steps per second
+        """
+        return self.__game_ticks / self.__seconds if self.__seconds else 0.0
+
+    @property
+    def running(self) -> int:
+        """
+        Get the number of games still running
+        """
+        return sum(lane.game.is_started for lane in self.__lanes)
+
+    def __new_game(self, seed: Optional[int]) -> TurtleAdventureGame:
+        """
+        Create and start a game in the shared batch group
+        """
+        if seed is None:
+            seed, self.__next_seed = self.__next_seed, self.__next_seed + 1
+        game = TurtleAdventureGame(None, SCREEN_WIDTH, SCREEN_HEIGHT, level=self.__level,
+                                   seed=seed, stage=self.__stage,
+                                   batch_group=self.__group)
+        game.start()
+        return game
+
+    # pylint: disable=too-many-arguments
+    def submit(self, lane: int, x: float, y: float, tick: Optional[int] = None,
+               append: bool = False) -> None:
+        """
+        Queue a waypoint click for a lane's game, to be applied at the given
+        step of the game or at its next one
+        """
+        self.__lanes[lane].inputs.append((tick, x, y, append))
+
+    def reset(self, lane: int, seed: Optional[int] = None) -> None:
+        """
+        Replace a lane's game with a new one, dropping its queued clicks
+        """
+        entry = self.__lanes[lane]
+        entry.game.stop()
+        if entry.result is None:
+            entry.game.enemy_batches.leave()
+        entry.game = self.__new_game(seed)
+        entry.inputs.clear()
+        entry.result = None
+
+    def __finish(self, lane: Lane) -> None:
+        """
+        Record the result of a game that ended and release its enemies
+        """
+        game = lane.game
+        lane.result = {
+            "lane": lane.index,
+            "level": game.level,
+            "seed": game.seed,
+            "outcome": game.outcome or "stopped",
+            "ticks": game.ticks,
+            "seconds": game.clock / 1000,
+            "second_phase": game.home.second_phase,
+        }
+        self.__results.append(lane.result)
+        game.enemy_batches.leave()
+        if self.__restart:
+            self.reset(lane.index)
+
+    def step(self) -> int:
+        """
+        Advance every running game by one simulation step, and return the
+        number of games stepped
+        """
+        start = time.perf_counter()
+        stepped = 0
+        for lane in self.__lanes:
+            if lane.game.is_started:
+                lane.feed()
+                lane.game.step()
+                stepped += 1
+        # the enemies of all games move together, once every game is updated
+        self.__group.step()
+        for lane in self.__lanes:
+            if lane.result is None and not lane.game.is_started:
+                self.__finish(lane)
+        self.__ticks += 1
+        self.__game_ticks += stepped
+        self.__seconds += time.perf_counter() - start
+        return stepped
+
+    def run(self, max_ticks: int) -> int:
+        """
+        Step the games until none is running or max_ticks lock-step ticks
+        have run, and return the number of ticks run
+        """
+        for tick in range(max_ticks):
+            if not self.step():
+                return tick
+        return max_ticks
+
+
+def serve(arena: Arena, infile: TextIO, outfile: TextIO) -> None:
+    """
+    Drive the arena with the JSON lines protocol until "quit" or the end of
+    the input
+    """
+    for line in infile:
+        if not line.strip():
+            continue
+        try:
+            command = json.loads(line)
+            name = command["cmd"]
+            reply: Optional[dict] = None
+            if name == "click":
+                arena.submit(command["lane"], command["x"], command["y"],
+                             command.get("tick"), command.get("append", False))
+            elif name == "step":
+                arena.run(command.get("ticks", 1))
+                reply = {"ticks": arena.ticks,
+                         "lanes": [lane.state() for lane in arena.lanes]}
+            elif name == "reset":
+                arena.reset(command["lane"], command.get("seed"))
+                reply = arena.lanes[command["lane"]].state()
+            elif name == "stats":
+                reply = {"ticks": arena.ticks, "game_ticks": arena.game_ticks,
+                         "ticks_per_second": arena.ticks_per_second,
+                         "running": arena.running, "finished": len(arena.results)}
+            elif name == "quit":
+                return
+            else:
+                reply = {"error": f"unknown command: {name}"}
+        except (ValueError, KeyError, IndexError, TypeError) as error:
+            reply = {"error": str(error)}
+        if reply is not None:
+            outfile.write(json.dumps(reply) + "\n")
+            outfile.flush()
+
+
+def benchmark(arena: Arena, max_ticks: int, seed: int) -> None:
+    """
+    Step the arena with a random click queued for every lane once a second
+    of game time, reporting the throughput as it goes
+    """
+    rng = random.Random(seed)
+    reported = time.perf_counter()
+    for tick in range(max_ticks):
+        if tick % 30 == 0:
+            for lane in arena.lanes:
+                arena.submit(lane.index, rng.randint(0, SCREEN_WIDTH - 1),
+                             rng.randint(0, SCREEN_HEIGHT - 1))
+        if not arena.step():
+            break
+        if time.perf_counter() - reported >= 1:
+            reported = time.perf_counter()
+            print(f"tick {arena.ticks:6}  running {arena.running:5}  "
+                  f"{arena.ticks_per_second:10.0f} game ticks/s", file=sys.stderr)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run the arena from the command line, and return the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--games", type=int, default=64, help="games to host")
+    parser.add_argument("--ticks", type=int, default=1000,
+                        help="lock-step ticks to run when benchmarking")
+    parser.add_argument("--level", type=int, default=2)
+    parser.add_argument("--stage", default="default",
+                        help="stage name in the levels directory, or a stage file")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--restart", action="store_true",
+                        help="start a new game with the next seed when one ends")
+    parser.add_argument("--serve", action="store_true",
+                        help="read commands from stdin and reply on stdout")
+    args = parser.parse_args(argv)
+
+    arena = Arena(args.games, level=args.level, stage=args.stage, seed=args.seed,
+                  restart=args.restart)
+    if args.serve:
+        serve(arena, sys.stdin, sys.stdout)
+        return 0
+
+    benchmark(arena, args.ticks, args.seed)
+    outcomes: dict[str, int] = {}
+    for result in arena.results:
+        outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+    print(f"games {args.games}  ticks {arena.ticks}  game ticks {arena.game_ticks}  "
+          f"{arena.ticks_per_second:.0f} game ticks/s  finished {outcomes}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+The async_runner module drives a gamelib Game from an asyncio event loop
+instead of Tk's mainloop, so the game can run next to other asynchronous work,
+e.g., a telemetry exporter, a bot controller or a remote input feed, without
+threads.  The runner steps the simulation on a monotonic schedule, pumps Tk
+events between steps when the game has a window, and publishes a snapshot of
+every frame to any number of async consumers:
+
+    runner = AsyncRunner(game, capture=snapshot.snapshot)
+
+    async def telemetry():
+        async for frame in runner.frames():
+            print(frame.ticks, frame.lag)
+
+    async def main():
+        asyncio.create_task(telemetry())
+        await runner.run()
+
+Other tasks run between frames, so they may call the game's methods, e.g.,
+click(), directly.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Callable, Optional
+from gamelib import Game
+
+
+class FrameSnapshot:
+    """
+    The state of the game after a rendered frame: its simulation step and
+    clock, the monotonic time the frame was produced at, how many seconds
+    the frame ran behind its schedule, and whatever the runner's capture
+    function returned for the frame
+    """
+
+    __slots__ = ("ticks", "clock", "time", "lag", "state")
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, ticks: int, clock: int, time: float, lag: float, state: Any):
+        self.ticks: int = ticks
+        self.clock: int = clock
+        self.time: float = time
+        self.lag: float = lag
+        self.state: Any = state
+
+
+class FrameStream:
+    """
+    An async iterator over the frames published by an AsyncRunner.  A
+    consumer that falls behind loses its oldest frames, so it never holds
+    back the game loop.
+    """
+
+    def __init__(self, runner: "AsyncRunner", max_pending: int):
+        self.__runner: AsyncRunner = runner
+        self.__frames: deque[FrameSnapshot] = deque(maxlen=max_pending)
+        self.__ready = asyncio.Event()
+        self.__closed: bool = False
+
+    def push(self, frame: FrameSnapshot) -> None:
+        """
+        Queue a frame for the consumer
+        """
+        self.__frames.append(frame)
+        self.__ready.set()
+
+    def close(self) -> None:
+        """
+        End the iteration once the queued frames have been consumed
+        """
+        self.__closed = True
+        self.__ready.set()
+
+    def __aiter__(self) -> "FrameStream":
+        return self
+
+    async def __anext__(self) -> FrameSnapshot:
+        while not self.__frames:
+            if self.__closed:
+                self.__runner.unsubscribe(self)
+                raise StopAsyncIteration
+            self.__ready.clear()
+            await self.__ready.wait()
+        return self.__frames.popleft()
+
+
+class AsyncRunner:
+    """
+    Run a game as an asyncio task.  A simulation step is due every
+    game.update_delay milliseconds of the monotonic clock; when the loop falls
+    behind, it runs up to max_updates_per_tick steps before rendering once,
+    then drops the rest of the backlog.  With realtime=False, a headless game
+    is stepped as fast as possible, yielding to other tasks after every step.
+    """
+
+    def __init__(self, game: Game, max_updates_per_tick: int = 5,
+                 realtime: bool = True,
+                 capture: Optional[Callable[[Game], Any]] = None):
+        self.__game: Game = game
+        self.__period: float = game.update_delay / 1000
+        self.__max_updates_per_tick: int = max_updates_per_tick
+        self.__realtime: bool = realtime or not game.is_headless
+        self.__capture: Optional[Callable[[Game], Any]] = capture
+        self.__streams: list[FrameStream] = []
+        self.__running: bool = False
+
+    @property
+    def game(self) -> Game:
+        """
+        Get the game driven by this runner
+        """
+        return self.__game
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Get the flag indicating whether run() is in progress
+        """
+        return self.__running
+
+    def frames(self, max_pending: int = 64) -> FrameStream:
+        """
+        Subscribe to the frames of the game; the returned stream ends when
+        the runner stops
+        """
+        stream = FrameStream(self, max_pending)
+        self.__streams.append(stream)
+        return stream
+
+    def unsubscribe(self, stream: FrameStream) -> None:
+        """
+        Stop publishing frames to a stream
+        """
+        if stream in self.__streams:
+            self.__streams.remove(stream)
+
+    def stop(self) -> None:
+        """
+        Stop the game and make run() return after the current frame
+        """
+        self.__running = False
+        self.__game.stop()
+
+    def __publish(self, now: float, lag: float) -> None:
+        """
+        Send a snapshot of the current frame to every consumer
+        """
+        if not self.__streams:
+            return
+        game = self.__game
+        state = self.__capture(game) if self.__capture is not None else None
+        frame = FrameSnapshot(game.ticks, game.clock, now, lag, state)
+        for stream in self.__streams:
+            stream.push(frame)
+
+    def __pump_events(self) -> bool:
+        """
+        Process the pending Tk events of the game's window, and return False
+        if the window has been closed
+        """
+        if self.__game.is_headless:
+            return True
+        # pylint: disable=import-outside-toplevel
+        import tkinter as tk
+        try:
+            self.__game.frame.update()
+        except tk.TclError:
+            return False
+        return True
+
+    async def run(self, max_ticks: Optional[int] = None) -> int:
+        """
+        Step the game until it stops, stop() is called or max_ticks
+        simulation steps have run, and return the number of steps run.  Like
+        Tk's mainloop, a game that ends by itself keeps its window, showing
+        the final frame, until the window is closed or stop() is called.
+        """
+        game = self.__game
+        loop = asyncio.get_running_loop()
+        render = not game.is_headless
+        period = self.__period
+        start_ticks = game.ticks
+        game.start(animate=False)
+        self.__running = True
+        deadline = loop.time()
+        closed = False
+        try:
+            while self.__running and game.is_started and (
+                    max_ticks is None or game.ticks - start_ticks < max_ticks):
+                if not self.__realtime:
+                    game.step()
+                    self.__publish(loop.time(), 0.0)
+                    await asyncio.sleep(0)
+                    continue
+
+                now = loop.time()
+                lag = now - deadline
+                updates = 0
+                while (now >= deadline and updates < self.__max_updates_per_tick
+                       and game.is_started
+                       and (max_ticks is None or game.ticks - start_ticks < max_ticks)):
+                    game.step()
+                    deadline += period
+                    updates += 1
+                if now >= deadline:
+                    # too far behind to catch up; drop the backlog
+                    deadline = now + period
+                if updates:
+                    if render:
+                        game.render()
+                    self.__publish(now, max(lag, 0.0))
+                if not self.__pump_events():
+                    closed = True
+                    break
+                await asyncio.sleep(max(deadline - loop.time(), 0))
+            if render and not closed and not game.is_started:
+                # no more frames come, but the window stays open with the
+                # final one until the user closes it
+                for stream in self.__streams:
+                    stream.close()
+                while self.__running and self.__pump_events():
+                    await asyncio.sleep(period)
+        finally:
+            self.__running = False
+            game.stop()
+            for stream in self.__streams:
+                stream.close()
+        return game.ticks - start_ticks
@@ -0,0 +1,192 @@
+"""
+The batch_runner module runs many headless Turtle's Adventure games in
+parallel, one process per CPU core, to measure win and lose rates and
+survival time across seeds and levels.  Every run is played by a player
+policy, results are streamed back as runs finish and aggregated on the fly,
+so memory use does not grow with the number of runs.
+
+Usage:
+    python batch_runner.py [--levels 1,2,3] [--policies random,home]
+                           [--stage STAGE] [--runs 100] [--workers N] [--output runs.jsonl]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Final, Iterable, Iterator, Optional
+from turtle_adventure import TurtleAdventureGame, SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+def idle_policy(game: TurtleAdventureGame, rng: random.Random) -> None:
+    """A player that never moves"""
+
+
+def random_policy(game: TurtleAdventureGame, rng: random.Random) -> None:
+    """A player that clicks a random point of the playfield every second"""
+    if game.ticks % 30 == 0:
+        game.click(rng.randint(0, game.screen_width - 1),
+                   rng.randint(0, game.screen_height - 1))
+
+
+def home_policy(game: TurtleAdventureGame, rng: random.Random) -> None:
+    """A player that keeps walking straight to home"""
+    if game.ticks % 15 == 0:
+        game.click(game.home.x, game.home.y)
+
+
+POLICIES: Final[dict[str, Callable[[TurtleAdventureGame, random.Random], None]]] = {
+    "idle": idle_policy,
+    "random": random_policy,
+    "home": home_policy,
+}
+
+
+# pylint: disable=too-many-arguments
+def simulate(level: int, policy: str, seed: int, max_ticks: int,
+             batched: bool = False, stage: str = "default") -> dict:
+    """
+    Play one headless game and describe how it ended
+    """
+    game = TurtleAdventureGame(None, SCREEN_WIDTH, SCREEN_HEIGHT, level=level,
+                               batched=batched, seed=seed, stage=stage)
+    play = POLICIES[policy]
+    rng = random.Random(seed)
+    game.start()
+    while game.is_started and game.ticks < max_ticks:
+        play(game, rng)
+        game.step()
+    return {
+        "level": level,
+        "policy": policy,
+        "seed": seed,
+        "outcome": game.outcome or "timeout",
+        "ticks": game.ticks,
+        "seconds": game.clock / 1000,
+        "second_phase": game.home.second_phase,
+    }
+
+
+def simulate_chunk(level: int, policy: str, seeds: range, max_ticks: int,
+                   batched: bool, stage: str) -> list[dict]:
+    """
+    Play one game per seed; running several games per task keeps the
+    inter-process overhead small next to the simulation work
+    """
+    return [simulate(level, policy, seed, max_ticks, batched, stage) for seed in seeds]
+
+
+def run_parallel(tasks: Iterable[tuple], workers: int) -> Iterator[dict]:
+    """
+    Run simulate_chunk() for every task on a pool of worker processes, and
+    yield the results as soon as they arrive.  Only a few tasks per worker
+    are in flight at a time.
+    """
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running: set[Future] = set()
+        while True:
+            for task in tasks:
+                running.add(executor.submit(simulate_chunk, *task))
+                if len(running) >= workers * 2:
+                    break
+            if not running:
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+class Summary:
+    """
+    Aggregate run results per level and policy, keeping only counters
+    """
+
+    def __init__(self):
+        self.__rows: dict[tuple[int, str], dict] = {}
+
+    def add(self, result: dict) -> None:
+        """
+        Count a single run result
+        """
+        row = self.__rows.setdefault((result["level"], result["policy"]), {
+            "runs": 0, "win": 0, "lose": 0, "timeout": 0,
+            "seconds": 0.0, "longest": 0.0, "second_phase": 0,
+        })
+        row["runs"] += 1
+        row[result["outcome"]] += 1
+        row["seconds"] += result["seconds"]
+        row["longest"] = max(row["longest"], result["seconds"])
+        row["second_phase"] += result["second_phase"]
+
+    def table(self) -> str:
+        """
+        Format the aggregated results as a text table
+        """
+        lines = [f"{'level':>5} {'policy':>8} {'runs':>6} {'win%':>6} {'lose%':>6} "
+                 f"{'timeout%':>8} {'phase2%':>7} {'mean s':>7} {'max s':>7}"]
+        for (level, policy), row in sorted(self.__rows.items()):
+            runs = row["runs"]
+            lines.append(
+                f"{level:>5} {policy:>8} {runs:>6} "
+                f"{100 * row['win'] / runs:>6.1f} {100 * row['lose'] / runs:>6.1f} "
+                f"{100 * row['timeout'] / runs:>8.1f} "
+                f"{100 * row['second_phase'] / runs:>7.1f} "
+                f"{row['seconds'] / runs:>7.2f} {row['longest']:>7.2f}")
+        return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run the batch simulation from the command line, and return the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--levels", default="1,2,3",
+                        help="comma separated levels to simulate")
+    parser.add_argument("--policies", default=",".join(POLICIES),
+                        help="comma separated player policies: " + ", ".join(POLICIES))
+    parser.add_argument("--stage", default="default",
+                        help="stage name in the levels directory, or a stage file")
+    parser.add_argument("--runs", type=int, default=100,
+                        help="runs per level and policy")
+    parser.add_argument("--max-ticks", type=int, default=3000,
+                        help="ticks after which a run counts as a timeout")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run")
+    parser.add_argument("--chunk", type=int, default=10, help="runs per task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per CPU core)")
+    parser.add_argument("--batched", action="store_true",
+                        help="use the NumPy enemy engine")
+    parser.add_argument("--output", help="append every run result to this JSON lines file")
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.levels.split(",")]
+    policies = args.policies.split(",")
+    for policy in policies:
+        if policy not in POLICIES:
+            parser.error(f"unknown policy: {policy}")
+    tasks = (
+        (level, policy, range(start, min(start + args.chunk, args.seed + args.runs)),
+         args.max_ticks, args.batched, args.stage)
+        for level in levels
+        for policy in policies
+        for start in range(args.seed, args.seed + args.runs, args.chunk)
+    )
+
+    summary = Summary()
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+    try:
+        for result in run_parallel(tasks, args.workers):
+            summary.add(result)
+            if output is not None:
+                output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not None:
+            output.close()
+    print(summary.table())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+The benchmark module measures how the Turtle's Adventure game scales with
+the number of enemies.  It builds games at every level and synthetic games
+holding 10 to 10,000 enemies of a single kind, times the update, render and
+collision phases of every tick, measures the memory held per enemy, and
+writes the results to a JSON file that can be compared against a saved
+baseline to catch regressions.  With --batched, batched enemies are tested
+against the player while the batches update, so their hit test is reported
+as the batch_hits phase, which is also included in the update phase.
+
+Usage:
+    python benchmark.py [--modes headless,tk] [--output results.json]
+                        [--baseline baseline.json] [--tolerance 0.2]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import zlib
+from typing import Callable, Final, Optional
+from turtle_adventure import (TurtleAdventureGame, Enemy, RandomWalkEnemy,
+                              ChasingEnemy, FencingEnemy, StalkerEnemy, SCREEN_WIDTH,
+                              SCREEN_HEIGHT)
+
+LEVELS: Final = tuple(range(1, 51))
+LOADS: Final = (10, 100, 1000, 10000)
+QUICK_LEVELS: Final = (1, 10, 50)
+QUICK_LOADS: Final = (10, 100, 1000)
+PHASES: Final = {"update": "update", "render": "render",
+                 "collision": "post_update", "batch_hits": "batch_hits",
+                 "frame": "frame"}
+
+# absolute slowdown (in seconds) below which a difference is treated as noise
+NOISE_FLOOR: Final = 50e-6
+
+
+class BenchmarkGame(TurtleAdventureGame):
+    """
+    A TurtleAdventureGame that never ends, so that every benchmark case runs
+    for the same number of ticks
+    """
+
+    def on_collision(self, enemy: Enemy) -> None:
+        pass
+
+    def game_over_win(self) -> None:
+        pass
+
+
+def random_walk(game: TurtleAdventureGame) -> Enemy:
+    """Create a random walking enemy somewhere on the playfield"""
+    rng = game.rng
+    enemy = RandomWalkEnemy(game, rng.randint(15, 20), "#19376D")
+    enemy.x, enemy.y = rng.randint(10, 790), rng.randint(10, 490)
+    return enemy
+
+
+def chasing(game: TurtleAdventureGame) -> Enemy:
+    """Create a chasing enemy somewhere on the playfield"""
+    rng = game.rng
+    enemy = ChasingEnemy(game, 20, "red")
+    enemy.x, enemy.y = rng.randint(10, 790), rng.randint(10, 490)
+    return enemy
+
+
+def stalker(game: TurtleAdventureGame) -> Enemy:
+    """Create a stalker enemy with a random teleport timer"""
+    rng = game.rng
+    enemy = StalkerEnemy(game, 20, "purple", rng.randrange(45, 85, 15))
+    enemy.x, enemy.y = rng.randint(10, 790), rng.randint(10, 490)
+    return enemy
+
+
+def fencing(game: TurtleAdventureGame) -> Enemy:
+    """Create a fencing enemy somewhere on the square around home"""
+    rng = game.rng
+    enemy = FencingEnemy(game, 20, "blue")
+    enemy.x = game.home.x + rng.randint(-50, 50)
+    enemy.y = game.home.y + rng.choice((-50, 50))
+    return enemy
+
+
+KINDS: Final[dict[str, Callable[[TurtleAdventureGame], Enemy]]] = {
+    "random_walk": random_walk,
+    "chasing": chasing,
+    "stalker": stalker,
+    "fencing": fencing,
+}
+
+
+def warm_up(game: TurtleAdventureGame, root) -> None:
+    """
+    Step the game until the enemy generator has spawned its enemies
+    """
+    while not game.enemies:
+        game.step()
+        if root is not None:
+            root.update()
+
+
+def build_level(root, level: int, batched: bool, seed: int) -> BenchmarkGame:
+    """
+    Build a game at the given level, with the enemies it normally spawns
+    """
+    game = BenchmarkGame(root, SCREEN_WIDTH, SCREEN_HEIGHT, level=level,
+                         batched=batched, seed=seed)
+    warm_up(game, root)
+    return game
+
+
+def build_load(root, kind: str, count: int, batched: bool, seed: int) -> BenchmarkGame:
+    """
+    Build a game holding only the given number of enemies of one kind
+    """
+    game = BenchmarkGame(root, SCREEN_WIDTH, SCREEN_HEIGHT, level=1,
+                         batched=batched, seed=seed)
+    warm_up(game, root)
+    game.delete_all_enemy(Enemy)
+    if kind == "stalker":
+        # stalkers teleport 85 pixels behind a player standing still, which
+        # is off the screen from the player's starting point on the left
+        game.player.x = SCREEN_WIDTH / 2
+    for _ in range(count):
+        game.add_enemy(KINDS[kind](game))
+    return game
+
+
+def measure(game: BenchmarkGame, root, ticks: int) -> dict:
+    """
+    Run the game for the given number of ticks and return the percentiles of
+    each phase's time per tick, in seconds
+    """
+    game.enable_profiling(window=ticks)
+    # the loop below drives the game, so no after() loop may step it too
+    game.start(animate=False)
+    for _ in range(ticks):
+        game.step(render=True)
+        if root is not None:
+            root.update()
+    game.stop()
+    stats = game.frame_stats()
+    result = {phase: stats.get(metric, {}) for phase, metric in PHASES.items()}
+    result["enemies"] = len(game.enemies)
+    return result
+
+
+def measure_memory(kind: str, count: int = 1000) -> dict:
+    """
+    Measure the memory held per live enemy of the given kind in a headless
+    game, including the game's bookkeeping such as its registries
+    """
+    game = build_load(None, kind, 0, False, zlib.crc32(kind.encode()))
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(count):
+        game.add_enemy(KINDS[kind](game))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"object": sys.getsizeof(next(iter(game.enemies))),
+            "total": round((after - before) / count)}
+
+
+def run_cases(mode: str, levels, loads, ticks: int, batched: bool) -> list[dict]:
+    """
+    Run all benchmark cases in the given mode ("headless" or "tk")
+    """
+    root = None
+    if mode == "tk":
+        # pylint: disable=import-outside-toplevel
+        import tkinter as tk
+        try:
+            root = tk.Tk()
+        except tk.TclError as error:
+            raise RuntimeError(f"cannot open a Tk window: {error}") from error
+        root.geometry(f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}")
+
+    cases: list[tuple[str, Callable[[int], BenchmarkGame]]] = [
+        (f"level-{level}",
+         lambda seed, level=level: build_level(root, level, batched, seed))
+        for level in levels
+    ]
+    cases += [
+        (f"{kind}-{count}",
+         lambda seed, kind=kind, count=count: build_load(root, kind, count, batched, seed))
+        for kind in KINDS for count in loads
+    ]
+
+    results = []
+    for name, build in cases:
+        # every case gets its own fixed seed, so that runs are comparable
+        game = build(zlib.crc32(name.encode()))
+        result = {"case": name, "mode": mode}
+        result.update(measure(game, root, ticks))
+        results.append(result)
+        if game.frame is not None:
+            game.frame.destroy()
+        print(f"{mode:8} {name:18} enemies {result['enemies']:6} "
+              f"frame p50 {result['frame'].get('p50', 0) * 1000:8.3f} ms",
+              file=sys.stderr)
+    if root is not None:
+        root.destroy()
+    return results
+
+
+def compare(results: list[dict], memory: dict, baseline: dict,
+            tolerance: float) -> list[str]:
+    """
+    Compare the results against a baseline, and describe every case whose
+    median time of some phase got slower, and every enemy kind that got
+    larger, by more than the tolerance
+    """
+    previous = {(result["mode"], result["case"]): result
+                for result in baseline["results"]}
+    regressions = []
+    for kind, sizes in memory.items():
+        old = baseline.get("memory", {}).get(kind, {}).get("total")
+        if old is not None and sizes["total"] > old * (1 + tolerance):
+            regressions.append(f"memory {kind}: {old} B -> {sizes['total']} B per enemy")
+    for result in results:
+        base = previous.get((result["mode"], result["case"]))
+        if base is None:
+            continue
+        for phase in PHASES:
+            new, old = result[phase].get("p50"), base.get(phase, {}).get("p50")
+            if new is None or old is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > NOISE_FLOOR:
+                regressions.append(
+                    f"{result['mode']} {result['case']} {phase}: "
+                    f"{old * 1000:.3f} ms -> {new * 1000:.3f} ms")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run the benchmark from the command line, and return the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--modes", default="headless,tk",
+                        help="comma separated modes to run: headless, tk")
+    parser.add_argument("--ticks", type=int, default=100,
+                        help="ticks to measure per case")
+    parser.add_argument("--quick", action="store_true",
+                        help="run a reduced set of levels and loads")
+    parser.add_argument("--batched", action="store_true",
+                        help="use the NumPy enemy engine")
+    parser.add_argument("--output", default="benchmark-results.json",
+                        help="file to write the results to")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    levels = QUICK_LEVELS if args.quick else LEVELS
+    loads = QUICK_LOADS if args.quick else LOADS
+    results = []
+    for mode in args.modes.split(","):
+        try:
+            results += run_cases(mode, levels, loads, args.ticks, args.batched)
+        except (ImportError, RuntimeError) as error:
+            print(f"skipping {mode} mode: {error}", file=sys.stderr)
+
+    memory = {kind: measure_memory(kind) for kind in KINDS}
+    for kind, sizes in memory.items():
+        print(f"memory   {kind:18} object {sizes['object']:4} B  "
+              f"live enemy {sizes['total']:5} B", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ticks": args.ticks,
+            "batched": args.batched,
+        },
+        "results": results,
+        "memory": memory,
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, memory, json.load(file), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,599 @@
+"""
+The enemy_batch module provides an optional, NumPy-based engine that stores
+the state of the Turtle's Adventure enemies in struct-of-arrays form and steps
+all enemies of the same kind in one vectorized pass.  Enemy objects attached
+to a batch become thin views whose x and y read from the batch's arrays.
+
+The batches of a BatchGroup may hold the enemies of several games, each game
+being a lane of the group, so that the enemies of all of them are stepped
+together, e.g., by an arena hosting many headless games.
+"""
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+from turtle_adventure import (TurtleAdventureGame, TurtleGameElement, Enemy,
+                              RandomWalkEnemy, ChasingEnemy, FencingEnemy,
+                              StalkerEnemy)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _pick(value: Any, mask: "np.ndarray") -> Any:
+    """
+    Select the masked part of a per-slot array, or keep a value shared by all
+    slots as it is
+    """
+    return value[mask] if isinstance(value, np.ndarray) else value
+
+
+class StepInputs:
+    """
+    The state of the games a batched step reads: plain numbers when the
+    batches serve a single game, or arrays indexed by lane when they serve
+    several
+    """
+
+    __slots__ = ("ticks", "player_x", "player_y", "home_x", "home_y",
+                 "target_x", "target_y", "teleport", "width", "height")
+
+    def __init__(self, games: list[Optional[TurtleAdventureGame]]):
+        rows = [self.__read(game) for game in games]
+        if len(rows) == 1:
+            columns = rows[0]
+        else:
+            columns = tuple(np.array(column) for column in zip(*rows))
+        for name, column in zip(self.__slots__, columns):
+            setattr(self, name, column)
+
+    @staticmethod
+    def __read(game: Optional[TurtleAdventureGame]) -> tuple:
+        """
+        Read the inputs of one game, or zeros for a free lane
+        """
+        if game is None:
+            return (0,) * len(StepInputs.__slots__)
+        world = game.world
+        target_x, target_y = world.predict(StalkerEnemy.lead_ticks)
+        return (game.ticks, world.player_x, world.player_y, game.home.x, game.home.y,
+                target_x, target_y, 100 if world.waypoint_dx > 0 else -85,
+                game.screen_width, game.screen_height)
+
+
+class EnemyBatch(ABC):
+    """
+    An abstract class holding the positions, sizes and kind-specific state of
+    all enemies of one kind in NumPy arrays, along with the lane of the game
+    every enemy belongs to
+    """
+
+    # names of the kind-specific arrays, created next to x, y and size
+    fields: tuple[str, ...] = ()
+
+    def __init__(self, capacity: int = 64):
+        self.__count: int = 0
+        self.__enemies: list[Enemy] = []
+        self.__arrays: dict[str, "np.ndarray"] = {
+            name: np.zeros(capacity)
+            for name in ("x", "y", "size", "rendered_x", "rendered_y") + self.fields
+        }
+        self.__arrays["lane"] = np.zeros(capacity, dtype=np.intp)
+
+    @property
+    def enemies(self) -> list[Enemy]:
+        """
+        Get the enemies stored in this batch, ordered by slot
+        """
+        return self.__enemies
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def array(self, name: str) -> "np.ndarray":
+        """
+        Get the live part of the named array; x, y, size and lane are always
+        available in addition to the kind-specific fields
+        """
+        return self.__arrays[name][:self.__count]
+
+    @property
+    def xs(self) -> "np.ndarray":
+        """
+        Get the x coordinates of the stored enemies
+        """
+        return self.__arrays["x"]
+
+    @property
+    def ys(self) -> "np.ndarray":
+        """
+        Get the y coordinates of the stored enemies
+        """
+        return self.__arrays["y"]
+
+    def per_slot(self, value: Any) -> Any:
+        """
+        Spread a per-lane array of StepInputs over the slots of this batch;
+        a value shared by all lanes is kept as it is
+        """
+        return value[self.array("lane")] if isinstance(value, np.ndarray) else value
+
+    def add(self, enemy: Enemy, lane: int = 0) -> None:
+        """
+        Move the state of the enemy into this batch and turn the enemy into a
+        view of its slot
+        """
+        if self.__count == len(self.__arrays["x"]):
+            for name, array in self.__arrays.items():
+                self.__arrays[name] = np.concatenate((array, np.zeros_like(array)))
+        slot = self.__count
+        self.__count += 1
+        self.__enemies.append(enemy)
+        arrays = self.__arrays
+        arrays["x"][slot] = enemy.x
+        arrays["y"][slot] = enemy.y
+        arrays["size"][slot] = enemy.size
+        arrays["rendered_x"][slot] = np.nan
+        arrays["lane"][slot] = lane
+        self.load(slot, enemy)
+        enemy.bind_batch(self, slot)
+
+    def remove(self, enemy: Enemy) -> None:
+        """
+        Write the state of the enemy back to the enemy object and release its
+        slot by moving the last enemy of the batch into it
+        """
+        slot = enemy.slot
+        self.store(slot, enemy)
+        x, y = float(self.__arrays["x"][slot]), float(self.__arrays["y"][slot])
+        enemy.bind_batch(None, -1)
+        enemy.x, enemy.y = x, y
+
+        last = self.__count - 1
+        moved = self.__enemies.pop()
+        if moved is not enemy:
+            for array in self.__arrays.values():
+                array[slot] = array[last]
+            self.__enemies[slot] = moved
+            moved.bind_batch(self, slot)
+        self.__count -= 1
+
+    def clear(self, lane: Optional[int] = None) -> list[Enemy]:
+        """
+        Release every enemy of this batch, or of one of its lanes, and return
+        them
+        """
+        if lane is not None and np.any(self.array("lane") != lane):
+            return self.__clear_lane(lane)
+        removed = self.__enemies
+        for slot, enemy in enumerate(removed):
+            self.store(slot, enemy)
+            x, y = float(self.__arrays["x"][slot]), float(self.__arrays["y"][slot])
+            enemy.bind_batch(None, -1)
+            enemy.x, enemy.y = x, y
+        self.__enemies = []
+        self.__count = 0
+        return removed
+
+    def __clear_lane(self, lane: int) -> list[Enemy]:
+        """
+        Release the enemies of one lane, compacting the others without
+        changing their order, so that the random numbers every other lane's
+        enemies draw do not depend on when this lane's game ended
+        """
+        lanes = self.array("lane")
+        removed_slots = np.flatnonzero(lanes == lane)
+        removed = [self.__enemies[slot] for slot in removed_slots]
+        for slot, enemy in zip(removed_slots, removed):
+            self.store(slot, enemy)
+            x, y = float(self.__arrays["x"][slot]), float(self.__arrays["y"][slot])
+            enemy.bind_batch(None, -1)
+            enemy.x, enemy.y = x, y
+
+        kept = np.flatnonzero(lanes != lane)
+        for array in self.__arrays.values():
+            array[:len(kept)] = array[kept]
+        self.__enemies = [self.__enemies[slot] for slot in kept]
+        self.__count = len(kept)
+        for slot, enemy in enumerate(self.__enemies):
+            enemy.bind_batch(self, slot)
+        return removed
+
+    def moved(self, viewport: Optional[tuple[float, float, float, float]] = None,
+              lane: Optional[int] = None) -> tuple[list[Enemy], int]:
+        """
+        Get the enemies, of every lane or of the given one, whose position
+        changed since this method was last called, and record their current
+        positions as rendered.  With a viewport, enemies that were outside of
+        it when last rendered and still are are left out, and counted as
+        culled; they are returned again once they come back.  Return the
+        enemies and the culled count.
+        """
+        x, y = self.array("x"), self.array("y")
+        rendered_x, rendered_y = self.array("rendered_x"), self.array("rendered_y")
+        changed = (x != rendered_x) | (y != rendered_y)
+        if lane is not None:
+            changed &= self.array("lane") == lane
+        culled = 0
+        if viewport is not None:
+            x1, y1, x2, y2 = viewport
+            extent = self.array("size") / 2
+            # a never rendered enemy has NaN coordinates, which are not outside
+            hidden = (((x + extent < x1) | (x - extent > x2)
+                       | (y + extent < y1) | (y - extent > y2))
+                      & ((rendered_x + extent < x1) | (rendered_x - extent > x2)
+                         | (rendered_y + extent < y1) | (rendered_y - extent > y2)))
+            culled = int(np.count_nonzero(changed & hidden))
+            changed &= ~hidden
+        changed = np.flatnonzero(changed)
+        rendered_x[changed] = x[changed]
+        rendered_y[changed] = y[changed]
+        return [self.__enemies[slot] for slot in changed], culled
+
+    def hitting(self, inputs: StepInputs) -> "np.ndarray":
+        """
+        Get the slots of the enemies hitting the player of their game
+        """
+        half = self.array("size") / 2
+        return np.flatnonzero((np.abs(self.array("x") - self.per_slot(inputs.player_x)) < half)
+                              & (np.abs(self.array("y") - self.per_slot(inputs.player_y)) < half))
+
+    def load(self, slot: int, enemy: Enemy) -> None:
+        """
+        Copy the kind-specific state of the enemy into the given slot
+        """
+        for name in self.fields:
+            self.__arrays[name][slot] = getattr(enemy, name)
+
+    def store(self, slot: int, enemy: Enemy) -> None:
+        """
+        Copy the kind-specific state of the given slot back to the enemy
+        """
+        for name in self.fields:
+            setattr(enemy, name, type(getattr(enemy, name))(self.__arrays[name][slot]))
+
+    @abstractmethod
+    def step(self, inputs: StepInputs, rngs: list) -> None:
+        """
+        Move all enemies of this batch by one simulation step, drawing random
+        numbers from the generator of each enemy's lane
+        """
+
+
+class RandomWalkBatch(EnemyBatch):
+    """
+    Vectorized RandomWalkEnemy: changes direction at its turn_at step, every
+    30 steps, and bounces back from the walls
+    """
+
+    fields = ("turn_at", "update_x", "update_y")
+
+    def step(self, inputs: StepInputs, rngs: list) -> None:
+        ticks = self.per_slot(inputs.ticks)
+        turn_at = self.array("turn_at")
+        update_x, update_y = self.array("update_x"), self.array("update_y")
+        x, y = self.array("x"), self.array("y")
+
+        turning = np.flatnonzero(turn_at <= ticks)
+        if len(turning):
+            # every game draws its enemies' directions from its own generator,
+            # so that its run does not depend on the other lanes
+            lanes = self.array("lane")[turning]
+            order = np.argsort(lanes, kind="stable")
+            turning, lanes = turning[order], lanes[order]
+            starts = np.flatnonzero(np.diff(lanes)) + 1
+            for slots, lane in zip(np.split(turning, starts), lanes[np.r_[0, starts]]):
+                rng = rngs[lane]
+                update_x[slots] = rng.integers(-3, 4, len(slots))
+                update_y[slots] = rng.integers(-3, 4, len(slots))
+            turn_at[turning] = _pick(ticks, turning) + RandomWalkEnemy.turn_every
+        x += update_x
+        y += update_y
+
+        walled = ((x < 10) | (x > self.per_slot(inputs.width) - 10)
+                  | (y < 10) | (y > self.per_slot(inputs.height) - 10))
+        turn_at[walled] = _pick(ticks, walled) + RandomWalkEnemy.turn_every
+        update_x[walled] *= -1
+        update_y[walled] *= -1
+
+
+class ChasingBatch(EnemyBatch):
+    """
+    Vectorized ChasingEnemy: runs towards the player, faster when far away
+    horizontally
+    """
+
+    def step(self, inputs: StepInputs, rngs: list) -> None:
+        x, y = self.array("x"), self.array("y")
+        dx = self.per_slot(inputs.player_x) - x
+        dy = self.per_slot(inputs.player_y) - y
+        speed = np.where(np.abs(dx) > 100, 6, 3)
+        x += np.where(dx < 0, -speed, speed)
+        y += 3 * np.sign(dy)
+
+
+class FencingBatch(EnemyBatch):
+    """
+    Vectorized FencingEnemy: walks around home in a square
+    """
+
+    fields = ("x_speed", "y_speed")
+
+    def step(self, inputs: StepInputs, rngs: list) -> None:
+        home_x, home_y = self.per_slot(inputs.home_x), self.per_slot(inputs.home_y)
+        x, y = self.array("x"), self.array("y")
+        x_speed, y_speed = self.array("x_speed"), self.array("y_speed")
+
+        left = x < home_x - 50
+        right = ~left & (x > home_x + 50)
+        top = ~left & ~right & (y < home_y - 50)
+        bottom = ~left & ~right & ~top & (y > home_y + 50)
+        for border, bound_x, bound_y, speed_x, speed_y in (
+                (left, home_x - 50, None, 0, 3),
+                (right, home_x + 50, None, 0, -3),
+                (top, None, home_y - 50, -3, 0),
+                (bottom, None, home_y + 50, 3, 0)):
+            if bound_x is not None:
+                x[border] = _pick(bound_x, border)
+            else:
+                y[border] = _pick(bound_y, border)
+            x_speed[border] = speed_x
+            y_speed[border] = speed_y
+
+        x += x_speed
+        y += y_speed
+
+
+class StalkerBatch(EnemyBatch):
+    """
+    Vectorized StalkerEnemy: periodically teleports in front of the player,
+    then runs towards the player
+    """
+
+    fields = ("teleport_at", "timer", "speed")
+
+    def step(self, inputs: StepInputs, rngs: list) -> None:
+        x, y = self.array("x"), self.array("y")
+        teleport_at, speed = self.array("teleport_at"), self.array("speed")
+
+        ticks = self.per_slot(inputs.ticks)
+        teleporting = teleport_at <= ticks
+        x[teleporting] = _pick(self.per_slot(inputs.target_x)
+                               + self.per_slot(inputs.teleport), teleporting)
+        y[teleporting] = _pick(self.per_slot(inputs.target_y), teleporting)
+        teleport_at[teleporting] = (_pick(ticks, teleporting)
+                                    + self.array("timer")[teleporting])
+
+        dx = self.per_slot(inputs.player_x) - x
+        dy = self.per_slot(inputs.player_y) - y
+        speed[:] = np.where(dx > 0, np.abs(speed),
+                            np.where(dx < 0, -np.abs(speed), speed))
+        x += speed
+        y += 2 * np.sign(dy)
+
+
+class BatchGroup:
+    """
+    One EnemyBatch per supported enemy kind, shared by the games joining the
+    group; every game gets a lane, and step() moves the enemies of all lanes
+    in one vectorized pass per kind
+    """
+
+    def __init__(self, batch_classes: dict[type, type]):
+        if np is None:
+            raise RuntimeError("the batched enemy engine requires numpy")
+        self.__batches: dict[type, EnemyBatch] = {
+            kind: batch_class() for kind, batch_class in batch_classes.items()
+        }
+        self.__games: list[Optional[TurtleAdventureGame]] = []
+
+    @property
+    def batches(self) -> dict[type, EnemyBatch]:
+        """
+        Get the batches keyed by enemy class
+        """
+        return self.__batches
+
+    @property
+    def games(self) -> list[Optional[TurtleAdventureGame]]:
+        """
+        Get the game of every lane, or None for a free lane
+        """
+        return self.__games
+
+    def join(self, game: TurtleAdventureGame) -> int:
+        """
+        Give the game a lane, reusing a free one if possible, and return it
+        """
+        if None in self.__games:
+            lane = self.__games.index(None)
+            self.__games[lane] = game
+            return lane
+        self.__games.append(game)
+        return len(self.__games) - 1
+
+    def leave(self, lane: int) -> None:
+        """
+        Free a lane whose enemies have all been removed
+        """
+        self.__games[lane] = None
+
+    def step(self) -> None:
+        """
+        Move the enemies of every lane by one simulation step, and report the
+        first enemy hitting the player of each running game
+        """
+        games = self.__games
+        inputs = StepInputs(games)
+        rngs = [None if game is None else game.enemy_batches.rng for game in games]
+        hits: dict[int, Enemy] = {}
+        stepped = False
+        hit_test = 0.0
+        for batch in self.__batches.values():
+            if len(batch):
+                batch.step(inputs, rngs)
+                start = time.perf_counter()
+                lanes = batch.array("lane")
+                for slot in batch.hitting(inputs):
+                    hits.setdefault(int(lanes[slot]), batch.enemies[slot])
+                hit_test += time.perf_counter() - start
+                stepped = True
+        if stepped:
+            for game in games:
+                if game is not None:
+                    game.enemy_batches.mark_dirty()
+                    # the hit test runs within the update of the batches, so
+                    # it is reported on its own for profiling
+                    if game.profiler is not None:
+                        game.profiler.add("batch_hits", hit_test)
+        for lane, enemy in sorted(hits.items()):
+            if games[lane].is_started:
+                games[lane].on_collision(enemy)
+
+
+class EnemyBatchManager(TurtleGameElement):
+    """
+    A game element that holds the game's lane of a BatchGroup, and updates
+    and renders the game's batched enemies.  Unless a group is given, the
+    manager has a group of its own and steps it in update(); a group shared
+    with other games is stepped by its owner, e.g., an Arena, once all of
+    them have been updated.
+    """
+
+    batch_classes: dict[type, type] = {
+        RandomWalkEnemy: RandomWalkBatch,
+        ChasingEnemy: ChasingBatch,
+        FencingEnemy: FencingBatch,
+        StalkerEnemy: StalkerBatch,
+    }
+
+    # the manager sits at the origin, and culls its enemies itself
+    cullable = False
+
+    def __init__(self, game: TurtleAdventureGame, seed: Optional[int] = None,
+                 group: Optional[BatchGroup] = None):
+        if np is None:
+            raise RuntimeError("the batched enemy engine requires numpy")
+        super().__init__(game)
+        self.__rng = np.random.default_rng(seed)
+        self.__shared: bool = group is not None
+        self.__group: BatchGroup = group if group is not None else BatchGroup(self.batch_classes)
+        self.__lane: int = self.__group.join(game)
+        self.__batches: dict[type, EnemyBatch] = self.__group.batches
+
+    @property
+    def rng(self) -> "np.random.Generator":
+        """
+        Get the random number generator used by the game's batched enemies
+        """
+        return self.__rng
+
+    @property
+    def batches(self) -> dict[type, EnemyBatch]:
+        """
+        Get the batches keyed by enemy class
+        """
+        return self.__batches
+
+    @property
+    def group(self) -> BatchGroup:
+        """
+        Get the group holding the batches
+        """
+        return self.__group
+
+    @property
+    def lane(self) -> int:
+        """
+        Get the game's lane in the group
+        """
+        return self.__lane
+
+    @property
+    def is_shared(self) -> bool:
+        """
+        Get the flag indicating whether the group is shared with other games
+        """
+        return self.__shared
+
+    def supports(self, enemy: Enemy) -> bool:
+        """
+        Check whether the enemy's kind can be batched
+        """
+        return type(enemy) in self.__batches
+
+    def add(self, enemy: Enemy) -> None:
+        """
+        Add the enemy to the batch of its kind and create its canvas item;
+        the batch takes over the enemy's timed events
+        """
+        self.__batches[type(enemy)].add(enemy, self.__lane)
+        enemy.create()
+
+    def sync(self) -> None:
+        """
+        Copy the kind-specific state of every batched enemy of the game back
+        to the enemy objects, e.g., before saving the game state
+        """
+        for batch in self.__batches.values():
+            lanes = batch.array("lane")
+            for slot, enemy in enumerate(batch.enemies):
+                if lanes[slot] == self.__lane:
+                    batch.store(slot, enemy)
+
+    def remove(self, enemy: Enemy) -> None:
+        """
+        Remove the enemy from its batch and release its canvas item
+        """
+        self.__batches[type(enemy)].remove(enemy)
+        enemy.delete()
+
+    def remove_kind(self, kind: type) -> list[Enemy]:
+        """
+        Remove all batched enemies of the given class and return them
+        """
+        removed = self.__batches[kind].clear(self.__lane if self.__shared else None)
+        for enemy in removed:
+            enemy.delete()
+        return removed
+
+    def create(self) -> None:
+        pass
+
+    def remove_type(self, kind: type) -> list[Enemy]:
+        """
+        Remove all batched enemies that are instances of the given class and
+        return them
+        """
+        removed = []
+        for batch_kind in self.__batches:
+            if issubclass(batch_kind, kind):
+                removed.extend(self.remove_kind(batch_kind))
+        return removed
+
+    def leave(self) -> None:
+        """
+        Remove the game's enemies and give its lane back to the group
+        """
+        self.delete()
+        self.__group.leave(self.__lane)
+
+    def delete(self) -> None:
+        for kind in self.__batches:
+            self.remove_kind(kind)
+
+    def update(self) -> None:
+        if not self.__shared:
+            self.__group.step()
+
+    def render(self) -> None:
+        viewport = self.game.viewport
+        lane = self.__lane if self.__shared else None
+        culled = 0
+        for batch in self.__batches.values():
+            moved, hidden = batch.moved(viewport, lane)
+            for enemy in moved:
+                enemy.render()
+            culled += hidden
+        self.game.record_culled(culled)
@@ -1,21 +1,50 @@
 """
 The gamelib module defines abstract classes necessary for implementing simple
-games based on tkinter's canvas.
+games based on tkinter's canvas.  A game created without a parent widget runs
+headless: elements draw onto a NullCanvas and the game is driven by run()
+instead of tkinter's event loop.  tkinter is only imported once a game with a
+parent widget is created, so headless games never load it.
 """
-import tkinter as tk
+import atexit
+import csv
+import json
+import math
+import random
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
+
+if TYPE_CHECKING:
+    import tkinter as tk
 
 
 class GameElement(ABC):
     """
     An abstract class to be implemented to represent all kinds of elements to
     be displayed on the game's screen
+
+    An element is rendered only when it is dirty.  Changing x or y marks it
+    dirty; subclasses call mark_dirty() when other visual state changes.
+
+    Elements use __slots__ to stay small, as games may hold thousands of
+    them; subclasses should declare __slots__ for their own attributes too.
+
+    When the game has a viewport, an element whose extent lies entirely
+    outside of it is not rendered, unless the element is not cullable, and a
+    despawnable element far enough outside of it is removed from the game.
     """
 
+    __slots__ = ("__game", "__x", "__y", "__dirty")
+
+    cullable: bool = True
+    despawnable: bool = False
+
     def __init__(self, game: "Game"):
         self.__game: "Game" = game
         self.__x: float = 0
         self.__y: float = 0
+        self.__dirty: bool = True
 
     @property
     def x(self) -> float:
@@ -26,7 +55,9 @@ class GameElement(ABC):
 
     @x.setter
     def x(self, val: float) -> None:
-        self.__x = val
+        if val != self.__x:
+            self.__x = val
+            self.__dirty = True
 
     @property
     def y(self) -> float:
@@ -37,7 +68,37 @@ class GameElement(ABC):
 
     @y.setter
     def y(self, val: float) -> None:
-        self.__y = val
+        if val != self.__y:
+            self.__y = val
+            self.__dirty = True
+
+    @property
+    def is_dirty(self) -> bool:
+        """
+        Get the flag indicating whether the element has changed since it was
+        last rendered
+        """
+        return self.__dirty
+
+    def mark_dirty(self) -> None:
+        """
+        Request the element to be rendered in the next frame
+        """
+        self.__dirty = True
+
+    def mark_clean(self) -> None:
+        """
+        Record that the element has been rendered with its current state
+        """
+        self.__dirty = False
+
+    @property
+    def extent(self) -> float:
+        """
+        Get the distance from the element's position to the farthest edge of
+        what it draws, e.g., for culling
+        """
+        return 0
 
     @property
     def game(self) -> "Game":
@@ -47,7 +108,7 @@ class GameElement(ABC):
         return self.__game
 
     @property
-    def canvas(self) -> tk.Canvas:
+    def canvas(self) -> "tk.Canvas":
         """
         Return reference to the game's main canvas
         """
@@ -78,19 +139,563 @@ class GameElement(ABC):
         """
 
 
-class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
+class ElementRegistry:
+    """
+    An insertion-ordered set of game elements with constant-time add and
+    remove and an index by element class for bulk removal.  While the
+    registry is being iterated, adds and removes are deferred until the
+    iteration ends; elements removed meanwhile are skipped.
+    """
+
+    def __init__(self):
+        self.__elements: dict[GameElement, None] = {}
+        self.__by_type: dict[type, dict[GameElement, None]] = {}
+        self.__iterating: int = 0
+        self.__pending_adds: dict[GameElement, None] = {}
+        self.__pending_removes: dict[GameElement, None] = {}
+
+    def __len__(self) -> int:
+        return len(self.__elements) + len(self.__pending_adds) - len(self.__pending_removes)
+
+    def __contains__(self, element: GameElement) -> bool:
+        if element in self.__pending_removes:
+            return False
+        return element in self.__elements or element in self.__pending_adds
+
+    def __iter__(self):
+        self.__iterating += 1
+        try:
+            removes = self.__pending_removes
+            for element in self.__elements:
+                if not removes or element not in removes:
+                    yield element
+        finally:
+            self.__iterating -= 1
+            if not self.__iterating:
+                self.__flush()
+
+    def add(self, element: GameElement) -> None:
+        """
+        Add an element to the registry
+        """
+        if self.__iterating:
+            if element in self.__pending_removes:
+                del self.__pending_removes[element]
+            else:
+                self.__pending_adds[element] = None
+            return
+        self.__elements[element] = None
+        self.__by_type.setdefault(type(element), {})[element] = None
+
+    def remove(self, element: GameElement) -> None:
+        """
+        Remove an element from the registry
+        """
+        if element in self.__pending_adds:
+            del self.__pending_adds[element]
+        elif self.__iterating:
+            if element not in self.__elements:
+                raise KeyError(element)
+            self.__pending_removes[element] = None
+        else:
+            del self.__elements[element]
+            del self.__by_type[type(element)][element]
+
+    def of_type(self, kind: type) -> list[GameElement]:
+        """
+        Get all registered elements that are instances of the given class
+        """
+        found = [element
+                 for element_type, elements in self.__by_type.items()
+                 if issubclass(element_type, kind)
+                 for element in elements
+                 if element not in self.__pending_removes]
+        found.extend(element for element in self.__pending_adds
+                     if isinstance(element, kind))
+        return found
+
+    def remove_type(self, kind: type) -> list[GameElement]:
+        """
+        Remove all elements that are instances of the given class, and return
+        them
+        """
+        removed = self.of_type(kind)
+        if self.__iterating:
+            for element in removed:
+                self.remove(element)
+            return removed
+        for element_type in [element_type for element_type in self.__by_type
+                             if issubclass(element_type, kind)]:
+            for element in self.__by_type.pop(element_type):
+                del self.__elements[element]
+        return removed
+
+    def __flush(self) -> None:
+        """
+        Apply the adds and removes deferred during iteration
+        """
+        removes, self.__pending_removes = self.__pending_removes, {}
+        adds, self.__pending_adds = self.__pending_adds, {}
+        for element in removes:
+            self.remove(element)
+        for element in adds:
+            self.add(element)
+
+
+class SpatialGrid:
+    """
+    A uniform grid over the playfield that buckets elements by the cell
+    containing their position, so that finding the elements near a point only
+    looks at a few cells.  Positions outside the playfield fall into the
+    border cells.  The grid is kept up to date incrementally: insert() and
+    move() return the bounds of the element's cell, and the element calls
+    move() only once its position leaves them.  The bounds are loose by the
+    given slack, so that an element jittering across a cell edge stays in
+    its cell, and queries look that much farther.
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float = 50,
+                 slack: float = 12.5):
+        self.__cell_size: float = cell_size
+        self.__slack: float = slack
+        self.__columns: int = max(1, math.ceil(width / cell_size))
+        self.__rows: int = max(1, math.ceil(height / cell_size))
+        self.__cells: dict[tuple[int, int], set[GameElement]] = {}
+        self.__keys: dict[GameElement, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def __contains__(self, element: GameElement) -> bool:
+        return element in self.__keys
+
+    def __key(self, x: float, y: float) -> tuple[int, int]:
+        column = min(max(int(x // self.__cell_size), 0), self.__columns - 1)
+        row = min(max(int(y // self.__cell_size), 0), self.__rows - 1)
+        return column, row
+
+    def __bounds(self, key: tuple[int, int]) -> tuple[float, float, float, float]:
+        """
+        Get the (x1, y1, x2, y2) bounds of the positions an element of a cell
+        may take before it moves to another cell; the border cells extend to
+        infinity
+        """
+        column, row = key
+        size, slack = self.__cell_size, self.__slack
+        return (column * size - slack if column > 0 else -math.inf,
+                row * size - slack if row > 0 else -math.inf,
+                (column + 1) * size + slack if column < self.__columns - 1 else math.inf,
+                (row + 1) * size + slack if row < self.__rows - 1 else math.inf)
+
+    def insert(self, element: GameElement) -> tuple[float, float, float, float]:
+        """
+        Put the element into the cell of its current position, and return the
+        bounds of that cell
+        """
+        key = self.__key(element.x, element.y)
+        self.__keys[element] = key
+        self.__cells.setdefault(key, set()).add(element)
+        return self.__bounds(key)
+
+    def move(self, element: GameElement) -> tuple[float, float, float, float]:
+        """
+        Move the element into the cell of its current position, and return
+        the bounds of that cell
+        """
+        key = self.__key(element.x, element.y)
+        old_key = self.__keys[element]
+        if key != old_key:
+            self.__cells[old_key].discard(element)
+            self.__cells.setdefault(key, set()).add(element)
+            self.__keys[element] = key
+        return self.__bounds(key)
+
+    def remove(self, element: GameElement) -> None:
+        """
+        Take the element out of the grid
+        """
+        key = self.__keys.pop(element)
+        self.__cells[key].discard(element)
+
+    def query(self, x1: float, y1: float, x2: float, y2: float):
+        """
+        Yield the elements that may lie within the rectangle (x1, y1)-(x2,
+        y2), among others near it
+        """
+        slack = self.__slack
+        column1, row1 = self.__key(x1 - slack, y1 - slack)
+        column2, row2 = self.__key(x2 + slack, y2 + slack)
+        cells = self.__cells
+        for column in range(column1, column2 + 1):
+            for row in range(row1, row2 + 1):
+                yield from cells.get((column, row), ())
+
+
+class TimerWheel:
+    """
+    A hierarchical timer wheel scheduling callbacks on simulation ticks.
+    Level 0 has one slot per tick for the next 64 ticks, and every further
+    level has slots 64 times as wide; a callback waits in a coarse slot and
+    cascades into finer ones as its tick comes closer.  Scheduling and
+    cancelling take constant time, and advancing by a tick only touches the
+    callbacks that are due, however many are pending.  Callbacks due on the
+    same tick run in the order they were scheduled.
+    """
+
+    BITS = 6
+    LEVELS = 4
+
+    def __init__(self, now: int = 0):
+        self.__now: int = now
+        self.__wheels: list[list[dict[int, tuple[int, Callable]]]] = [
+            [{} for _ in range(1 << self.BITS)] for _ in range(self.LEVELS)
+        ]
+        # callbacks too far in the future for the wheels
+        self.__overflow: dict[int, tuple[int, Callable]] = {}
+        # the slot holding every pending callback, by id
+        self.__slots: dict[int, dict[int, tuple[int, Callable]]] = {}
+        self.__seq: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__slots)
+
+    @property
+    def now(self) -> int:
+        """
+        Get the tick the wheel has advanced to
+        """
+        return self.__now
+
+    def __place(self, call_id: int, tick: int, func: Callable) -> None:
+        """
+        Put a callback into the finest slot that can hold its tick
+        """
+        bits, now = self.BITS, self.__now
+        for level, wheel in enumerate(self.__wheels):
+            shift = bits * (level + 1)
+            if tick >> shift == now >> shift:
+                slot = wheel[(tick >> (bits * level)) & ((1 << bits) - 1)]
+                break
+        else:
+            slot = self.__overflow
+        slot[call_id] = (tick, func)
+        self.__slots[call_id] = slot
+
+    def schedule(self, tick: int, func: Callable) -> int:
+        """
+        Call func when the wheel advances to the given tick, or to the next
+        tick if the given one has passed, and return an id for cancel()
+        """
+        self.__seq += 1
+        self.__place(self.__seq, max(tick, self.__now + 1), func)
+        return self.__seq
+
+    def cancel(self, call_id: int) -> None:
+        """
+        Cancel a pending callback; cancelling a callback that already ran does
+        nothing
+        """
+        slot = self.__slots.pop(call_id, None)
+        if slot is not None:
+            del slot[call_id]
+
+    def due(self, call_id: int) -> Optional[int]:
+        """
+        Get the tick a pending callback is due on, or None if it is not
+        pending
+        """
+        slot = self.__slots.get(call_id)
+        return None if slot is None else slot[call_id][0]
+
+    def __cascade(self, slot: dict[int, tuple[int, Callable]]) -> None:
+        """
+        Move the callbacks of a coarse slot into finer slots
+        """
+        entries = sorted(slot.items())
+        slot.clear()
+        for call_id, (tick, func) in entries:
+            self.__place(call_id, tick, func)
+
+    def advance(self) -> None:
+        """
+        Advance the wheel by one tick and run the callbacks due on it
+        """
+        self.__now += 1
+        now, bits, mask = self.__now, self.BITS, (1 << self.BITS) - 1
+        if not now & mask:
+            if not now & ((1 << bits * self.LEVELS) - 1):
+                self.__cascade(self.__overflow)
+            for level in range(self.LEVELS - 1, 0, -1):
+                if not now & ((1 << bits * level) - 1):
+                    self.__cascade(self.__wheels[level][(now >> (bits * level)) & mask])
+
+        slot = self.__wheels[0][now & mask]
+        slots = self.__slots
+        for call_id in sorted(slot):
+            # an earlier callback may have cancelled this one
+            entry = slot.pop(call_id, None)
+            if entry is not None:
+                del slots[call_id]
+                entry[1]()
+
+    def reset(self, now: int) -> None:
+        """
+        Drop all pending callbacks and move the wheel to the given tick
+        """
+        self.__now = now
+        for wheel in self.__wheels:
+            for slot in wheel:
+                slot.clear()
+        self.__overflow.clear()
+        self.__slots.clear()
+
+
+class RenderBatch:
+    """
+    Collect the canvas commands issued while rendering a frame and submit
+    them to the Tcl interpreter as a single script, instead of making one
+    interpreter round-trip per command.  Repeated coords() calls for the same
+    item within a frame are coalesced into the last one.
+    """
+
+    def __init__(self, canvas: "tk.Canvas"):
+        self.__canvas: "tk.Canvas" = canvas
+        self.__path: str = str(canvas)
+        self.__coords: dict[int, str] = {}
+        self.__commands: list[str] = []
+        self.__operations: int = 0
+
+    @staticmethod
+    def __word(value: Any) -> str:
+        """
+        Quote a value as a single Tcl word
+        """
+        text = str(value)
+        if text and all(char.isalnum() or char in "#.-+_" for char in text):
+            return text
+        return "{" + text + "}"
+
+    def coords(self, item: int, *coords: float) -> None:
+        """
+        Queue moving the canvas item to the given coordinates
+        """
+        self.__coords[item] = " ".join(map(str, coords))
+
+    def itemconfigure(self, item: int, **options: Any) -> None:
+        """
+        Queue changing options of the canvas item
+        """
+        self.__commands.append(
+            f"{self.__path} itemconfigure {item} "
+            + " ".join(f"-{name} {self.__word(value)}"
+                       for name, value in options.items()))
+
+    def tag_raise(self, item: int) -> None:
+        """
+        Queue raising the canvas item above all other items
+        """
+        self.__commands.append(f"{self.__path} raise {item}")
+
+    @property
+    def operations(self) -> int:
+        """
+        Get the number of canvas operations submitted by the last flush
+        """
+        return self.__operations
+
+    def flush(self) -> int:
+        """
+        Submit all queued commands as one Tcl script, and return the number of
+        canvas operations it contained
+        """
+        commands = self.__commands
+        commands.extend(f"{self.__path} coords {item} {coords}"
+                        for item, coords in self.__coords.items())
+        self.__operations = len(commands)
+        if commands and not isinstance(self.__canvas, NullCanvas):
+            self.__canvas.tk.eval("\n".join(commands))
+        self.__commands = []
+        self.__coords = {}
+        return self.__operations
+
+
+class FrameProfiler:
+    """
+    Record per-frame timings of a game: the time spent in update() and
+    render() for each element class and in total, in the game's post_update()
+    step, the total frame time, the number of live elements and the
+    scheduling jitter of after().  Only the last `window` frames are kept, so
+    that percentiles reflect recent frames.
+    """
+
+    def __init__(self, window: int = 300):
+        self.__window: int = window
+        self.__samples: dict[str, deque] = {}
+        self.__frame: dict[str, float] = {}
+
+    def add(self, metric: str, value: float) -> None:
+        """
+        Add a value to the given metric of the current frame
+        """
+        self.__frame[metric] = self.__frame.get(metric, 0) + value
+
+    def end_frame(self, element_count: int, jitter: Optional[float] = None) -> None:
+        """
+        Close the current frame, storing its accumulated metrics
+        """
+        frame = self.__frame
+        frame["update"] = sum(value for metric, value in frame.items()
+                              if metric.startswith("update:"))
+        frame["render"] = sum(value for metric, value in frame.items()
+                              if metric.startswith("render:"))
+        frame["frame"] = frame["update"] + frame["render"] + frame.get("post_update", 0)
+        frame["elements"] = element_count
+        if jitter is not None:
+            frame["jitter"] = jitter
+        for metric, value in frame.items():
+            if metric not in self.__samples:
+                self.__samples[metric] = deque(maxlen=self.__window)
+            self.__samples[metric].append(value)
+        self.__frame = {}
+
+    def percentiles(self, metric: str,
+                    quantiles: tuple[float, ...] = (0.5, 0.95, 0.99)) -> dict[str, float]:
+        """
+        Get the percentiles of a metric over the recorded frames, keyed as
+        "p50", "p95", ...; times are in seconds
+        """
+        values = sorted(self.__samples.get(metric, ()))
+        if not values:
+            return {}
+        return {f"p{round(q * 100)}": values[round(q * (len(values) - 1))]
+                for q in quantiles}
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Get p50/p95/p99 of every recorded metric
+        """
+        return {metric: self.percentiles(metric) for metric in sorted(self.__samples)}
+
+    def summary(self) -> str:
+        """
+        Get a short text summary of the frame times, e.g., for an overlay
+        """
+        frame = self.percentiles("frame")
+        if not frame:
+            return ""
+        elements = self.percentiles("elements")
+        return (f"frame p50 {frame['p50'] * 1000:.1f} ms  "
+                f"p95 {frame['p95'] * 1000:.1f} ms  "
+                f"p99 {frame['p99'] * 1000:.1f} ms  "
+                f"elements {elements['p50']:.0f}")
+
+    def dump(self, path: str) -> None:
+        """
+        Write the statistics to a JSON file, or a CSV file if the path ends
+        with .csv
+        """
+        stats = self.stats()
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            if path.endswith(".csv"):
+                writer = csv.writer(file)
+                writer.writerow(["metric", "p50", "p95", "p99"])
+                for metric, values in stats.items():
+                    writer.writerow([metric, values["p50"], values["p95"], values["p99"]])
+            else:
+                json.dump(stats, file, indent=2)
+
+
+class NullCanvas:
+    """
+    A stand-in for tk.Canvas used by headless games.  Item creation hands out
+    fresh item ids and every other canvas command is silently ignored.
+    """
+
+    def __init__(self):
+        self.__last_id: int = 0
+
+    def __getattr__(self, name: str):
+        if name.startswith("create_"):
+            return self.__create
+        return self.__ignore
+
+    def __create(self, *args, **kwargs) -> int:
+        self.__last_id += 1
+        return self.__last_id
+
+    def __ignore(self, *args, **kwargs) -> None:
+        pass
+
+
+class Game(ABC):
     """
     An abstract class to be implemented with a concrete game class that relies
     on update/render loop
+
+    By default, every frame updates and renders all elements, then waits
+    update_delay milliseconds before the next one, so the simulation slows
+    down as the frame work grows.  With fixed_step enabled, the loop instead
+    accumulates the real elapsed time and runs one update for every
+    update_delay milliseconds that have passed (at most max_updates_per_tick
+    of them per tick), then renders once.  The simulation therefore keeps a
+    constant speed under load while rendering drops frames.
+
+    When parent is None, the game is headless: no tkinter widget is created,
+    and run() steps the elements' update() as fast as the CPU allows without
+    rendering anything.
+
+    After set_viewport(), rendering skips the elements outside of the
+    visible area, and with a despawn margin, every simulation step removes
+    the despawnable elements that strayed farther than the margin outside of
+    it.  culled and despawned give the counts of the last frame and step,
+    and the profiler records them for every frame as "culled" and
+    "despawned".
+
+    Game logic should draw random numbers from rng and schedule timed events
+    with call_later() or call_at_tick(), instead of polling counters in
+    update().  The callbacks live in a timer wheel driven by the simulation
+    steps, in both the Tk and the headless mode, so a tick only does work for
+    the events that are due, and a game replayed with the same seed and
+    inputs behaves exactly the same.
     """
 
-    def __init__(self, parent, update_delay=33):
-        super().__init__(parent)
-        self.__canvas = tk.Canvas(self)
-        self.__canvas.pack(expand=True, fill="both")
-        self.pack(expand=True, fill="both")
-        self.__game_elements = []
+    def __init__(self, parent=None, update_delay=33, fixed_step=False,
+                 max_updates_per_tick=5, seed: Optional[int] = None):
+        self.__frame: Optional["tk.Frame"] = None
+        self.__canvas: "tk.Canvas"
+        if parent is None:
+            self.__canvas = NullCanvas()
+        else:
+            # pylint: disable=import-outside-toplevel
+            import tkinter as tk
+            self.__frame = tk.Frame(parent)
+            self.__canvas = tk.Canvas(self.__frame)
+            self.__canvas.pack(expand=True, fill="both")
+            self.__frame.pack(expand=True, fill="both")
+        self.__render_batch = RenderBatch(self.__canvas)
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.__seed: int = seed
+        self.__rng = random.Random(seed)
+        self.__clock: int = 0
+        self.__ticks: int = 0
+        self.__timers = TimerWheel()
+        self.__game_elements = ElementRegistry()
         self.__update_delay = update_delay
+        self.__fixed_step = fixed_step
+        self.__max_updates_per_tick = max_updates_per_tick
+        self.__accumulator: float = 0
+        self.__last_time: float = 0
+        self.__skipped_renders: int = 0
+        self.__profiler: Optional[FrameProfiler] = None
+        self.__overlay: Optional[int] = None
+        self.__expected_time: Optional[float] = None
+        self.__viewport: Optional[tuple[float, float, float, float]] = None
+        self.__despawn_margin: Optional[float] = None
+        self.__culled: set[GameElement] = set()
+        self.__culled_count: int = 0
+        self.__despawned: int = 0
+        self.__despawned_total: int = 0
         self.__started = False
         self.init_game()
 
@@ -112,12 +717,18 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         Get called when the player loses the game
         """
 
+    def post_update(self) -> None:
+        """
+        Get called after all elements have been updated in a simulation step,
+        e.g., to detect collisions between elements
+        """
+
     def add_element(self, element: GameElement) -> None:
         """
         Add a GameElement object to the game
         """
         element.create()
-        self.__game_elements.append(element)
+        self.__game_elements.add(element)
 
     def delete_element(self, element: GameElement) -> None:
         """
@@ -125,14 +736,223 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         """
         element.delete()
         self.__game_elements.remove(element)
+        self.__culled.discard(element)
+
+    def delete_elements_of_type(self, kind: type) -> list[GameElement]:
+        """
+        Remove all GameElement objects of the given class from the game, and
+        return them
+        """
+        removed = self.__game_elements.remove_type(kind)
+        for element in removed:
+            element.delete()
+            self.__culled.discard(element)
+        return removed
+
+    def despawn_candidates(self) -> Iterable[GameElement]:
+        """
+        Get the elements that may be despawned when they leave the viewport
+        """
+        return [element for element in self.__game_elements if element.despawnable]
+
+    def despawn(self, element: GameElement) -> None:
+        """
+        Remove an element that strayed too far outside the viewport; games
+        keeping their own bookkeeping of such elements override this
+        """
+        self.delete_element(element)
+
+    @property
+    def elements(self) -> ElementRegistry:
+        """
+        Get the registry of the game's elements
+        """
+        return self.__game_elements
 
     @property
-    def canvas(self) -> tk.Canvas:
+    def canvas(self) -> "tk.Canvas":
         """
         Get the canvas object of the game application
         """
         return self.__canvas
 
+    @property
+    def render_batch(self) -> RenderBatch:
+        """
+        Get the batch collecting the canvas commands of the current frame
+        """
+        return self.__render_batch
+
+    @property
+    def canvas_operations(self) -> int:
+        """
+        Get the number of canvas operations issued by the last rendered frame
+        """
+        return self.__render_batch.operations
+
+    @property
+    def frame(self) -> Optional["tk.Frame"]:
+        """
+        Get the frame widget holding the game's canvas, or None when the game
+        is headless
+        """
+        return self.__frame
+
+    @property
+    def is_headless(self) -> bool:
+        """
+        Get the flag indicating whether the game runs without a Tk display
+        """
+        return self.__frame is None
+
+    @property
+    def ticks(self) -> int:
+        """
+        Get the number of simulation steps run so far
+        """
+        return self.__ticks
+
+    @property
+    def clock(self) -> int:
+        """
+        Get the simulated time in milliseconds, i.e., the number of simulation
+        steps run so far times update_delay
+        """
+        return self.__clock
+
+    @property
+    def seed(self) -> int:
+        """
+        Get the seed of the game's random number generator
+        """
+        return self.__seed
+
+    @property
+    def rng(self) -> random.Random:
+        """
+        Get the game's random number generator
+        """
+        return self.__rng
+
+    def reset_clock(self, ticks: int, clock: int) -> None:
+        """
+        Set the number of simulation steps run and the simulated clock, e.g.,
+        when restoring a saved state.  Pending callbacks are dropped.
+        """
+        self.__ticks = ticks
+        self.__clock = clock
+        self.__timers.reset(ticks)
+
+    def call_at_tick(self, tick: int, func: Callable) -> int:
+        """
+        Call func at the start of the given simulation step, right before the
+        elements are updated, and return an id for cancel_call().  A step
+        that has already run means the next one.
+        """
+        return self.__timers.schedule(tick, func)
+
+    def call_later(self, ms: int, func: Callable) -> int:
+        """
+        Call func once the simulated clock has advanced by the given number of
+        milliseconds, right before the elements are updated, and return an id
+        for cancel_call()
+        """
+        return self.__timers.schedule(
+            self.__ticks + max(1, math.ceil(ms / self.__update_delay)), func)
+
+    def cancel_call(self, call_id: int) -> None:
+        """
+        Cancel a callback previously scheduled with call_later() or
+        call_at_tick()
+        """
+        self.__timers.cancel(call_id)
+
+    def call_due(self, call_id: Optional[int]) -> Optional[int]:
+        """
+        Get the simulation step a scheduled callback is due on, or None if it
+        is no longer pending
+        """
+        return None if call_id is None else self.__timers.due(call_id)
+
+    def after(self, ms: int, func: Callable) -> Any:
+        """
+        Call func once after the given number of milliseconds of simulated
+        time; the same as call_later()
+        """
+        return self.call_later(ms, func)
+
+    def after_cancel(self, after_id: Any) -> None:
+        """
+        Cancel a callback previously scheduled with after()
+        """
+        self.cancel_call(after_id)
+
+    @property
+    def viewport(self) -> Optional[tuple[float, float, float, float]]:
+        """
+        Get the visible area of the canvas as (x1, y1, x2, y2), or None when
+        culling is disabled
+        """
+        return self.__viewport
+
+    def set_viewport(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        """
+        Set the visible area of the canvas, enabling culling
+        """
+        self.__viewport = (x1, y1, x2, y2)
+
+    @property
+    def despawn_margin(self) -> Optional[float]:
+        """
+        Get or set how far outside the viewport a despawnable element may be
+        before it is despawned, or None to never despawn elements
+        """
+        return self.__despawn_margin
+
+    @despawn_margin.setter
+    def despawn_margin(self, val: Optional[float]) -> None:
+        self.__despawn_margin = val
+
+    def is_visible(self, element: GameElement) -> bool:
+        """
+        Check whether any part of the element lies within the viewport
+        """
+        if self.__viewport is None:
+            return True
+        x1, y1, x2, y2 = self.__viewport
+        extent = element.extent
+        x, y = element.x, element.y
+        return x1 - extent <= x <= x2 + extent and y1 - extent <= y <= y2 + extent
+
+    def record_culled(self, count: int) -> None:
+        """
+        Count renders skipped by an element that renders others, e.g., a
+        batch of elements, into the current frame's culled renders
+        """
+        self.__culled_count += count
+
+    @property
+    def culled(self) -> int:
+        """
+        Get the number of renders of elements outside the viewport skipped by
+        the last rendered frame
+        """
+        return self.__culled_count
+
+    @property
+    def despawned(self) -> int:
+        """
+        Get the number of elements despawned by the last simulation step
+        """
+        return self.__despawned
+
+    @property
+    def despawned_total(self) -> int:
+        """
+        Get the number of elements despawned so far
+        """
+        return self.__despawned_total
+
     @property
     def is_started(self) -> bool:
         """
@@ -140,13 +960,104 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         """
         return self.__started
 
-    def start(self) -> None:
+    @property
+    def update_delay(self) -> int:
+        """
+        Get the simulated milliseconds between two simulation steps
+        """
+        return self.__update_delay
+
+    @property
+    def fixed_step(self) -> bool:
+        """
+        Get the flag indicating whether the game loop runs with a fixed
+        simulation step
+        """
+        return self.__fixed_step
+
+    @property
+    def skipped_renders(self) -> int:
+        """
+        Get the number of simulation steps whose rendering was skipped because
+        the fixed-step loop had to catch up
+        """
+        return self.__skipped_renders
+
+    @property
+    def profiler(self) -> Optional[FrameProfiler]:
+        """
+        Get the frame profiler, or None when profiling is disabled
+        """
+        return self.__profiler
+
+    def enable_profiling(self, window: int = 300, overlay: bool = False,
+                         dump_path: Optional[str] = None) -> FrameProfiler:
+        """
+        Start recording frame timings over the last `window` frames.  With
+        overlay, the frame time percentiles are shown on the canvas; with
+        dump_path, the statistics are written there (JSON or .csv) on exit.
+        """
+        self.__profiler = FrameProfiler(window)
+        if overlay:
+            self.__overlay = self.__canvas.create_text(
+                4, 4, anchor="nw", fill="black", font=("Courier", 10))
+        if dump_path is not None:
+            atexit.register(self.__profiler.dump, dump_path)
+        return self.__profiler
+
+    def frame_stats(self) -> dict[str, dict[str, float]]:
+        """
+        Get rolling p50/p95/p99 of the recorded frame metrics
         """
-        Start the game
+        if self.__profiler is None:
+            return {}
+        return self.__profiler.stats()
+
+    def start(self, animate: bool = True) -> None:
+        """
+        Start the game.  A headless game only gets marked as started; it is
+        stepped by run().  With animate=False, a Tk game is not scheduled on
+        Tk's event loop either, and is driven by step() instead, e.g., by an
+        AsyncRunner.
         """
         if not self.__started:
             self.__started = True
-            self.animate()
+            self.__accumulator = 0
+            self.__last_time = time.perf_counter()
+            if animate and not self.is_headless:
+                self.animate()
+
+    def run(self, max_ticks: Optional[int] = None) -> int:
+        """
+        Drive a headless game from a plain loop until it stops or max_ticks
+        simulation steps have run, and return the number of steps run
+        """
+        if not self.is_headless:
+            raise RuntimeError("run() is only available to headless games")
+        self.start()
+        start_ticks = self.__ticks
+        while self.__started and (max_ticks is None
+                                  or self.__ticks - start_ticks < max_ticks):
+            self.step()
+        return self.__ticks - start_ticks
+
+    def step(self, render: bool = False) -> None:
+        """
+        Advance the game by exactly one simulation step, and render it if
+        requested
+        """
+        self.__update_elements()
+        if render:
+            self.__render_elements()
+        if self.__profiler is not None:
+            self.__profiler.end_frame(len(self.__game_elements))
+
+    def render(self) -> None:
+        """
+        Render the elements that changed since the last rendered frame, for
+        loops that drive the game with step()
+        """
+        self.__render_elements()
 
     def stop(self) -> None:
         """
@@ -158,8 +1069,145 @@ class Game(tk.Frame, ABC): # pylint: disable=too-many-ancestors
         """
         Update and render all game's elements
         """
+        jitter = None
+        if self.__expected_time is not None:
+            jitter = time.perf_counter() - self.__expected_time
+        if self.__fixed_step:
+            self.__animate_fixed_step()
+        else:
+            self.__update_elements()
+            self.__render_elements()
+            if self.__started:
+                self.__schedule_animate(self.__update_delay)
+        if self.__profiler is not None:
+            self.__profiler.end_frame(len(self.__game_elements), jitter)
+
+    def __schedule_animate(self, delay: int):
+        """
+        Schedule the next frame, remembering when it is expected to run
+        """
+        self.__expected_time = time.perf_counter() + delay / 1000
+        self.__frame.after(delay, self.animate)
+
+    def __animate_fixed_step(self):
+        """
+        Run as many fixed simulation steps as the elapsed time calls for, then
+        render the latest state once
+        """
+        step = self.__update_delay / 1000
+        now = time.perf_counter()
+        self.__accumulator += now - self.__last_time
+        self.__last_time = now
+
+        updates = 0
+        while (self.__started and self.__accumulator >= step
+               and updates < self.__max_updates_per_tick):
+            self.__update_elements()
+            self.__accumulator -= step
+            updates += 1
+
+        # too far behind to catch up; drop the backlog instead of spiralling
+        if self.__accumulator >= step:
+            self.__accumulator %= step
+
+        if updates:
+            self.__render_elements()
+            self.__skipped_renders += updates - 1
+
+        if self.__started:
+            self.__schedule_animate(max(1, round((step - self.__accumulator) * 1000)))
+
+    def __update_elements(self):
+        """
+        Run a single simulation step over all game's elements, after firing
+        the callbacks that became due on the simulated clock
+        """
+        self.__ticks += 1
+        self.__clock += self.__update_delay
+        self.__timers.advance()
+        self.__despawned = 0
+        profiler = self.__profiler
+        if profiler is None:
+            for element in self.__game_elements:
+                element.update()
+            self.post_update()
+            if self.__despawn_margin is not None:
+                self.__despawn_elements()
+            return
+        clock = time.perf_counter
         for element in self.__game_elements:
+            start = clock()
             element.update()
-            element.render()
-        if self.__started:
-            self.after(self.__update_delay, self.animate)
+            profiler.add("update:" + type(element).__name__, clock() - start)
+        start = clock()
+        self.post_update()
+        profiler.add("post_update", clock() - start)
+        if self.__despawn_margin is not None:
+            profiler.add("despawned", self.__despawn_elements())
+
+    def __despawn_elements(self) -> int:
+        """
+        Despawn the despawnable elements farther than the despawn margin
+        outside the viewport, and return how many were despawned
+        """
+        if self.__viewport is None:
+            return 0
+        x1, y1, x2, y2 = self.__viewport
+        margin = self.__despawn_margin
+        x1, y1, x2, y2 = x1 - margin, y1 - margin, x2 + margin, y2 + margin
+        strayed = [element for element in self.despawn_candidates()
+                   if not (x1 <= element.x <= x2 and y1 <= element.y <= y2)]
+        for element in strayed:
+            self.despawn(element)
+        self.__despawned = len(strayed)
+        self.__despawned_total += len(strayed)
+        return len(strayed)
+
+    def __is_culled(self, element: GameElement) -> bool:
+        """
+        Check whether rendering a changed element can be skipped because it
+        lies outside the viewport.  An element leaving the viewport is still
+        rendered once, so that its canvas item does not linger at the edge;
+        it stays dirty while culled, so it is rendered again when it returns.
+        """
+        culled = self.__culled
+        if not element.cullable or self.is_visible(element):
+            if culled:
+                culled.discard(element)
+            return False
+        if element in culled:
+            self.__culled_count += 1
+            return True
+        culled.add(element)
+        return False
+
+    def __render_elements(self):
+        """
+        Render the elements that changed since they were last rendered,
+        except for those culled outside the viewport
+        """
+        self.__culled_count = 0
+        cull = self.__viewport is not None
+        profiler = self.__profiler
+        if profiler is None:
+            for element in self.__game_elements:
+                if element.is_dirty and not (cull and self.__is_culled(element)):
+                    element.render()
+                    element.mark_clean()
+            self.__render_batch.flush()
+            return
+        clock = time.perf_counter
+        for element in self.__game_elements:
+            if element.is_dirty and not (cull and self.__is_culled(element)):
+                start = clock()
+                element.render()
+                element.mark_clean()
+                profiler.add("render:" + type(element).__name__, clock() - start)
+        if cull:
+            profiler.add("culled", self.__culled_count)
+        if self.__overlay is not None and self.__ticks % 15 == 0:
+            self.__render_batch.itemconfigure(self.__overlay, text=profiler.summary())
+            self.__render_batch.tag_raise(self.__overlay)
+        start = clock()
+        self.__render_batch.flush()
+        profiler.add("render:flush", clock() - start)
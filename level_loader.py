@@ -0,0 +1,198 @@
+"""
+The level_loader module reads the declarative stage files of the Turtle's
+Adventure game.  A stage file is a JSON document in the levels directory
+describing the waves of enemies spawned over time and home's phase timings:
+
+    {
+      "name": "default",
+      "palette": ["#0B2447", "#19376D"],
+      "waves": [
+        {"at": 100, "spawn": [SPAWN, ...]}
+      ],
+      "home": {"intro_ticks": 20, "reading_ticks": 60, "summon_every": 40,
+               "chase_after": 210, "summon": [SPAWN, ...]}
+    }
+
+where "at" is the game time in milliseconds and every SPAWN describes a
+group of enemies of one kind:
+
+    {"kind": "random_walk", "count": {"per_level": 10, "base": -5},
+     "size": [15, 20], "color": {"choice": "palette"},
+     "x": [90, 600], "y": [0, 500]}
+
+Values are given as a constant, [low, high] for a random integer,
+{"choice": [...]} or {"choice": "palette"} for a random pick, or
+{"range": [start, stop, step]} for a random integer from a range.  "count"
+is an integer or {"per_level": a, "base": b}, i.e., a * level + b.  With
+"around": "home", x and y are offsets from home, and "positions" lists one
+[x, y] per enemy instead of count, x and y.  Stalkers also take a "timer",
+the steps between their teleports; other kinds take no further settings.
+
+Stages are parsed on first use and cached, so creating many games only reads
+a stage file once.
+"""
+import json
+import os
+import random
+from functools import lru_cache
+from typing import Any, Callable, Final, Optional
+
+LEVELS_DIR: Final = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+
+Value = Callable[[random.Random], Any]
+
+# the settings every spawn description may give
+COMMON_SETTINGS: Final = frozenset({"kind", "count", "size", "color", "around",
+                                    "positions", "x", "y"})
+# the settings specific to each enemy kind, all of them required, by the kind
+# names of turtle_adventure.SPAWN_KINDS
+KIND_SETTINGS: Final[dict[str, frozenset[str]]] = {
+    "random_walk": frozenset(),
+    "chasing": frozenset(),
+    "fencing": frozenset(),
+    "stalker": frozenset({"timer"}),
+}
+
+
+def compile_value(raw: Any, palette: list[str]) -> Value:
+    """
+    Turn a value description into a function drawing the value from a random
+    number generator
+    """
+    if isinstance(raw, list):
+        low, high = raw
+        return lambda rng: rng.randint(low, high)
+    if isinstance(raw, dict):
+        if "choice" in raw:
+            options = palette if raw["choice"] == "palette" else raw["choice"]
+            return lambda rng: rng.choice(options)
+        if "range" in raw:
+            start, stop, step = raw["range"]
+            return lambda rng: rng.randrange(start, stop, step)
+        raise ValueError(f"unknown value description: {raw}")
+    return lambda rng: raw
+
+
+def candidates(raw: Any, palette: list[str]) -> list:
+    """
+    List every value a value description can produce, e.g., to prepare
+    assets ahead of time
+    """
+    if isinstance(raw, list):
+        low, high = raw
+        return list(range(low, high + 1))
+    if isinstance(raw, dict):
+        if "choice" in raw:
+            return list(palette if raw["choice"] == "palette" else raw["choice"])
+        if "range" in raw:
+            return list(range(*raw["range"]))
+        raise ValueError(f"unknown value description: {raw}")
+    return [raw]
+
+
+class SpawnSpec:
+    """
+    A group of enemies of one kind to be spawned together
+    """
+
+    def __init__(self, raw: dict, palette: list[str]):
+        self.kind: str = raw["kind"]
+        self.__check(raw)
+        count = raw.get("count", 1)
+        if isinstance(count, dict):
+            self.per_level: int = count.get("per_level", 0)
+            self.base: int = count.get("base", 0)
+        else:
+            self.per_level, self.base = 0, count
+        self.size: Value = compile_value(raw.get("size", 20), palette)
+        self.color: Value = compile_value(raw.get("color", "black"), palette)
+        # every size and color the group's enemies may get
+        self.sizes: list = candidates(raw.get("size", 20), palette)
+        self.colors: list = candidates(raw.get("color", "black"), palette)
+        self.timer: Optional[Value] = None
+        if "timer" in raw:
+            self.timer = compile_value(raw["timer"], palette)
+        self.around: Optional[str] = raw.get("around")
+        self.positions: Optional[list[tuple[float, float]]] = None
+        if "positions" in raw:
+            self.positions = [(x, y) for x, y in raw["positions"]]
+        self.x: Value = compile_value(raw.get("x", 0), palette)
+        self.y: Value = compile_value(raw.get("y", 0), palette)
+
+    @staticmethod
+    def __check(raw: dict) -> None:
+        """
+        Check that the spawn description gives the settings its kind of
+        enemy takes, so that a bad stage fails when it is loaded rather than
+        when the enemies spawn
+        """
+        kind = raw["kind"]
+        if kind not in KIND_SETTINGS:
+            raise ValueError(f"unknown enemy kind: {kind}")
+        unknown = raw.keys() - COMMON_SETTINGS - KIND_SETTINGS[kind]
+        if unknown:
+            raise ValueError(f"{kind} enemies take no {', '.join(sorted(unknown))} setting")
+        missing = KIND_SETTINGS[kind] - raw.keys()
+        if missing:
+            raise ValueError(f"{kind} enemies need a {', '.join(sorted(missing))} setting")
+
+    def count(self, level: int) -> int:
+        """
+        Get the number of enemies spawned at the given level
+        """
+        if self.positions is not None:
+            return len(self.positions)
+        return max(self.per_level * level + self.base, 0)
+
+
+class Wave:
+    """
+    The enemies spawned at one point in game time
+    """
+
+    def __init__(self, raw: dict, palette: list[str]):
+        self.time: int = raw["at"]
+        self.spawns: list[SpawnSpec] = [SpawnSpec(spawn, palette)
+                                        for spawn in raw["spawn"]]
+
+
+class HomeSettings:
+    """
+    The timings of home's phases, in simulation steps, and the enemies home
+    summons during the second phase: the second phase starts intro_ticks
+    after the player first approaches home, the summons start reading_ticks
+    after the second phase text is shown and repeat every summon_every, and
+    home chases the player chase_after steps after the summons started
+    """
+
+    def __init__(self, raw: dict, palette: list[str]):
+        self.intro_ticks: int = raw.get("intro_ticks", 20)
+        self.reading_ticks: int = raw.get("reading_ticks", 60)
+        self.summon_every: int = raw.get("summon_every", 40)
+        self.chase_after: int = raw.get("chase_after", 210)
+        self.summon: list[SpawnSpec] = [SpawnSpec(spawn, palette)
+                                        for spawn in raw.get("summon", [])]
+
+
+class Stage:
+    """
+    A parsed stage file: its waves ordered by time, and home's settings
+    """
+
+    def __init__(self, raw: dict):
+        palette = raw.get("palette", [])
+        self.name: str = raw.get("name", "")
+        self.waves: list[Wave] = sorted((Wave(wave, palette) for wave in raw.get("waves", [])),
+                                        key=lambda wave: wave.time)
+        self.home: HomeSettings = HomeSettings(raw.get("home", {}), palette)
+
+
+@lru_cache(maxsize=None)
+def load_stage(name: str) -> Stage:
+    """
+    Load a stage by its name in the levels directory, or by the path of its
+    file
+    """
+    path = name if name.endswith(".json") else os.path.join(LEVELS_DIR, name + ".json")
+    with open(path, encoding="utf-8") as file:
+        return Stage(json.load(file))
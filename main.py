@@ -1,21 +1,96 @@
 """
 The main module, responsible for creating a root window containing the game's
 main component.
+
+Usage:
+    python main.py [--level LEVEL] [--stage STAGE] [--seed SEED]
+                   [--record SESSION_FILE] [--asyncio] [--sprites]
+                   [--despawn-margin PIXELS] [--fixed-step]
+                   [--max-updates-per-tick N] [--startup-times]
 """
+import time
+
+STARTED = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import argparse
+import sys
 from typing import Final
-import tkinter as tk
-from turtle_adventure import TurtleAdventureGame
 
 SCREEN_WIDTH: Final = 800
 SCREEN_HEIGHT: Final = 500
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turtle's Adventure")
+    # This game is pretty hard recommend level is 2
+    parser.add_argument("--level", type=int, default=2)
+    parser.add_argument("--stage", default="default",
+                        help="stage name in the levels directory, or a stage file")
+    parser.add_argument("--seed", type=int, help="seed of the game's randomness")
+    parser.add_argument("--record", metavar="SESSION_FILE",
+                        help="record the session for replay.py")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="drive the game from an asyncio event loop")
+    parser.add_argument("--sprites", action="store_true",
+                        help="draw the game elements as cached sprite images")
+    parser.add_argument("--despawn-margin", type=float, metavar="PIXELS",
+                        help="despawn enemies this far outside the screen")
+    parser.add_argument("--fixed-step", action="store_true",
+                        help="keep the simulation speed constant under load, "
+                             "dropping rendered frames instead")
+    parser.add_argument("--max-updates-per-tick", type=int, default=5, metavar="N",
+                        help="simulation steps run at most before rendering "
+                             "when the fixed-step loop falls behind")
+    parser.add_argument("--startup-times", action="store_true",
+                        help="report the import, window creation and first "
+                             "frame times, then quit")
+    args = parser.parse_args()
+
+    # load tkinter and the game only once the command line is known to be
+    # valid; the turtle module is loaded later by the player, if at all
+    # pylint: disable=import-outside-toplevel
+    import tkinter as tk
+    from turtle_adventure import TurtleAdventureGame
+    imported = time.perf_counter()
+
     root = tk.Tk()
     root.title("Turtle's Adventure")
     root.geometry(f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}")
     root.resizable(False, False)  # games usually have fixed window size
     root.attributes('-topmost', True)
-    # This game is pretty hard recommend level is 2
-    game = TurtleAdventureGame(root, SCREEN_WIDTH, SCREEN_HEIGHT, level=2)
-    game.start()
-    root.mainloop()
+    game = TurtleAdventureGame(root, SCREEN_WIDTH, SCREEN_HEIGHT,
+                               level=args.level, seed=args.seed, stage=args.stage,
+                               sprites=args.sprites,
+                               despawn_margin=args.despawn_margin,
+                               fixed_step=args.fixed_step,
+                               max_updates_per_tick=args.max_updates_per_tick)
+    created = time.perf_counter()
+
+    if args.startup_times:
+        # starting the game renders the first frame, and updating the window
+        # puts it on the screen
+        game.start()
+        root.update()
+        first_frame = time.perf_counter()
+        game.stop()
+        root.destroy()
+        print(f"import       {(imported - STARTED) * 1000:8.1f} ms\n"
+              f"window       {(created - imported) * 1000:8.1f} ms\n"
+              f"first frame  {(first_frame - created) * 1000:8.1f} ms\n"
+              f"total        {(first_frame - STARTED) * 1000:8.1f} ms")
+        sys.exit(0)
+
+    session = None
+    if args.record:
+        from replay import record
+        session = record(game)
+    if args.asyncio:
+        import asyncio
+        from async_runner import AsyncRunner
+        asyncio.run(AsyncRunner(game, args.max_updates_per_tick).run())
+    else:
+        game.start()
+        root.mainloop()
+    if session is not None:
+        session.end_tick = game.ticks
+        session.save(args.record)
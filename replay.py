@@ -0,0 +1,165 @@
+"""
+The replay module records the waypoint clicks of a Turtle's Adventure session
+into a compact binary log, and replays a logged session headless at maximum
+speed.  Since all game randomness comes from the game's seeded generator and
+all game timers run on the simulation clock, a replay re-runs the exact
+session, e.g., to profile it offline.
+
+Usage:
+    python replay.py SESSION_FILE [--profile] [--stats-output FILE]
+"""
+import argparse
+import struct
+import sys
+from typing import Final, Optional
+from turtle_adventure import TurtleAdventureGame
+
+MAGIC: Final = b"TADV"
+VERSION: Final = 4
+
+# magic, version, seed, level, screen width, screen height, flags, end tick,
+# despawn margin, followed by the length and the name of the stage
+HEADER: Final = struct.Struct("<4sBQHHHBId")
+# tick, x, y, whether the waypoint was queued after the others
+CLICK: Final = struct.Struct("<Ihh?")
+
+FLAG_BATCHED: Final = 1
+# the game despawned enemies outside the screen
+FLAG_DESPAWN: Final = 2
+
+
+class InputLog:
+    """
+    The settings and clicks of a game session, each click tagged with the
+    number of simulation steps run before it happened
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, seed: int, level: int, screen_width: int,
+                 screen_height: int, batched: bool = False, stage: str = "default",
+                 despawn_margin: Optional[float] = None):
+        self.seed: int = seed
+        self.level: int = level
+        self.screen_width: int = screen_width
+        self.screen_height: int = screen_height
+        self.batched: bool = batched
+        self.stage: str = stage
+        self.despawn_margin: Optional[float] = despawn_margin
+        self.end_tick: int = 0
+        self.clicks: list[tuple[int, int, int, bool]] = []
+
+    def add(self, tick: int, x: float, y: float, append: bool = False) -> None:
+        """
+        Record a click at the given tick
+        """
+        self.clicks.append((tick, round(x), round(y), append))
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the log into its binary form
+        """
+        flags = FLAG_BATCHED if self.batched else 0
+        if self.despawn_margin is not None:
+            flags |= FLAG_DESPAWN
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.level,
+                             self.screen_width, self.screen_height, flags,
+                             self.end_tick, self.despawn_margin or 0)
+        stage = self.stage.encode()
+        header += bytes((len(stage),)) + stage
+        return header + b"".join(CLICK.pack(*click) for click in self.clicks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "InputLog":
+        """
+        Decode a log from its binary form
+        """
+        (magic, version, seed, level, screen_width, screen_height, flags,
+         end_tick, despawn_margin) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a Turtle's Adventure input log")
+        length = data[HEADER.size]
+        offset = HEADER.size + 1 + length
+        log = cls(seed, level, screen_width, screen_height,
+                  batched=bool(flags & FLAG_BATCHED),
+                  stage=data[HEADER.size + 1:offset].decode(),
+                  despawn_margin=despawn_margin if flags & FLAG_DESPAWN else None)
+        log.end_tick = end_tick
+        log.clicks = list(CLICK.iter_unpack(data[offset:]))
+        return log
+
+    def save(self, path: str) -> None:
+        """
+        Write the log to a file
+        """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "InputLog":
+        """
+        Read a log from a file
+        """
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+def record(game: TurtleAdventureGame) -> InputLog:
+    """
+    Start recording the clicks of the game, and return the log they go to
+    """
+    game.input_log = InputLog(game.seed, game.level, game.screen_width,
+                              game.screen_height, game.batched, game.stage_name,
+                              game.despawn_margin)
+    return game.input_log
+
+
+def replay(log: InputLog, profile: bool = False) -> TurtleAdventureGame:
+    """
+    Re-run a logged session headless until the game ends or reaches the
+    logged end tick, and return the game
+    """
+    game = TurtleAdventureGame(None, log.screen_width, log.screen_height,
+                               level=log.level, batched=log.batched,
+                               seed=log.seed, stage=log.stage,
+                               despawn_margin=log.despawn_margin)
+    if profile:
+        game.enable_profiling(window=max(log.end_tick, 1))
+    # a stable sort keeps the order of the clicks of the same step
+    clicks = sorted(log.clicks, key=lambda click: click[0])
+    index = 0
+    game.start()
+    while game.is_started and (not log.end_tick or game.ticks < log.end_tick):
+        while index < len(clicks) and clicks[index][0] <= game.ticks:
+            _, x, y, append = clicks[index]
+            game.click(x, y, append)
+            index += 1
+        game.step()
+    return game
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Replay a session file from the command line, and return the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("session", help="input log written by main.py --record")
+    parser.add_argument("--profile", action="store_true",
+                        help="print frame time percentiles of the replay")
+    parser.add_argument("--stats-output",
+                        help="write the profile to a JSON or .csv file")
+    args = parser.parse_args(argv)
+
+    log = InputLog.load(args.session)
+    game = replay(log, profile=args.profile or args.stats_output is not None)
+    print(f"replayed {game.ticks} ticks, {len(log.clicks)} clicks, "
+          f"home second phase: {game.home.second_phase}")
+    if game.profiler is not None:
+        for metric, values in game.frame_stats().items():
+            print(metric, " ".join(f"{name} {value:.6g}" for name, value in values.items()))
+        if args.stats_output:
+            game.profiler.dump(args.stats_output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+The snapshot module saves the full state of a running Turtle's Adventure game
+into a compact binary snapshot and restores it, e.g., to rewind a game or to
+fork it for a search-based bot.  A snapshot holds the simulation clock, the
+player, the planned waypoint path, home's phase state, every enemy and the state of the
+game's random number generators.
+"""
+import struct
+from typing import Final, Optional
+from turtle_adventure import (TurtleAdventureGame, Enemy, StalkerEnemy, ENEMY_KINDS,
+                              OUTCOMES)
+
+MAGIC: Final = b"TASN"
+VERSION: Final = 5
+
+# every enemy record has room for this many state fields
+MAX_FIELDS: Final = 4
+
+# magic, version, ticks, clock, outcome, next wave, colors, enemies
+HEADER: Final = struct.Struct("<4sBIIBHBI")
+# player x, y, heading, number of waypoint path segments, followed by one
+# SEGMENT each
+PLAYER: Final = struct.Struct("<dddI")
+# waypoint x, y, step x, y, heading, steps left
+SEGMENT: Final = struct.Struct("<5dI")
+# world context: player x, y, velocity x, y, heading, waypoint offset x, y,
+# waypoint active
+WORLD: Final = struct.Struct("<7d?")
+# home x, y, size, next phase change and summon steps, x speed, y speed,
+# intro, begin, move, second phase
+HOME: Final = struct.Struct("<ddqqqddq???")
+# kind, color index, size, x, y, state fields
+ENEMY: Final = struct.Struct(f"<BBddd{MAX_FIELDS}d")
+# Mersenne Twister state: 625 words, then whether a gauss value is cached
+RANDOM: Final = struct.Struct("<625I?d")
+# PCG64 state and increment as 64-bit halves, has_uint32, uinteger
+NUMPY_RANDOM: Final = struct.Struct("<?4QBI")
+# number of pending timed events, followed by one EVENT each
+EVENTS: Final = struct.Struct("<I")
+# event source: home's phase change, home's summon, the enemy generator, or
+# an enemy by its index plus FIRST_ENEMY_EVENT
+EVENT: Final = struct.Struct("<I")
+FIRST_ENEMY_EVENT: Final = 3
+WORLD_FIELDS: Final = ("player_x", "player_y", "velocity_x", "velocity_y",
+                       "heading", "waypoint_dx", "waypoint_dy", "waypoint_active")
+
+
+def snapshot(game: TurtleAdventureGame) -> bytes:
+    """
+    Capture the state of the game
+    """
+    if game.enemy_batches is not None:
+        game.enemy_batches.sync()
+    colors: list[str] = []
+    color_codes: dict[str, int] = {}
+    records = []
+    kind_codes = {kind: code for code, kind in enumerate(ENEMY_KINDS)}
+    for enemy in game.enemies:
+        code = color_codes.get(enemy.color)
+        if code is None:
+            code = color_codes[enemy.color] = len(colors)
+            colors.append(enemy.color)
+        fields = [getattr(enemy, name) for name in enemy.state_fields]
+        fields += [0] * (MAX_FIELDS - len(fields))
+        records.append(ENEMY.pack(kind_codes[type(enemy)], code, enemy.size,
+                                  enemy.x, enemy.y, *fields))
+
+    player, home = game.player, game.home
+    path = game.waypoint.path
+    parts = [
+        HEADER.pack(MAGIC, VERSION, game.ticks, game.clock,
+                    OUTCOMES.index(game.outcome), game.enemy_generator.wave,
+                    len(colors), len(records)),
+        PLAYER.pack(player.x, player.y, player.heading, len(path)),
+        *(SEGMENT.pack(*segment) for segment in path),
+        WORLD.pack(*(getattr(game.world, name) for name in WORLD_FIELDS)),
+        HOME.pack(home.x, home.y, home.size, home.phase_at, home.summon_at,
+                  home.x_speed, home.y_speed, home.intro, home.begin, home.move,
+                  home.second_phase),
+    ]
+    for color in colors:
+        encoded = color.encode()
+        parts.append(bytes((len(encoded),)) + encoded)
+    parts += records
+
+    _, words, gauss = game.rng.getstate()
+    parts.append(RANDOM.pack(*words, gauss is not None, gauss or 0))
+    parts.append(_pack_numpy_random(game))
+    parts.append(_pack_events(game))
+    return b"".join(parts)
+
+
+def _event_sources(game: TurtleAdventureGame) -> list:
+    """
+    List the pending timed event ids of home, the enemy generator and the
+    enemies, in the order of the event source indices, together with the
+    functions scheduling them again
+    """
+    home, generator = game.home, game.enemy_generator
+    sources = [(home.phase_call, home.schedule_phase),
+               (home.summon_call, home.schedule_summon),
+               (generator.call, generator.schedule)]
+    sources += [(enemy.timer_call, enemy.schedule_events) for enemy in game.enemies]
+    return sources
+
+
+def _pack_events(game: TurtleAdventureGame) -> bytes:
+    """
+    Pack the order in which the pending timed events were scheduled, which
+    is the order events due on the same step run in
+    """
+    pending = sorted((call, index) for index, (call, _) in enumerate(_event_sources(game))
+                     if game.call_due(call) is not None)
+    return EVENTS.pack(len(pending)) + b"".join(EVENT.pack(index) for _, index in pending)
+
+
+def _pack_numpy_random(game: TurtleAdventureGame) -> bytes:
+    """
+    Pack the state of the batched enemies' generator, if there is one
+    """
+    if game.enemy_batches is None:
+        return NUMPY_RANDOM.pack(False, 0, 0, 0, 0, 0, 0)
+    state = game.enemy_batches.rng.bit_generator.state
+    mask = (1 << 64) - 1
+    pcg = state["state"]
+    return NUMPY_RANDOM.pack(True, pcg["state"] >> 64, pcg["state"] & mask,
+                             pcg["inc"] >> 64, pcg["inc"] & mask,
+                             state["has_uint32"], state["uinteger"])
+
+
+def restore(game: TurtleAdventureGame, data: bytes) -> None:
+    """
+    Put the game into the state captured by a snapshot.  The game must have
+    the same level, stage and settings as the one the snapshot was taken from.
+    """
+    (magic, version, ticks, clock, outcome, wave, color_count,
+     enemy_count) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a Turtle's Adventure snapshot")
+    offset = HEADER.size
+
+    game.delete_all_enemy(Enemy)
+    # timed events are scheduled relative to the restored clock
+    game.reset_clock(ticks, clock)
+
+    player_x, player_y, heading, segment_count = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    game.player.x, game.player.y = player_x, player_y
+    game.player.heading = heading
+    game.waypoint.path = list(SEGMENT.iter_unpack(
+        data[offset:offset + segment_count * SEGMENT.size]))
+    offset += segment_count * SEGMENT.size
+    for name, value in zip(WORLD_FIELDS, WORLD.unpack_from(data, offset)):
+        setattr(game.world, name, value)
+    offset += WORLD.size
+
+    home = game.home
+    (home.x, home.y, home.size, home.phase_at, home.summon_at, home.x_speed,
+     home.y_speed, home.intro, home.begin, home.move,
+     home.second_phase) = HOME.unpack_from(data, offset)
+    offset += HOME.size
+    home.schedule_events()
+
+    colors = []
+    for _ in range(color_count):
+        length = data[offset]
+        colors.append(data[offset + 1:offset + 1 + length].decode())
+        offset += 1 + length
+
+    enemies = []
+    for kind_code, color_code, size, x, y, *fields in ENEMY.iter_unpack(
+            data[offset:offset + enemy_count * ENEMY.size]):
+        kind = ENEMY_KINDS[kind_code]
+        if kind is StalkerEnemy:
+            enemy = StalkerEnemy(game, size, colors[color_code], int(fields[3]))
+        else:
+            enemy = kind(game, size, colors[color_code])
+        enemy.x, enemy.y = x, y
+        for name, value in zip(kind.state_fields, fields):
+            setattr(enemy, name, type(getattr(enemy, name))(value))
+        enemies.append(enemy)
+    offset += enemy_count * ENEMY.size
+    for enemy in enemies:
+        game.add_enemy(enemy)
+
+    # enemy constructors draw random numbers, so the generators are restored
+    # only after the enemies have been created
+    *words, has_gauss, gauss = RANDOM.unpack_from(data, offset)
+    offset += RANDOM.size
+    game.rng.setstate((3, tuple(words), gauss if has_gauss else None))
+    _unpack_numpy_random(game, data, offset)
+    offset += NUMPY_RANDOM.size
+
+    game.outcome = OUTCOMES[outcome]
+    game.enemy_generator.wave = wave
+    # schedule the pending events again in their original order
+    sources = _event_sources(game)
+    (count,) = EVENTS.unpack_from(data, offset)
+    offset += EVENTS.size
+    for (index,) in EVENT.iter_unpack(data[offset:offset + count * EVENT.size]):
+        sources[index][1]()
+
+
+def _unpack_numpy_random(game: TurtleAdventureGame, data: bytes, offset: int) -> None:
+    """
+    Restore the state of the batched enemies' generator, if there is one
+    """
+    (present, state_high, state_low, inc_high, inc_low, has_uint32,
+     uinteger) = NUMPY_RANDOM.unpack_from(data, offset)
+    if present and game.enemy_batches is not None:
+        game.enemy_batches.rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {"state": state_high << 64 | state_low,
+                      "inc": inc_high << 64 | inc_low},
+            "has_uint32": has_uint32,
+            "uinteger": uinteger,
+        }
+
+
+def fork(game: TurtleAdventureGame, parent=None,
+         data: Optional[bytes] = None) -> TurtleAdventureGame:
+    """
+    Create a new game, headless unless a parent widget is given, in the state
+    of the given game or of the given snapshot of it
+    """
+    copy = TurtleAdventureGame(parent, game.screen_width, game.screen_height,
+                               level=game.level, batched=game.batched,
+                               max_enemies=game.enemy_pool.max_live,
+                               seed=game.seed, stage=game.stage_name,
+                               despawn_margin=game.despawn_margin)
+    restore(copy, snapshot(game) if data is None else data)
+    return copy
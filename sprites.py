@@ -0,0 +1,207 @@
+"""
+The sprites module renders the Turtle's Adventure game elements as images.
+Every sprite is rasterized once into a tkinter PhotoImage and kept in a cache
+keyed by shape, size and color, so that each element is drawn as a single
+canvas image item that only has to be moved with coords, and the player needs
+no turtle screen updates at all.
+
+The repository ships no sprite art, so the sprites are rasterized from the
+same shapes the canvas items used to draw: ovals and boxes for the enemies,
+a frame for home and turtle's "turtle" polygon for the player, pre-rotated
+in steps of HEADING_STEP degrees.  The waypoint path stays a canvas line.
+"""
+import math
+import tkinter as tk
+from typing import Callable, Final, Iterable, Optional
+
+# the outline of turtle's "turtle" shape, heading towards +y
+TURTLE_SHAPE: Final = ((0, 16), (-2, 14), (-1, 10), (-4, 7), (-7, 9), (-9, 8),
+                       (-6, 5), (-7, 1), (-5, -3), (-8, -6), (-6, -8), (-4, -5),
+                       (0, -7), (4, -5), (6, -8), (8, -6), (5, -3), (7, 1),
+                       (6, 5), (9, 8), (7, 9), (4, 7), (1, 10), (2, 14))
+TURTLE_SIZE: Final = 35
+HEADING_STEP: Final = 10
+
+# the color of a pixel at an offset from the sprite's center, or None
+Painter = Callable[[float, float], Optional[str]]
+
+
+def oval(size: int, fill: str, outline: str = "black", width: float = 1) -> Painter:
+    """
+    Paint a filled circle with an outline
+    """
+    radius = size / 2
+
+    def paint(dx: float, dy: float) -> Optional[str]:
+        distance = math.hypot(dx, dy)
+        if distance > radius:
+            return None
+        return outline if distance > radius - width else fill
+    return paint
+
+
+def box(size: int, fill: Optional[str], outline: str = "black", width: float = 2) -> Painter:
+    """
+    Paint a square with an outline; without a fill, only the outline
+    """
+    half = size / 2
+
+    def paint(dx: float, dy: float) -> Optional[str]:
+        edge = half - max(abs(dx), abs(dy))
+        if edge < 0:
+            return None
+        return outline if edge < width else fill
+    return paint
+
+
+def turtle(heading: float, color: str) -> Painter:
+    """
+    Paint turtle's "turtle" shape turned towards the given heading in
+    degrees, measured the way the player's heading is
+    """
+    angle = math.radians(heading)
+    cos, sin = math.cos(angle), math.sin(angle)
+    # shape y runs along the heading, shape x across it
+    polygon = [(y * cos - x * sin, y * sin + x * cos) for x, y in TURTLE_SHAPE]
+    edges = list(zip(polygon, polygon[1:] + polygon[:1]))
+
+    def paint(dx: float, dy: float) -> Optional[str]:
+        inside = False
+        for (x1, y1), (x2, y2) in edges:
+            if (y1 > dy) != (y2 > dy) and dx < (x2 - x1) * (dy - y1) / (y2 - y1) + x1:
+                inside = not inside
+        return color if inside else None
+    return paint
+
+
+def turtle_keys(color: str = "green") -> list[tuple[str, int, str]]:
+    """
+    List the cache keys of the player's sprites for every heading
+    """
+    return [("turtle", heading, color) for heading in range(0, 360, HEADING_STEP)]
+
+
+def spans(painter: Painter, width: int, height: int) -> list[tuple[str, int, int, int]]:
+    """
+    Rasterize a painter into runs of equally colored pixels: (color, row,
+    first column, column after the last)
+    """
+    runs = []
+    for row in range(height):
+        dy = row + 0.5 - height / 2
+        start, current = 0, None
+        for column in range(width + 1):
+            color = painter(column + 0.5 - width / 2, dy) if column < width else None
+            if color != current:
+                if current is not None:
+                    runs.append((current, row, start, column))
+                start, current = column, color
+    return runs
+
+
+class SpriteCache:
+    """
+    A cache of sprite images shared by all elements of a game, keyed by
+    (shape, size, color); the size of a turtle sprite is its heading.  Sprites
+    are created on first use, or ahead of time by preload(), which rasterizes a
+    few sprites whenever Tk is idle so that startup is not delayed.
+    """
+
+    def __init__(self, master: tk.Misc, preload_chunk: int = 4):
+        self.__master: tk.Misc = master
+        self.__images: dict[tuple, tk.PhotoImage] = {}
+        self.__queue: list[tuple] = []
+        self.__preload_chunk: int = preload_chunk
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__images)
+
+    @property
+    def hits(self) -> int:
+        """
+        Get the number of sprites served from the cache
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Get the number of sprites that had to be rasterized on demand
+        """
+        return self.__misses
+
+    @property
+    def pending(self) -> int:
+        """
+        Get the number of sprites still waiting to be preloaded
+        """
+        return len(self.__queue)
+
+    @staticmethod
+    def __painter(key: tuple) -> tuple[Painter, int]:
+        """
+        Get the painter and the image size of a sprite key
+        """
+        shape, size, color = key
+        if shape == "oval":
+            return oval(size, color), size
+        if shape == "box":
+            return box(size, color), size
+        if shape == "frame":
+            return box(size, None, outline=color), size
+        if shape == "turtle":
+            return turtle(size, color), TURTLE_SIZE
+        raise ValueError(f"unknown sprite shape: {shape}")
+
+    def __create(self, key: tuple) -> tk.PhotoImage:
+        """
+        Rasterize a sprite into a new image
+        """
+        painter, size = self.__painter(key)
+        image = tk.PhotoImage(master=self.__master, width=size, height=size)
+        for color, row, first, last in spans(painter, size, size):
+            image.put(color, to=(first, row, last, row + 1))
+        self.__images[key] = image
+        return image
+
+    def get(self, shape: str, size: int, color: str) -> tk.PhotoImage:
+        """
+        Get the sprite of the given shape, size and color
+        """
+        key = (shape, round(size), color)
+        image = self.__images.get(key)
+        if image is None:
+            self.__misses += 1
+            return self.__create(key)
+        self.__hits += 1
+        return image
+
+    def turtle(self, heading: float, color: str = "green") -> tk.PhotoImage:
+        """
+        Get the player's sprite for the given heading, rounded to HEADING_STEP
+        degrees
+        """
+        return self.get("turtle", round(heading / HEADING_STEP) * HEADING_STEP % 360, color)
+
+    def preload(self, keys: Iterable[tuple[str, int, str]]) -> None:
+        """
+        Rasterize the sprites of the given (shape, size, color) keys in the
+        background, a few at a time whenever Tk is idle
+        """
+        start = not self.__queue
+        self.__queue.extend((shape, round(size), color) for shape, size, color in keys)
+        if start and self.__queue:
+            self.__master.after_idle(self.__preload_some)
+
+    def __preload_some(self) -> None:
+        """
+        Rasterize the next few queued sprites
+        """
+        for key in self.__queue[:self.__preload_chunk]:
+            if key not in self.__images:
+                self.__create(key)
+        del self.__queue[:self.__preload_chunk]
+        if self.__queue:
+            self.__master.after_idle(self.__preload_some)
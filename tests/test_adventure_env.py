@@ -0,0 +1,99 @@
+"""
+Tests of adventure_env: observations, rewards and episode ends of the single
+and the vector environment.
+"""
+import math
+import pytest
+from adventure_env import TurtleAdventureEnv, VectorTurtleAdventureEnv
+from turtle_adventure import ENEMY_KINDS
+
+np = pytest.importorskip("numpy")
+
+
+def test_reset_observes_the_new_game():
+    env = TurtleAdventureEnv(level=2, max_enemies=8)
+    obs, info = env.reset(seed=3)
+    assert info == {"ticks": 0, "outcome": None}
+    assert obs["player"].tolist() == [50, 250, 0]
+    assert obs["home"].tolist() == [700, 250, 20]
+    assert obs["enemies"].shape == (len(ENEMY_KINDS), 8, 3)
+    assert not obs["counts"].any()
+
+
+def test_observations_are_refilled_in_place():
+    env = TurtleAdventureEnv(level=2, max_enemies=2)
+    obs, _ = env.reset(seed=3)
+    player = obs["player"]
+    while not obs["counts"].any():
+        obs, _, _, _, _ = env.step((math.nan, math.nan))
+    assert obs["player"] is player
+    counts = obs["counts"]
+    enemies = env.game.enemies
+    assert counts.sum() == len(enemies)
+    shown = np.minimum(counts, 2)
+    for kind in range(len(ENEMY_KINDS)):
+        assert obs["enemies"][kind, :shown[kind], 2].all()
+        assert not obs["enemies"][kind, shown[kind]:].any()
+
+
+def test_episode_ends_with_the_game():
+    env = TurtleAdventureEnv(level=3, step_reward=0.01, lose_reward=-1.0)
+    env.reset(seed=1)
+    total, steps = 0.0, 0
+    while True:
+        _, reward, terminated, truncated, info = env.step((50, 250))
+        total += reward
+        steps += 1
+        if terminated or truncated:
+            break
+    assert terminated and not truncated
+    assert info["outcome"] == "lose"
+    assert total == pytest.approx(0.01 * steps - 1.0)
+    with pytest.raises(RuntimeError):
+        env.step((50, 250))
+
+
+def test_episode_is_truncated():
+    env = TurtleAdventureEnv(level=1, max_ticks=5, frame_skip=2)
+    env.reset(seed=1)
+    results = [env.step((50, 250))[2:4] for _ in range(3)]
+    assert results == [(False, False), (False, False), (False, True)]
+    assert env.game.ticks == 6
+
+
+def test_heading_actions_move_the_waypoint():
+    env = TurtleAdventureEnv(action="heading")
+    env.reset(seed=1)
+    env.step(90.0)
+    assert env.game.waypoint.path[0][:2] == pytest.approx((50, 300))
+    with pytest.raises(ValueError):
+        TurtleAdventureEnv(action="teleport")
+
+
+def test_vector_env_rows_match_single_games():
+    vector = VectorTurtleAdventureEnv(3, level=2, batched=False, max_enemies=16)
+    obs, _ = vector.reset(seed=10)
+    singles = [TurtleAdventureEnv(level=2, max_enemies=16) for _ in range(3)]
+    for index, env in enumerate(singles):
+        env.reset(seed=10 + index)
+    actions = np.array([[300, 100], [400, 400], [700, 250]])
+    for _ in range(10):
+        obs, _, _, _, info = vector.step(actions)
+        for index, env in enumerate(singles):
+            single, *_ = env.step(actions[index])
+            for name in ("player", "home", "enemies", "counts"):
+                assert np.array_equal(obs[name][index], single[name])
+    assert info["ticks"].tolist() == [10, 10, 10]
+
+
+def test_vector_env_restarts_finished_games_with_the_next_seeds():
+    vector = VectorTurtleAdventureEnv(2, level=3, batched=False, max_ticks=40)
+    vector.reset(seed=5)
+    seeds = set()
+    for _ in range(120):
+        _, _, terminated, truncated, _ = vector.step(np.array([[50, 250], [50, 250]]))
+        assert not (terminated & truncated).any()
+        seeds.update(game.seed for game in vector.games)
+    assert min(seeds) == 5
+    assert len(seeds) > 2
+    assert seeds == set(range(5, 5 + len(seeds)))
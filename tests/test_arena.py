@@ -0,0 +1,75 @@
+"""
+Tests of arena: lanes play like standalone games, finished games are
+recorded and restarted, and the JSON lines protocol drives the arena.
+"""
+import io
+import json
+import pytest
+from arena import Arena, serve
+from turtle_adventure import TurtleAdventureGame
+
+pytest.importorskip("numpy")
+
+
+def positions(game: TurtleAdventureGame) -> list:
+    """
+    List the positions of the game's enemies
+    """
+    return sorted((type(enemy).__name__, round(enemy.x, 6), round(enemy.y, 6))
+                  for enemy in game.enemies)
+
+
+def test_lanes_play_like_standalone_games():
+    arena = Arena(3, level=5, seed=100)
+    for tick in range(20):
+        if tick % 7 == 0:
+            for lane in arena.lanes:
+                arena.submit(lane.index, 100 + 3 * tick, 100 + 5 * lane.index)
+        arena.step()
+    for lane in arena.lanes:
+        game = TurtleAdventureGame(None, 800, 500, level=5, seed=100 + lane.index,
+                                   batched=True)
+        game.start()
+        for tick in range(20):
+            if tick % 7 == 0:
+                game.click(100 + 3 * tick, 100 + 5 * lane.index)
+            game.step()
+        assert (lane.game.ticks, lane.game.outcome) == (game.ticks, game.outcome)
+        assert positions(lane.game) == positions(game)
+
+
+def test_finished_games_are_recorded_and_restarted():
+    arena = Arena(2, level=3, seed=7, restart=True)
+    arena.run(300)
+    assert arena.results
+    seeds = [result["seed"] for result in arena.results]
+    assert len(set(seeds)) == len(seeds)
+    assert arena.running == 2
+    assert arena.game_ticks == 2 * arena.ticks
+
+
+def test_serve_replies_to_commands():
+    commands = [
+        {"cmd": "click", "lane": 1, "x": 300, "y": 100},
+        {"cmd": "click", "lane": 1, "x": 300, "y": 400, "append": True},
+        {"cmd": "step", "ticks": 2},
+        {"cmd": "reset", "lane": 0, "seed": 42},
+        {"cmd": "fly"},
+        {"cmd": "click", "lane": 9, "x": 0, "y": 0},
+        {"cmd": "stats"},
+        {"cmd": "quit"},
+        {"cmd": "stats"},
+    ]
+    infile = io.StringIO("\n".join(json.dumps(command) for command in commands) + "\n")
+    outfile = io.StringIO()
+    arena = Arena(2, level=1, seed=1)
+    serve(arena, infile, outfile)
+    step, reset, unknown, bad_lane, stats = map(json.loads,
+                                               outfile.getvalue().splitlines())
+    assert step["ticks"] == 2
+    assert step["lanes"][1]["queued"] == 0
+    assert arena.lanes[1].game.waypoint.path[-1][:2] == (300, 400)
+    assert (reset["lane"], reset["seed"], reset["ticks"]) == (0, 42, 0)
+    assert unknown == {"error": "unknown command: fly"}
+    assert "error" in bad_lane
+    assert stats["ticks"] == 2
@@ -0,0 +1,86 @@
+"""
+Tests of async_runner.AsyncRunner, with a stand-in for the game's Tk window
+where one is needed.
+"""
+import asyncio
+import tkinter as tk
+from async_runner import AsyncRunner
+from turtle_adventure import TurtleAdventureGame
+
+
+class FakeWindow:
+    """
+    A stand-in for the game's Tk frame, closed by the user after the given
+    number of event updates once the game has ended
+    """
+
+    def __init__(self, game, updates_after_end):
+        self.game = game
+        self.updates_after_end = updates_after_end
+
+    def update(self):
+        if not self.game.is_started:
+            if self.updates_after_end == 0:
+                raise tk.TclError("can't invoke \"update\" command: application "
+                                  "has been destroyed")
+            self.updates_after_end -= 1
+
+    def after(self, _delay, _callback):
+        pass
+
+
+def windowed_game(monkeypatch, updates_after_end):
+    """
+    Create a game with a fake window, whose player loses on the third step
+    """
+    game = TurtleAdventureGame(None, 800, 500, seed=1)
+    window = FakeWindow(game, updates_after_end)
+    monkeypatch.setattr(game, "_Game__frame", window)
+    game.call_at_tick(3, game.game_over_lose)
+    return game, window
+
+
+def test_headless_run_steps_until_max_ticks():
+    game = TurtleAdventureGame(None, 800, 500, seed=1)
+    runner = AsyncRunner(game, realtime=False)
+
+    async def consume(stream):
+        return [frame.ticks async for frame in stream]
+
+    async def main():
+        consumer = asyncio.create_task(consume(runner.frames()))
+        steps = await runner.run(max_ticks=5)
+        return steps, await consumer
+
+    steps, ticks = asyncio.run(main())
+    assert steps == 5
+    assert ticks == [1, 2, 3, 4, 5]
+    assert not game.is_started
+
+
+def test_window_stays_open_after_the_game_ends(monkeypatch):
+    game, window = windowed_game(monkeypatch, updates_after_end=3)
+    runner = AsyncRunner(game)
+    steps = asyncio.run(runner.run())
+    assert steps == 3
+    assert game.outcome == "lose"
+    # run() returned only once the user closed the window
+    assert window.updates_after_end == 0
+    assert not runner.is_running
+
+
+def test_stop_closes_the_window_of_a_finished_game(monkeypatch):
+    game, window = windowed_game(monkeypatch, updates_after_end=10 ** 6)
+    runner = AsyncRunner(game)
+
+    async def main():
+        task = asyncio.create_task(runner.run())
+        while game.outcome is None:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        assert not task.done()
+        runner.stop()
+        return await task
+
+    assert asyncio.run(main()) == 3
+    assert window.updates_after_end > 0
@@ -0,0 +1,42 @@
+"""
+Tests of batch_runner: simulated games are reproducible, whether they run
+in this process or on the worker pool, and their results are summarized.
+"""
+import json
+from batch_runner import Summary, main, run_parallel, simulate
+
+
+def test_simulate_is_reproducible():
+    result = simulate(2, "random", 5, 300)
+    assert result == simulate(2, "random", 5, 300)
+    assert result["outcome"] in ("win", "lose", "timeout")
+    assert (result["level"], result["policy"], result["seed"]) == (2, "random", 5)
+
+
+def test_worker_pool_runs_every_game():
+    tasks = [(1, "idle", range(0, 3), 200, False, "default"),
+             (2, "home", range(3, 5), 200, False, "default")]
+    results = sorted(run_parallel(tasks, workers=2), key=lambda result: result["seed"])
+    assert [result["seed"] for result in results] == [0, 1, 2, 3, 4]
+    assert results[3] == simulate(2, "home", 3, 200)
+
+
+def test_summary_counts_outcomes():
+    summary = Summary()
+    for outcome, seconds in (("win", 4.0), ("lose", 1.0), ("lose", 3.0), ("timeout", 9.0)):
+        summary.add({"level": 1, "policy": "idle", "outcome": outcome,
+                     "seconds": seconds, "second_phase": outcome == "win"})
+    header, row = summary.table().split("\n")
+    assert header.split() == ["level", "policy", "runs", "win%", "lose%", "timeout%",
+                              "phase2%", "mean", "s", "max", "s"]
+    assert row.split() == ["1", "idle", "4", "25.0", "50.0", "25.0", "25.0",
+                           "4.25", "9.00"]
+
+
+def test_main_writes_every_result(tmp_path, capsys):
+    output = tmp_path / "runs.jsonl"
+    assert main(["--levels", "1", "--policies", "idle", "--runs", "3", "--chunk", "2",
+                 "--max-ticks", "100", "--workers", "1", "--output", str(output)]) == 0
+    results = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(result["seed"] for result in results) == [0, 1, 2]
+    assert "idle" in capsys.readouterr().out
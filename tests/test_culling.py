@@ -0,0 +1,117 @@
+"""
+Tests of viewport culling and despawning in gamelib.Game and Turtle's
+Adventure.
+"""
+from gamelib import Game, GameElement
+from turtle_adventure import TurtleAdventureGame, ChasingEnemy
+
+
+class Dot(GameElement):
+    """An element of the given extent that records its renders"""
+
+    def __init__(self, game: "DotGame", x: float, extent: float = 5):
+        super().__init__(game)
+        self.x = x
+        self.y = 50
+        self.size = extent
+
+    @property
+    def extent(self) -> float:
+        return self.size
+
+    def create(self) -> None:
+        pass
+
+    def update(self) -> None:
+        pass
+
+    def render(self) -> None:
+        self.game.rendered.append(self)
+
+    def delete(self) -> None:
+        pass
+
+
+class Stray(Dot):
+    """A dot that may be despawned"""
+
+    despawnable = True
+
+
+class DotGame(Game):
+    """A headless game of dots with a 100 x 100 viewport"""
+
+    def init_game(self) -> None:
+        self.rendered: list[Dot] = []
+        self.set_viewport(0, 0, 100, 100)
+
+    def game_over_win(self) -> None:
+        pass
+
+    def game_over_lose(self) -> None:
+        pass
+
+
+def test_elements_outside_the_viewport_are_culled():
+    game = DotGame(seed=1)
+    inside, edge, outside = Dot(game, 50), Dot(game, 104), Dot(game, 106)
+    for dot in (inside, edge, outside):
+        game.add_element(dot)
+    # an element is rendered once more as it leaves the viewport
+    game.render()
+    assert game.rendered == [inside, edge, outside]
+    game.rendered.clear()
+    for dot in (inside, edge, outside):
+        dot.mark_dirty()
+    game.render()
+    assert game.rendered == [inside, edge]
+    assert game.culled == 1
+    # it stays dirty, and is rendered as soon as it returns
+    assert outside.is_dirty
+    outside.x = 90
+    game.render()
+    assert game.rendered[-1] is outside
+    assert game.culled == 0
+
+
+def test_elements_that_are_not_cullable_are_always_rendered():
+    game = DotGame(seed=1)
+    dot = Dot(game, 500)
+    dot.cullable = False
+    game.add_element(dot)
+    for _ in range(3):
+        dot.mark_dirty()
+        game.render()
+    assert game.rendered == [dot] * 3
+
+
+def test_despawnable_elements_beyond_the_margin_are_despawned():
+    game = DotGame(seed=1)
+    game.despawn_margin = 20
+    near, far, kept = Stray(game, 115), Stray(game, 125), Dot(game, 500)
+    for dot in (near, far, kept):
+        game.add_element(dot)
+    game.start()
+    game.step()
+    assert list(game.elements) == [near, kept]
+    assert (game.despawned, game.despawned_total) == (1, 1)
+    game.step()
+    assert (game.despawned, game.despawned_total) == (0, 1)
+    near.x = -30
+    game.step()
+    assert list(game.elements) == [kept]
+    assert (game.despawned, game.despawned_total) == (1, 2)
+
+
+def test_enemies_far_off_the_screen_are_despawned():
+    game = TurtleAdventureGame(None, 800, 500, seed=1, despawn_margin=50)
+    game.start(animate=False)
+    enemy = ChasingEnemy(game, 20, "red")
+    enemy.x, enemy.y = 400, 540
+    game.add_enemy(enemy)
+    game.step()
+    assert enemy in game.enemies
+    enemy.x, enemy.y = 400, 600
+    game.step()
+    assert enemy not in game.enemies
+    assert game.despawned == 1
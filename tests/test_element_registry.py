@@ -0,0 +1,128 @@
+"""
+Tests of gamelib.ElementRegistry, in particular adds and removes deferred
+while the registry is being iterated.
+"""
+import pytest
+from gamelib import ElementRegistry
+
+
+class Base:
+    """A stand-in element"""
+
+
+class Child(Base):
+    """A stand-in element of a subclass"""
+
+
+class Other:
+    """A stand-in element of an unrelated class"""
+
+
+def test_keeps_insertion_order():
+    registry = ElementRegistry()
+    elements = [Base(), Child(), Other(), Base()]
+    for element in elements:
+        registry.add(element)
+    assert list(registry) == elements
+    assert len(registry) == 4
+
+
+def test_removing_during_iteration_skips_removed_elements():
+    registry = ElementRegistry()
+    elements = [Base() for _ in range(5)]
+    for element in elements:
+        registry.add(element)
+    seen = []
+    for element in registry:
+        seen.append(element)
+        if element is elements[1]:
+            registry.remove(elements[3])
+            registry.remove(element)
+            assert elements[3] not in registry
+            assert len(registry) == 3
+    assert seen == [elements[0], elements[1], elements[2], elements[4]]
+    assert list(registry) == [elements[0], elements[2], elements[4]]
+
+
+def test_adding_during_iteration_is_deferred():
+    registry = ElementRegistry()
+    first, added = Base(), Base()
+    registry.add(first)
+    seen = []
+    for element in registry:
+        seen.append(element)
+        registry.add(added)
+        assert added in registry
+        assert len(registry) == 2
+    assert seen == [first]
+    assert list(registry) == [first, added]
+
+
+def test_remove_then_add_during_iteration_keeps_the_element():
+    registry = ElementRegistry()
+    element = Base()
+    registry.add(element)
+    for _ in registry:
+        registry.remove(element)
+        registry.add(element)
+    assert list(registry) == [element]
+
+
+def test_add_then_remove_during_iteration_drops_the_element():
+    registry = ElementRegistry()
+    registry.add(Base())
+    added = Base()
+    for _ in registry:
+        registry.add(added)
+        registry.remove(added)
+    assert added not in registry
+    assert len(registry) == 1
+
+
+def test_nested_iteration_applies_changes_after_the_outer_loop():
+    registry = ElementRegistry()
+    elements = [Base(), Base()]
+    for element in elements:
+        registry.add(element)
+    for _ in registry:
+        for inner in registry:
+            if inner is elements[0]:
+                registry.remove(inner)
+        assert elements[0] not in registry
+    assert list(registry) == [elements[1]]
+
+
+def test_removing_a_missing_element_raises():
+    registry = ElementRegistry()
+    registry.add(Base())
+    with pytest.raises(KeyError):
+        registry.remove(Base())
+    with pytest.raises(KeyError):
+        for _ in registry:
+            registry.remove(Base())
+
+
+def test_remove_type_removes_subclasses():
+    registry = ElementRegistry()
+    base, child, other = Base(), Child(), Other()
+    for element in (base, child, other):
+        registry.add(element)
+    assert sorted(registry.of_type(Base), key=id) == sorted([base, child], key=id)
+    removed = registry.remove_type(Base)
+    assert sorted(removed, key=id) == sorted([base, child], key=id)
+    assert list(registry) == [other]
+
+
+def test_remove_type_during_iteration():
+    registry = ElementRegistry()
+    base, other, pending = Base(), Other(), Child()
+    registry.add(base)
+    registry.add(other)
+    seen = []
+    for element in registry:
+        seen.append(element)
+        registry.add(pending)
+        registry.remove_type(Base)
+    # the unrelated element is still visited
+    assert seen == [base, other]
+    assert list(registry) == [other]
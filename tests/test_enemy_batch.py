@@ -0,0 +1,80 @@
+"""
+Tests of enemy_batch: enemies stepped by the NumPy batches move exactly like
+the enemies that update themselves.
+"""
+import json
+import pytest
+from turtle_adventure import (TurtleAdventureGame, ChasingEnemy, FencingEnemy,
+                              StalkerEnemy)
+
+pytest.importorskip("numpy")
+
+# a stage without waves, so that only the enemies a test adds are in play
+EMPTY_STAGE = {
+    "name": "empty",
+    "waves": [],
+    "home": {"intro_ticks": 20, "reading_ticks": 60, "summon_every": 40,
+             "chase_after": 10000, "summon": []},
+}
+
+CLICKS = {0: (300, 100), 60: (100, 400), 120: (650, 250), 180: (400, 50)}
+
+
+def play(stage, batched, kinds, ticks=240):
+    """
+    Play a game with an enemy of every given kind, clicking the same
+    waypoints, and return the enemy positions after every step along with
+    the outcome
+    """
+    game = TurtleAdventureGame(None, 800, 500, seed=3, stage=stage, batched=batched)
+    game.start(animate=False)
+    enemies = []
+    for index, kind in enumerate(kinds):
+        if kind is StalkerEnemy:
+            enemy = kind(game, 16, "purple", 40)
+        else:
+            enemy = kind(game, 16, "red")
+        enemy.x, enemy.y = 500 + 40 * index, 60 + 90 * index
+        game.add_enemy(enemy)
+        enemies.append(enemy)
+    trace = []
+    while game.is_started and game.ticks < ticks:
+        if game.ticks in CLICKS:
+            game.click(*CLICKS[game.ticks])
+        game.step()
+        trace.append([(round(enemy.x, 9), round(enemy.y, 9)) for enemy in enemies])
+    return trace, game.outcome
+
+
+@pytest.fixture(name="stage")
+def empty_stage(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text(json.dumps(EMPTY_STAGE), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("kinds", [
+    (ChasingEnemy,),
+    (FencingEnemy, FencingEnemy),
+    (StalkerEnemy,),
+    (ChasingEnemy, FencingEnemy, StalkerEnemy, StalkerEnemy),
+])
+def test_batched_enemies_move_like_enemy_objects(stage, kinds):
+    plain = play(stage, False, kinds)
+    batched = play(stage, True, kinds)
+    assert len(plain[0]) > 1
+    assert batched == plain
+
+
+def test_batched_enemies_hit_the_player(stage):
+    game = TurtleAdventureGame(None, 800, 500, seed=3, stage=stage, batched=True)
+    game.start(animate=False)
+    enemy = ChasingEnemy(game, 16, "red")
+    enemy.x, enemy.y = game.player.x + 60, game.player.y
+    game.add_enemy(enemy)
+    assert enemy.batch is not None
+    for _ in range(100):
+        if not game.is_started:
+            break
+        game.step()
+    assert game.outcome == "lose"
@@ -0,0 +1,67 @@
+"""
+Tests of turtle_adventure.EnemyPool: reusing the canvas items of removed
+enemies, and the live enemy cap.
+"""
+from turtle_adventure import (TurtleAdventureGame, ChasingEnemy, RandomWalkEnemy,
+                              EnemyPool)
+
+
+def new_game(max_enemies=None):
+    """
+    Create a started headless game with no enemies spawned yet
+    """
+    game = TurtleAdventureGame(None, 800, 500, seed=1, max_enemies=max_enemies)
+    game.start(animate=False)
+    assert not game.enemies
+    return game
+
+
+def test_removed_enemy_items_are_reused_by_the_same_kind():
+    game = new_game()
+    pool = game.enemy_pool
+    first = ChasingEnemy(game, 10, "red")
+    game.add_enemy(first)
+    item = first.item
+    assert (pool.hits, pool.misses) == (0, 1)
+    game.remove_enemy(first)
+    assert first.item is None
+    assert len(pool) == 1
+
+    # another kind needs its own item
+    other = RandomWalkEnemy(game, 10, "blue")
+    game.add_enemy(other)
+    assert (pool.hits, pool.misses) == (0, 2)
+    assert other.item != item
+
+    second = ChasingEnemy(game, 10, "red")
+    game.add_enemy(second)
+    assert (pool.hits, pool.misses) == (1, 2)
+    assert second.item == item
+    assert len(pool) == 0
+
+
+def test_live_enemy_cap_rejects_enemies():
+    game = new_game(max_enemies=2)
+    pool = game.enemy_pool
+    enemies = [ChasingEnemy(game, 10, "red") for _ in range(3)]
+    assert game.add_enemy(enemies[0])
+    assert game.add_enemy(enemies[1])
+    assert not game.add_enemy(enemies[2])
+    assert pool.rejected == 1
+    assert enemies[2] not in game.enemies
+    assert len(game.enemies) == 2
+
+    game.remove_enemy(enemies[0])
+    assert game.add_enemy(enemies[2])
+    assert (pool.hits, pool.misses, pool.rejected) == (1, 2, 1)
+
+
+def test_pool_size_is_bounded():
+    game = new_game()
+    game.enemy_pool = EnemyPool(game, max_pooled=1)
+    enemies = [ChasingEnemy(game, 10, "red") for _ in range(2)]
+    for enemy in enemies:
+        game.add_enemy(enemy)
+    for enemy in enemies:
+        game.remove_enemy(enemy)
+    assert len(game.enemy_pool) == 1
@@ -0,0 +1,80 @@
+"""
+Tests of the fixed-step game loop of gamelib.Game, driven by a fake clock
+and a stand-in for the Tk frame that only records the scheduled frames.
+"""
+import gamelib
+from turtle_adventure import TurtleAdventureGame
+
+
+class FakeFrame:
+    """A stand-in for the game's Tk frame"""
+
+    def __init__(self):
+        self.delays = []
+
+    def after(self, delay, _callback):
+        self.delays.append(delay)
+
+
+def fixed_step_game(monkeypatch, clock, max_updates_per_tick=5):
+    """
+    Create a started fixed-step game reading the time from clock[0], whose
+    frames are scheduled on a FakeFrame
+    """
+    monkeypatch.setattr(gamelib.time, "perf_counter", lambda: clock[0])
+    game = TurtleAdventureGame(None, 800, 500, seed=1, fixed_step=True,
+                               max_updates_per_tick=max_updates_per_tick)
+    game.start(animate=False)
+    frame = FakeFrame()
+    monkeypatch.setattr(game, "_Game__frame", frame)
+    return game, frame
+
+
+def test_options_reach_the_game_loop():
+    game = TurtleAdventureGame(None, 800, 500, fixed_step=True)
+    assert game.fixed_step
+    assert not TurtleAdventureGame(None, 800, 500).fixed_step
+
+
+def test_steps_follow_the_elapsed_time(monkeypatch):
+    clock = [100.0]
+    game, frame = fixed_step_game(monkeypatch, clock)
+    clock[0] += 0.070
+    game.animate()
+    # two 33 ms steps are due, and the next one 29 ms later
+    assert game.ticks == 2
+    assert game.skipped_renders == 1
+    assert frame.delays == [29]
+    clock[0] += 0.010
+    game.animate()
+    assert game.ticks == 2
+    assert frame.delays == [29, 19]
+    clock[0] += 0.020
+    game.animate()
+    assert game.ticks == 3
+    assert game.skipped_renders == 1
+
+
+def test_steps_per_tick_are_capped_and_the_backlog_dropped(monkeypatch):
+    clock = [100.0]
+    game, frame = fixed_step_game(monkeypatch, clock, max_updates_per_tick=3)
+    clock[0] += 0.500
+    game.animate()
+    assert game.ticks == 3
+    assert game.skipped_renders == 2
+    # 401 ms were left behind, of which only the 5 ms past the last whole
+    # step are kept
+    assert frame.delays == [28]
+    clock[0] += 0.033
+    game.animate()
+    assert game.ticks == 4
+
+
+def test_stopped_game_schedules_no_more_frames(monkeypatch):
+    clock = [100.0]
+    game, frame = fixed_step_game(monkeypatch, clock)
+    game.stop()
+    clock[0] += 0.100
+    game.animate()
+    assert game.ticks == 0
+    assert not frame.delays
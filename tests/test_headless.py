@@ -0,0 +1,37 @@
+"""
+Tests of headless games: no Tk widget is created, run() steps the game on a
+plain loop, and games with the same seed play the same.
+"""
+from gamelib import NullCanvas
+from turtle_adventure import TurtleAdventureGame
+
+
+def test_headless_game_has_no_window():
+    game = TurtleAdventureGame(None, 800, 500, seed=1)
+    assert game.is_headless
+    assert game.frame is None
+    assert isinstance(game.canvas, NullCanvas)
+    first, second = game.canvas.create_oval(0, 0, 1, 1), game.canvas.create_line(0, 0)
+    assert second == first + 1
+    assert game.canvas.coords(first, 5, 5) is None
+
+
+def test_run_steps_until_max_ticks_or_the_end():
+    game = TurtleAdventureGame(None, 800, 500, level=3, seed=1)
+    assert game.run(max_ticks=5) == 5
+    assert game.ticks == 5
+    assert game.clock == 5 * game.update_delay
+    steps = game.run()
+    assert not game.is_started
+    assert game.outcome in ("win", "lose")
+    assert game.ticks == 5 + steps
+
+
+def test_same_seed_plays_the_same_game():
+    games = [TurtleAdventureGame(None, 800, 500, level=3, seed=9) for _ in range(2)]
+    for game in games:
+        game.run(max_ticks=200)
+    first, second = ([(type(enemy).__name__, enemy.x, enemy.y) for enemy in game.enemies]
+                     for game in games)
+    assert first and first == second
+    assert games[0].ticks == games[1].ticks
@@ -0,0 +1,57 @@
+"""
+Tests of level_loader: value descriptions, and the checks of spawn
+descriptions when a stage is loaded.
+"""
+import random
+import pytest
+from level_loader import KIND_SETTINGS, Stage, compile_value, load_stage
+from turtle_adventure import SPAWN_KINDS, TurtleAdventureGame
+
+
+def stage_with(spawn: dict) -> Stage:
+    """
+    Parse a stage with a single wave holding the spawn description
+    """
+    return Stage({"waves": [{"at": 100, "spawn": [spawn]}]})
+
+
+def test_value_descriptions():
+    rng = random.Random(1)
+    assert compile_value(7, [])(rng) == 7
+    assert 15 <= compile_value([15, 20], [])(rng) <= 20
+    assert compile_value({"choice": "palette"}, ["red"])(rng) == "red"
+    assert compile_value({"range": [45, 85, 15]}, [])(rng) in (45, 60, 75)
+    with pytest.raises(ValueError):
+        compile_value({"pick": [1, 2]}, [])
+
+
+def test_default_stage_spawns_its_waves():
+    stage = load_stage("default")
+    assert [spawn.kind for spawn in stage.waves[0].spawns] == [
+        "chasing", "chasing", "random_walk", "fencing", "stalker"]
+    assert stage.waves[0].spawns[2].count(3) == 25
+    game = TurtleAdventureGame(None, 800, 500, level=3, seed=1)
+    game.start(animate=False)
+    while not game.enemies:
+        game.step()
+    assert len(game.enemies) == 2 + 25 + 4 + 1
+
+
+def test_every_enemy_kind_has_its_settings():
+    assert KIND_SETTINGS.keys() == SPAWN_KINDS.keys()
+
+
+@pytest.mark.parametrize("spawn, message", [
+    ({"kind": "chasing", "timer": 40}, "chasing enemies take no timer setting"),
+    ({"kind": "fencing", "radius": 5}, "fencing enemies take no radius setting"),
+    ({"kind": "stalker"}, "stalker enemies need a timer setting"),
+    ({"kind": "dragon"}, "unknown enemy kind: dragon"),
+])
+def test_bad_spawn_descriptions_fail_on_load(spawn, message):
+    with pytest.raises(ValueError, match=message):
+        stage_with(spawn)
+
+
+def test_bad_home_summons_fail_on_load():
+    with pytest.raises(ValueError, match="random_walk enemies take no timer"):
+        Stage({"home": {"summon": [{"kind": "random_walk", "timer": 10}]}})
@@ -0,0 +1,33 @@
+"""
+Tests that the game elements stay compact: none of them carries a __dict__.
+"""
+import pytest
+from turtle_adventure import (TurtleAdventureGame, RandomWalkEnemy, ChasingEnemy,
+                              FencingEnemy, StalkerEnemy)
+
+
+@pytest.fixture(name="game")
+def new_game():
+    game = TurtleAdventureGame(None, 800, 500, seed=1)
+    game.start(animate=False)
+    return game
+
+
+@pytest.mark.parametrize("kind, args", [
+    (RandomWalkEnemy, ()), (ChasingEnemy, ()), (FencingEnemy, ()), (StalkerEnemy, (40,)),
+])
+def test_enemies_have_no_dict(game, kind, args):
+    enemy = kind(game, 20, "red", *args)
+    assert not hasattr(enemy, "__dict__")
+    with pytest.raises(AttributeError):
+        enemy.undeclared = 1
+
+
+def test_game_elements_have_no_dict(game):
+    for element in (game.player, game.waypoint, game.home):
+        assert not hasattr(element, "__dict__")
+
+
+def test_state_fields_are_slots():
+    for kind in (RandomWalkEnemy, ChasingEnemy, FencingEnemy, StalkerEnemy):
+        assert set(kind.state_fields) <= set(kind.__slots__)
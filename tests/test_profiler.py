@@ -0,0 +1,63 @@
+"""
+Tests of gamelib.FrameProfiler and the profiling of a game's frames.
+"""
+import csv
+import json
+import pytest
+from gamelib import FrameProfiler
+from turtle_adventure import TurtleAdventureGame
+
+
+def test_frames_sum_their_phases():
+    profiler = FrameProfiler()
+    profiler.add("update:Enemy", 0.002)
+    profiler.add("update:Enemy", 0.001)
+    profiler.add("update:Player", 0.001)
+    profiler.add("render:Enemy", 0.004)
+    profiler.add("post_update", 0.0005)
+    profiler.end_frame(12, jitter=0.003)
+    stats = profiler.stats()
+    assert stats["update:Enemy"]["p50"] == pytest.approx(0.003)
+    assert stats["update"]["p50"] == pytest.approx(0.004)
+    assert stats["render"]["p50"] == 0.004
+    assert stats["frame"]["p50"] == pytest.approx(0.0085)
+    assert stats["elements"]["p50"] == 12
+    assert stats["jitter"]["p50"] == 0.003
+
+
+def test_percentiles_cover_the_last_window_of_frames():
+    profiler = FrameProfiler(window=100)
+    for frame in range(200):
+        profiler.add("update:Enemy", frame)
+        profiler.end_frame(0)
+    assert profiler.percentiles("update") == {"p50": 150, "p95": 194, "p99": 198}
+    assert profiler.percentiles("missing") == {}
+    assert profiler.summary().startswith("frame p50 150000.0 ms")
+
+
+def test_dump_writes_json_and_csv(tmp_path):
+    profiler = FrameProfiler()
+    profiler.add("render:Enemy", 0.5)
+    profiler.end_frame(3)
+    profiler.dump(str(tmp_path / "stats.json"))
+    profiler.dump(str(tmp_path / "stats.csv"))
+    with open(tmp_path / "stats.json", encoding="utf-8") as file:
+        assert json.load(file)["render"] == {"p50": 0.5, "p95": 0.5, "p99": 0.5}
+    with open(tmp_path / "stats.csv", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["metric", "p50", "p95", "p99"]
+    assert ["elements", "3", "3", "3"] in rows
+
+
+def test_game_records_every_phase():
+    game = TurtleAdventureGame(None, 800, 500, level=2, seed=1)
+    assert game.frame_stats() == {}
+    profiler = game.enable_profiling(window=50)
+    game.start()
+    for _ in range(10):
+        game.step(render=True)
+    stats = game.frame_stats()
+    assert profiler.percentiles("elements")["p50"] >= 3
+    for metric in ("update", "render", "post_update", "frame", "culled",
+                   "update:Player", "render:Player"):
+        assert metric in stats
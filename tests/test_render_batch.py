@@ -0,0 +1,75 @@
+"""
+Tests of gamelib.RenderBatch: the Tcl script it submits, and coalescing of
+coords() calls.
+"""
+from gamelib import NullCanvas, RenderBatch
+
+
+class FakeInterpreter:
+    """A stand-in for the Tcl interpreter that records the scripts"""
+
+    def __init__(self):
+        self.scripts = []
+
+    def eval(self, script):
+        self.scripts.append(script)
+
+
+class FakeCanvas:
+    """A stand-in for a Tk canvas with the given widget path"""
+
+    def __init__(self, path=".canvas"):
+        self.path = path
+        self.tk = FakeInterpreter()
+
+    def __str__(self):
+        return self.path
+
+
+def test_flush_submits_one_script():
+    canvas = FakeCanvas()
+    batch = RenderBatch(canvas)
+    batch.itemconfigure(3, state="hidden")
+    batch.tag_raise(4)
+    batch.coords(5, 1, 2, 3.5, 4)
+    assert batch.flush() == 3
+    assert batch.operations == 3
+    assert canvas.tk.scripts == [".canvas itemconfigure 3 -state hidden\n"
+                                 ".canvas raise 4\n"
+                                 ".canvas coords 5 1 2 3.5 4"]
+
+
+def test_coords_of_an_item_are_coalesced_into_the_last_call():
+    canvas = FakeCanvas()
+    batch = RenderBatch(canvas)
+    batch.coords(1, 0, 0)
+    batch.coords(2, 5, 5)
+    batch.coords(1, 10, 20)
+    assert batch.flush() == 2
+    assert canvas.tk.scripts == [".canvas coords 1 10 20\n.canvas coords 2 5 5"]
+
+
+def test_option_values_are_quoted_as_single_words():
+    canvas = FakeCanvas()
+    batch = RenderBatch(canvas)
+    batch.itemconfigure(7, fill="#ff0000", text="You Win", font="")
+    batch.flush()
+    assert canvas.tk.scripts == [
+        ".canvas itemconfigure 7 -fill #ff0000 -text {You Win} -font {}"]
+
+
+def test_flush_starts_a_new_frame():
+    canvas = FakeCanvas()
+    batch = RenderBatch(canvas)
+    batch.coords(1, 0, 0)
+    batch.flush()
+    assert batch.flush() == 0
+    assert batch.operations == 0
+    assert len(canvas.tk.scripts) == 1
+
+
+def test_headless_canvas_runs_nothing():
+    batch = RenderBatch(NullCanvas())
+    batch.coords(1, 0, 0)
+    batch.tag_raise(1)
+    assert batch.flush() == 2
@@ -0,0 +1,88 @@
+"""
+Tests of the dirty-flag rendering of gamelib.Game: only the elements that
+changed since they were last rendered are rendered again.
+"""
+from gamelib import Game, GameElement
+
+
+class Dot(GameElement):
+    """An element that records its renders and moves by its speed"""
+
+    def __init__(self, game: "DotGame", x: float, speed: float = 0):
+        super().__init__(game)
+        self.x = x
+        self.speed = speed
+
+    def create(self) -> None:
+        pass
+
+    def update(self) -> None:
+        self.x += self.speed
+
+    def render(self) -> None:
+        self.game.rendered.append(self)
+
+    def delete(self) -> None:
+        pass
+
+
+class DotGame(Game):
+    """A headless game of dots"""
+
+    def init_game(self) -> None:
+        self.rendered: list[Dot] = []
+
+    def game_over_win(self) -> None:
+        pass
+
+    def game_over_lose(self) -> None:
+        pass
+
+
+def new_game(*dots: tuple) -> tuple[DotGame, list[Dot]]:
+    """
+    Create a started game holding dots of the given (x, speed), rendered once
+    """
+    game = DotGame(seed=1)
+    elements = [Dot(game, *dot) for dot in dots]
+    for element in elements:
+        game.add_element(element)
+    game.start()
+    game.render()
+    game.rendered.clear()
+    return game, elements
+
+
+def test_new_elements_are_rendered_once():
+    game = DotGame(seed=1)
+    dot = Dot(game, 10)
+    game.add_element(dot)
+    assert dot.is_dirty
+    game.start()
+    game.render()
+    assert game.rendered == [dot]
+    assert not dot.is_dirty
+    game.render()
+    assert game.rendered == [dot]
+
+
+def test_only_moving_elements_are_rendered():
+    game, (_, moving) = new_game((10, 0), (20, 1))
+    for _ in range(3):
+        game.step(render=True)
+    assert game.rendered == [moving] * 3
+
+
+def test_setting_the_same_position_keeps_an_element_clean():
+    game, (dot,) = new_game((10, 0))
+    dot.x, dot.y = 10, 0
+    assert not dot.is_dirty
+    game.render()
+    assert not game.rendered
+
+
+def test_mark_dirty_requests_a_render():
+    game, (dot, _) = new_game((10, 0), (20, 0))
+    dot.mark_dirty()
+    game.render()
+    assert game.rendered == [dot]
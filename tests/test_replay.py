@@ -0,0 +1,57 @@
+"""
+Tests of replay: input logs survive saving, and a replayed session re-runs
+the recorded game exactly.
+"""
+import pytest
+from replay import InputLog, record, replay
+from turtle_adventure import TurtleAdventureGame
+
+CLICKS = {0: (300, 100, False), 3: (300, 400, True), 8: (200, 50, False),
+          12: (100, 450, False), 13: (700, 50, True)}
+
+
+def play(**options) -> tuple[TurtleAdventureGame, InputLog]:
+    """
+    Play a recorded headless game with the same clicks for up to 300 steps
+    """
+    game = TurtleAdventureGame(None, 800, 500, level=2, seed=7, **options)
+    log = record(game)
+    game.start()
+    while game.is_started and game.ticks < 300:
+        if game.ticks in CLICKS:
+            game.click(*CLICKS[game.ticks])
+        game.step()
+    log.end_tick = game.ticks
+    return game, log
+
+
+def state(game: TurtleAdventureGame) -> tuple:
+    """
+    Summarize the outcome and positions of a game
+    """
+    return (game.ticks, game.outcome, game.player.x, game.player.y,
+            sorted((enemy.x, enemy.y) for enemy in game.enemies))
+
+
+def test_log_survives_saving(tmp_path):
+    _, log = play(despawn_margin=40)
+    path = str(tmp_path / "session.tadv")
+    log.save(path)
+    loaded = InputLog.load(path)
+    assert loaded.clicks == log.clicks
+    assert [click[1:] for click in loaded.clicks] == list(CLICKS.values())
+    assert (loaded.seed, loaded.level, loaded.stage, loaded.end_tick,
+            loaded.despawn_margin) == (7, 2, "default", log.end_tick, 40)
+
+
+def test_not_a_log_is_rejected():
+    with pytest.raises(ValueError):
+        InputLog.from_bytes(b"\0" * 64)
+
+
+@pytest.mark.parametrize("options", [{}, {"despawn_margin": 40}])
+def test_replay_reruns_the_session(options):
+    game, log = play(**options)
+    assert len(log.clicks) == len(CLICKS)
+    replayed = replay(InputLog.from_bytes(log.to_bytes()))
+    assert state(replayed) == state(game)
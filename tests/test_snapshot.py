@@ -0,0 +1,89 @@
+"""
+Tests of the snapshot module: a fork must replay the exact run of the game
+it was forked from.
+"""
+import random
+import pytest
+from turtle_adventure import TurtleAdventureGame
+from snapshot import snapshot, restore, fork
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BATCHED = [False, pytest.param(True, marks=pytest.mark.skipif(
+    numpy is None, reason="batched enemies require numpy"))]
+
+
+def play(game: TurtleAdventureGame, ticks: int, seed: int) -> list[tuple]:
+    """
+    Step the game with random clicks, and return a trace of its state
+    """
+    rng = random.Random(seed)
+    trace = []
+    for _ in range(ticks):
+        if not game.is_started:
+            break
+        if game.ticks % 15 == 0:
+            game.click(rng.randint(0, 799), rng.randint(0, 499),
+                       append=rng.random() < 0.5)
+        game.step()
+        trace.append((game.ticks, game.outcome, game.player.x, game.player.y,
+                      tuple(sorted((enemy.x, enemy.y) for enemy in game.enemies))))
+    return trace
+
+
+def new_game(level: int, batched: bool, **options) -> TurtleAdventureGame:
+    """
+    Create and start a headless game whose player cannot lose, so that runs
+    last long enough to cover many enemy and timer events
+    """
+    game = TurtleAdventureGame(None, 800, 500, level=level, batched=batched,
+                               seed=level * 7, **options)
+    game.on_collision = lambda enemy: None
+    game.start()
+    return game
+
+
+@pytest.mark.parametrize("batched", BATCHED)
+@pytest.mark.parametrize("level", [1, 4])
+def test_fork_runs_identically(level, batched):
+    game = new_game(level, batched)
+    play(game, 90, seed=1)
+    copy = fork(game)
+    copy.on_collision = game.on_collision
+    copy.start()
+    assert play(copy, 200, seed=2) == play(game, 200, seed=2)
+
+
+@pytest.mark.parametrize("batched", BATCHED)
+def test_snapshot_round_trip(batched):
+    game = new_game(3, batched)
+    play(game, 120, seed=3)
+    data = snapshot(game)
+    assert snapshot(fork(game, data=data)) == data
+
+
+def test_restore_rewinds_a_game():
+    game = new_game(2, False)
+    play(game, 40, seed=4)
+    data = snapshot(game)
+    expected = play(game, 100, seed=5)
+    restore(game, data)
+    assert play(game, 100, seed=5) == expected
+
+
+def test_fork_keeps_the_game_settings():
+    game = new_game(5, False, max_enemies=4, despawn_margin=30)
+    play(game, 60, seed=6)
+    copy = fork(game)
+    assert copy.enemy_pool.max_live == 4
+    assert copy.despawn_margin == 30
+    assert copy.waypoint.path == game.waypoint.path
+
+
+def test_restore_rejects_other_data():
+    game = new_game(1, False)
+    with pytest.raises(ValueError):
+        restore(game, b"\0" * 64)
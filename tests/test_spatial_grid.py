@@ -0,0 +1,77 @@
+"""
+Tests of gamelib.SpatialGrid and of the collision test of TurtleAdventureGame
+that relies on it.
+"""
+from gamelib import SpatialGrid
+from turtle_adventure import TurtleAdventureGame, Enemy
+
+
+class Point:
+    """A stand-in element with a position"""
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+
+class StillEnemy(Enemy):
+    """An enemy that stays wherever it is put"""
+
+    def create_item(self) -> int:
+        return self.canvas.create_oval(0, 0, 0, 0, fill=self.color)
+
+    def update(self) -> None:
+        pass
+
+
+def test_query_finds_nearby_elements_only():
+    grid = SpatialGrid(800, 500)
+    near, far = Point(120, 130), Point(700, 400)
+    grid.insert(near)
+    grid.insert(far)
+    assert set(grid.query(100, 100, 140, 140)) == {near}
+    assert set(grid.query(0, 0, 800, 500)) == {near, far}
+    assert len(grid) == 2
+
+
+def test_moving_updates_the_cell_only_past_the_loose_bounds():
+    grid = SpatialGrid(800, 500, cell_size=50, slack=10)
+    point = Point(45, 45)
+    bounds = grid.insert(point)
+    assert bounds == (float("-inf"), float("-inf"), 60, 60)
+    # jittering across the edge keeps the point in its cell
+    point.x = 55
+    assert bounds[0] <= point.x < bounds[2]
+    point.x = 300
+    bounds = grid.move(point)
+    assert bounds == (290, float("-inf"), 360, 60)
+    assert set(grid.query(300, 45, 300, 45)) == {point}
+    assert not set(grid.query(20, 20, 30, 30))
+
+
+def test_outside_positions_fall_into_the_border_cells():
+    grid = SpatialGrid(800, 500)
+    point = Point(-40, 900)
+    grid.insert(point)
+    assert set(grid.query(0, 480, 10, 499)) == {point}
+    grid.remove(point)
+    assert point not in grid
+    assert not set(grid.query(0, 480, 10, 499))
+
+
+def test_enemies_follow_their_cells_as_they_move():
+    game = TurtleAdventureGame(None, 800, 500, seed=1)
+    game.start(animate=False)
+    enemy = StillEnemy(game, 20, "red")
+    enemy.x, enemy.y = 400, 50
+    game.add_enemy(enemy)
+    player = game.player
+    assert enemy not in set(game.collision_grid.query(player.x, player.y,
+                                                      player.x, player.y))
+    enemy.x, enemy.y = player.x, player.y
+    assert enemy in set(game.collision_grid.query(player.x, player.y,
+                                                  player.x, player.y))
+    game.step()
+    assert game.outcome == "lose"
+    game.remove_enemy(enemy)
+    assert enemy not in game.collision_grid
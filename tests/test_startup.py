@@ -0,0 +1,38 @@
+"""
+Tests that the game loads tkinter and turtle only when it needs them.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(code: str) -> set[str]:
+    """
+    Run the code in a fresh interpreter, and return the names of the
+    modules it left loaded
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys\nprint(' '.join(sys.modules))"],
+        cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+def test_headless_games_never_load_tkinter():
+    modules = loaded_modules(
+        "import replay, snapshot, batch_runner, async_runner\n"
+        "from turtle_adventure import TurtleAdventureGame\n"
+        "TurtleAdventureGame(None, 800, 500, level=2, seed=1).run(max_ticks=50)")
+    assert "tkinter" not in modules
+    assert "turtle" not in modules
+
+
+def test_main_parses_arguments_before_loading_the_game():
+    # -X importtime lists every module imported on stderr
+    result = subprocess.run([sys.executable, "-X", "importtime", "main.py", "--level", "x"],
+                            cwd=ROOT, capture_output=True, text=True, check=False)
+    assert result.returncode == 2
+    assert "invalid int value" in result.stderr
+    assert "tkinter" not in result.stderr
+    assert "turtle_adventure" not in result.stderr
@@ -0,0 +1,115 @@
+"""
+Tests of gamelib.TimerWheel: firing order, cascading between the wheel
+levels and the overflow, and cancelling.
+"""
+from gamelib import TimerWheel
+
+
+def advance_to(wheel: TimerWheel, tick: int) -> None:
+    """
+    Advance the wheel until it reaches the given tick
+    """
+    while wheel.now < tick:
+        wheel.advance()
+
+
+def test_same_tick_callbacks_run_in_scheduling_order():
+    wheel = TimerWheel()
+    fired = []
+    for name in "abc":
+        wheel.schedule(5, lambda name=name: fired.append(name))
+    advance_to(wheel, 4)
+    assert not fired
+    wheel.advance()
+    assert fired == ["a", "b", "c"]
+    assert len(wheel) == 0
+
+
+def test_scheduling_order_survives_cascading():
+    # "early" waits in a level 1 slot and cascades into level 0, while "late"
+    # is scheduled directly into level 0 afterwards; "early" still runs first
+    wheel = TimerWheel()
+    fired = []
+    wheel.schedule(200, lambda: fired.append("early"))
+    advance_to(wheel, 150)
+    wheel.schedule(200, lambda: fired.append("late"))
+    advance_to(wheel, 200)
+    assert fired == ["early", "late"]
+
+
+def test_callbacks_fire_on_their_tick_across_level_boundaries():
+    wheel = TimerWheel()
+    ticks = [1, 63, 64, 65, 127, 128, 4095, 4096, 4097, 5000, 262143, 262144, 262145]
+    fired = []
+    for tick in reversed(ticks):
+        wheel.schedule(tick, lambda tick=tick: fired.append((tick, wheel.now)))
+    advance_to(wheel, ticks[-1])
+    assert fired == [(tick, tick) for tick in ticks]
+
+
+def test_overflow_cascades_into_the_wheels():
+    span = 1 << (TimerWheel.BITS * TimerWheel.LEVELS)
+    wheel = TimerWheel(now=span - 3)
+    fired = []
+    wheel.schedule(span + 5, lambda: fired.append(wheel.now))
+    wheel.schedule(span - 1, lambda: fired.append(wheel.now))
+    assert wheel.due(1) == span + 5
+    advance_to(wheel, span + 10)
+    assert fired == [span - 1, span + 5]
+
+
+def test_past_ticks_run_on_the_next_tick():
+    wheel = TimerWheel(now=10)
+    fired = []
+    call = wheel.schedule(3, lambda: fired.append(wheel.now))
+    assert wheel.due(call) == 11
+    wheel.advance()
+    assert fired == [11]
+
+
+def test_cancel():
+    wheel = TimerWheel()
+    fired = []
+    call = wheel.schedule(70, lambda: fired.append("cancelled"))
+    wheel.schedule(70, lambda: fired.append("kept"))
+    wheel.cancel(call)
+    assert wheel.due(call) is None
+    advance_to(wheel, 70)
+    assert fired == ["kept"]
+    # cancelling a callback that already ran does nothing
+    wheel.cancel(call)
+    wheel.cancel(2)
+
+
+def test_callback_cancelling_a_later_one_on_the_same_tick():
+    wheel = TimerWheel()
+    fired = []
+    later = []
+    wheel.schedule(3, lambda: wheel.cancel(later[0]))
+    later.append(wheel.schedule(3, lambda: fired.append("later")))
+    advance_to(wheel, 3)
+    assert not fired
+    assert len(wheel) == 0
+
+
+def test_callback_scheduling_for_the_current_tick_runs_next_tick():
+    wheel = TimerWheel()
+    fired = []
+    wheel.schedule(2, lambda: wheel.schedule(2, lambda: fired.append(wheel.now)))
+    advance_to(wheel, 2)
+    assert not fired
+    wheel.advance()
+    assert fired == [3]
+
+
+def test_reset_drops_pending_callbacks():
+    wheel = TimerWheel()
+    fired = []
+    wheel.schedule(5, lambda: fired.append(5))
+    wheel.schedule(500, lambda: fired.append(500))
+    wheel.reset(1000)
+    assert wheel.now == 1000
+    assert len(wheel) == 0
+    wheel.schedule(1001, lambda: fired.append(1001))
+    wheel.advance()
+    assert fired == [1001]
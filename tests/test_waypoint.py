@@ -0,0 +1,90 @@
+"""
+Tests of the waypoint path of Turtle's Adventure: planning the segments,
+queueing waypoints with shift-clicks, and replanning when the player's speed
+changes.
+"""
+import pytest
+from turtle_adventure import TurtleAdventureGame
+
+
+@pytest.fixture(name="game")
+def new_game():
+    # the player starts at (50, 250) with a speed of 5, and no enemies are
+    # spawned during the first 100 steps
+    game = TurtleAdventureGame(None, 800, 500, seed=1)
+    game.start(animate=False)
+    return game
+
+
+def test_click_plans_a_segment(game):
+    game.click(80, 290)
+    assert game.waypoint.path == [(80, 290, 3.0, 4.0, pytest.approx(53.130102), 10)]
+    for _ in range(9):
+        game.step()
+    assert (game.player.x, game.player.y) == pytest.approx((77, 286))
+    assert game.waypoint.is_active
+    game.step()
+    # the last step lands exactly on the waypoint
+    assert (game.player.x, game.player.y) == (80, 290)
+    assert game.player.heading == pytest.approx(53.130102)
+    assert not game.waypoint.is_active
+    game.step()
+    assert (game.player.x, game.player.y) == (80, 290)
+
+
+def test_shift_click_queues_waypoints(game):
+    game.click(50, 262)
+    game.click(100, 262, append=True)
+    game.click(100, 262, append=True)
+    game.click(100, 212, append=True)
+    # the waypoint queued where the path already ends adds nothing
+    assert [segment[:2] for segment in game.waypoint.path] == [(50, 262), (100, 262),
+                                                              (100, 212)]
+    assert [segment[5] for segment in game.waypoint.path] == [3, 10, 10]
+    visited = []
+    for _ in range(23):
+        game.step()
+        visited.append((game.player.x, game.player.y))
+    assert visited[2] == (50, 262)
+    assert visited[12] == (100, 262)
+    assert visited[22] == (100, 212)
+    assert not game.waypoint.is_active
+
+
+def test_click_replaces_the_queued_path(game):
+    game.click(300, 250)
+    game.click(300, 100, append=True)
+    game.click(60, 250)
+    assert [segment[:2] for segment in game.waypoint.path] == [(60, 250)]
+
+
+def test_shift_click_without_a_path_starts_one(game):
+    game.click(70, 250, append=True)
+    assert game.waypoint.path == [(70, 250, 5.0, 0.0, 0.0, 4)]
+
+
+def test_speed_change_replans_from_the_player(game):
+    game.click(100, 250)
+    game.click(100, 300, append=True)
+    game.step()
+    game.player.speed = 10
+    assert game.waypoint.path == [(100, 250, 10.0, 0.0, 0.0, 5),
+                                  (100, 300, 0.0, 10.0, 90.0, 5)]
+
+
+def test_zero_speed_keeps_the_path_without_walking_it(game):
+    game.click(100, 250)
+    game.click(100, 300, append=True)
+    game.step()
+    game.player.speed = 0
+    game.click(150, 300, append=True)
+    assert [segment[:2] for segment in game.waypoint.path] == [(100, 250), (100, 300),
+                                                              (150, 300)]
+    for _ in range(5):
+        game.step()
+    assert (game.player.x, game.player.y) == (55, 250)
+    game.player.speed = 5
+    assert [segment[5] for segment in game.waypoint.path] == [9, 10, 10]
+    for _ in range(29):
+        game.step()
+    assert (game.player.x, game.player.y) == (150, 300)
@@ -0,0 +1,44 @@
+"""
+Tests of turtle_adventure.WorldContext, the per-step view of the player that
+enemies react to.
+"""
+import pytest
+from turtle_adventure import TurtleAdventureGame
+
+
+@pytest.fixture(name="game")
+def new_game():
+    game = TurtleAdventureGame(None, 800, 500, seed=1)
+    game.start(animate=False)
+    return game
+
+
+def test_world_follows_the_player(game):
+    world = game.world
+    game.step()
+    assert (world.player_x, world.player_y) == (50, 250)
+    assert (world.velocity_x, world.velocity_y) == (0, 0)
+    assert not world.waypoint_active
+    game.click(80, 290)
+    game.step()
+    assert (world.player_x, world.player_y) == (53, 254)
+    assert (world.velocity_x, world.velocity_y) == (3, 4)
+    assert world.heading == pytest.approx(53.130102)
+    assert (world.waypoint_dx, world.waypoint_dy) == (27, 36)
+    assert world.waypoint_active
+
+
+def test_predict_extrapolates_the_velocity(game):
+    game.click(80, 290)
+    game.step()
+    assert game.world.predict(0) == (53, 254)
+    assert game.world.predict(5) == (68, 274)
+
+
+def test_reset_stands_the_player_still(game):
+    game.click(80, 290)
+    game.step()
+    game.player.x, game.player.y = 400, 100
+    game.world.reset(game.player, game.waypoint)
+    assert (game.world.player_x, game.world.player_y) == (400, 100)
+    assert (game.world.velocity_x, game.world.velocity_y) == (0, 0)
@@ -1,10 +1,31 @@
 """
 The turtle_adventure module maintains all classes related to the Turtle's
-adventure game.
+adventure game.  The turtle module is only imported when a game with a
+window creates the player's turtle, so headless games never load it.
 """
-from turtle import RawTurtle
-from gamelib import Game, GameElement
-import random
+import math
+from abc import abstractmethod
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Final, Optional
+from gamelib import Game, GameElement, ElementRegistry, SpatialGrid
+from level_loader import SpawnSpec, Stage, load_stage
+
+if TYPE_CHECKING:
+    from turtle import RawTurtle
+
+# GameElement's own position accessors, for subclasses overriding x and y;
+# calling them directly is much cheaper than going through super()
+_get_x, _set_x = GameElement.x.fget, GameElement.x.fset
+_get_y, _set_y = GameElement.y.fget, GameElement.y.fset
+
+
+def box_hits(x: float, y: float, size: float, point_x: float, point_y: float) -> bool:
+    """
+    Check whether the point lies strictly inside the square of the given size
+    centered at (x, y)
+    """
+    half = size / 2
+    return x - half < point_x < x + half and y - half < point_y < y + half
 
 
 class TurtleGameElement(GameElement):
@@ -13,6 +34,8 @@ class TurtleGameElement(GameElement):
     Adventure game
     """
 
+    __slots__ = ("__game",)
+
     def __init__(self, game: "TurtleAdventureGame"):
         super().__init__(game)
         self.__game: "TurtleAdventureGame" = game
@@ -27,74 +50,194 @@ class TurtleGameElement(GameElement):
 
 class Waypoint(TurtleGameElement):
     """
-    Represent the waypoint to which the player will move.
+    Represent the path of waypoints the player moves along.  The waypoint's
+    x and y are those of the waypoint the player is heading to; later ones
+    wait in a queue.  Every segment of the path is planned once, when its
+    waypoint is queued: the per-step offset, the heading and the number of
+    steps it takes the player at its current speed, the last step landing on
+    the waypoint itself.  The path is drawn as a single polyline with a cross
+    on every waypoint, which is only updated when the path changes.
     """
 
+    __slots__ = ("__id", "__queue", "step_x", "step_y", "heading", "steps_left")
+
+    # the path spans more than the extent around the current waypoint
+    cullable = False
+
     def __init__(self, game: "TurtleAdventureGame"):
         super().__init__(game)
-        self.__id1: int
-        self.__id2: int
-        self.__active: bool = False
+        self.__id: int
+        # the segments after the current one, as (x, y, step x, step y,
+        # heading, steps)
+        self.__queue: deque[tuple[float, float, float, float, float, int]] = deque()
+        self.step_x: float = 0
+        self.step_y: float = 0
+        self.heading: float = 0
+        self.steps_left: int = 0
+
+    @property
+    def extent(self) -> float:
+        return 10
 
     def create(self) -> None:
-        self.__id1 = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green")
-        self.__id2 = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green")
+        self.__id = self.canvas.create_line(0, 0, 0, 0, width=2, fill="green",
+                                            state="hidden")
 
     def delete(self) -> None:
-        self.canvas.delete(self.__id1)
-        self.canvas.delete(self.__id2)
+        self.canvas.delete(self.__id)
 
     def update(self) -> None:
-        # there is nothing to update because a waypoint is fixed
+        # there is nothing to update because the player walks the path
         pass
 
     def render(self) -> None:
-        if self.is_active:
-            self.canvas.itemconfigure(self.__id1, state="normal")
-            self.canvas.itemconfigure(self.__id2, state="normal")
-            self.canvas.tag_raise(self.__id1)
-            self.canvas.tag_raise(self.__id2)
-            self.canvas.coords(self.__id1, self.x - 10, self.y - 10, self.x + 10, self.y + 10)
-            self.canvas.coords(self.__id2, self.x - 10, self.y + 10, self.x + 10, self.y - 10)
-        else:
-            self.canvas.itemconfigure(self.__id1, state="hidden")
-            self.canvas.itemconfigure(self.__id2, state="hidden")
+        batch = self.game.render_batch
+        if not self.is_active:
+            batch.itemconfigure(self.__id, state="hidden")
+            return
+        coords: list[float] = []
+        for x, y, *_ in self.path:
+            # a cross drawn from the waypoint and back to it, then on to the
+            # next waypoint
+            coords += (x, y, x - 10, y - 10, x + 10, y + 10, x, y,
+                       x - 10, y + 10, x + 10, y - 10, x, y)
+        batch.coords(self.__id, *coords)
+        batch.itemconfigure(self.__id, state="normal")
+        batch.tag_raise(self.__id)
+
+    def __plan(self, from_x: float, from_y: float, x: float, y: float
+               ) -> Optional[tuple[float, float, float, float, float, int]]:
+        """
+        Plan the segment from one point to a waypoint, or return None if the
+        waypoint is already there
+        """
+        dx, dy = x - from_x, y - from_y
+        distance = math.hypot(dx, dy)
+        if distance == 0:
+            return None
+        heading = math.degrees(math.atan2(dy, dx)) % 360
+        speed = self.game.player.speed
+        if speed <= 0:
+            # a player standing still keeps the path without walking it, and
+            # the path is planned again once the speed changes
+            return x, y, 0.0, 0.0, heading, 1
+        return (x, y, speed * dx / distance, speed * dy / distance, heading,
+                math.ceil(distance / speed))
+
+    def __load(self, segment: tuple[float, float, float, float, float, int]) -> None:
+        """
+        Make the segment the one the player is walking
+        """
+        (self.x, self.y, self.step_x, self.step_y, self.heading,
+         self.steps_left) = segment
+        self.mark_dirty()
 
     def activate(self, x: float, y: float) -> None:
         """
-        Activate this waypoint with the specified location.
+        Replace the path with a single waypoint at the specified location.
         """
-        self.__active = True
-        self.x = x
-        self.y = y
+        self.__queue.clear()
+        self.steps_left = 0
+        self.append(x, y)
+
+    def append(self, x: float, y: float) -> None:
+        """
+        Queue a waypoint at the specified location after the last one.
+        """
+        if not self.is_active:
+            player = self.game.player
+            segment = self.__plan(player.x, player.y, x, y)
+            if segment is None:
+                self.x, self.y = x, y
+            else:
+                self.__load(segment)
+            return
+        last_x, last_y = (self.__queue[-1][:2] if self.__queue else (self.x, self.y))
+        segment = self.__plan(last_x, last_y, x, y)
+        if segment is not None:
+            self.__queue.append(segment)
+            self.mark_dirty()
+
+    def advance(self) -> None:
+        """
+        Count a step the player took along the current segment, moving on to
+        the next waypoint at its end.
+        """
+        self.steps_left -= 1
+        if self.steps_left == 0:
+            if self.__queue:
+                self.__load(self.__queue.popleft())
+            else:
+                self.mark_dirty()
+
+    def replan(self) -> None:
+        """
+        Plan the path again from the player's position, e.g., after the
+        player's speed changed.
+        """
+        if self.is_active:
+            points = [(segment[0], segment[1]) for segment in self.path]
+            self.activate(*points[0])
+            for x, y in points[1:]:
+                self.append(x, y)
 
     def deactivate(self) -> None:
         """
-        Mark this waypoint as inactive.
+        Mark this waypoint as inactive, dropping the queued ones.
         """
-        self.__active = False
+        self.__queue.clear()
+        self.steps_left = 0
+        self.mark_dirty()
 
     @property
     def is_active(self) -> bool:
         """
         Get the flag indicating whether this waypoint is active.
         """
-        return self.__active
+        return self.steps_left > 0
+
+    @property
+    def path(self) -> list[tuple[float, float, float, float, float, int]]:
+        """
+        Get or set the planned segments, the current one first, as (x, y,
+        step x, step y, heading, steps left) tuples
+        """
+        if not self.is_active:
+            return []
+        return [(self.x, self.y, self.step_x, self.step_y, self.heading,
+                 self.steps_left)] + list(self.__queue)
+
+    @path.setter
+    def path(self, segments: list[tuple[float, float, float, float, float, int]]) -> None:
+        self.deactivate()
+        if segments:
+            self.__load(segments[0])
+            self.__queue.extend(segments[1:])
 
 
 class Home(TurtleGameElement):
     """
     Represent the player's home.
+
+    Home's phases are driven by timed events on the game's timer wheel:
+    phase_at and summon_at hold the simulation steps of the next phase change
+    and of the next summon, or 0 when none is pending.
     """
 
+    __slots__ = ("__id", "__size", "__phase_call", "__summon_call", "phase_at",
+                 "summon_at", "x_speed", "y_speed", "intro", "begin", "move",
+                 "second_phase")
+
     def __init__(self, game: "TurtleAdventureGame", pos: tuple[int, int], size: int):
         super().__init__(game)
         self.__id: int
         self.__size: int = size
+        self.__phase_call: Optional[int] = None
+        self.__summon_call: Optional[int] = None
         x, y = pos
         self.x = x
         self.y = y
-        self.time = 1
+        self.phase_at, self.summon_at = 0, 0
         self.x_speed, self.y_speed = 0, 0
 
         self.intro = 0
@@ -110,43 +253,102 @@ class Home(TurtleGameElement):
     @size.setter
     def size(self, val: int) -> None:
         self.__size = val
+        if self.game.sprites is not None:
+            self.game.render_batch.itemconfigure(
+                self.__id, image=self.game.sprites.get("frame", val, "brown"))
+        self.mark_dirty()
+
+    @property
+    def extent(self) -> float:
+        return self.__size / 2
 
     def create(self) -> None:
+        sprites = self.game.sprites
+        if sprites is not None:
+            self.__id = self.canvas.create_image(
+                0, 0, image=sprites.get("frame", self.__size, "brown"))
+            return
         self.__id = self.canvas.create_rectangle(0, 0, 0, 0, outline="brown", width=2)
 
     def delete(self) -> None:
         self.canvas.delete(self.__id)
 
+    @property
+    def phase_call(self) -> Optional[int]:
+        """
+        Get the id of the pending phase change callback
+        """
+        return self.__phase_call
+
+    @property
+    def summon_call(self) -> Optional[int]:
+        """
+        Get the id of the pending summon callback
+        """
+        return self.__summon_call
+
+    def schedule_events(self) -> None:
+        """
+        Schedule the pending phase change and summon at phase_at and
+        summon_at, e.g., after the state of home has been restored
+        """
+        self.schedule_phase()
+        self.schedule_summon()
+
+    def schedule_phase(self) -> None:
+        """
+        Replace the pending phase change with the one due at phase_at
+        """
+        if self.__phase_call is not None:
+            self.game.cancel_call(self.__phase_call)
+            self.__phase_call = None
+        if self.phase_at:
+            if not self.second_phase:
+                event = self.enter_second_phase
+            elif not self.begin:
+                event = self.start_summoning
+            else:
+                event = self.start_chasing
+            self.__phase_call = self.game.call_at_tick(self.phase_at, event)
+
+    def schedule_summon(self) -> None:
+        """
+        Replace the pending summon with the one due at summon_at
+        """
+        if self.__summon_call is not None:
+            self.game.cancel_call(self.__summon_call)
+            self.__summon_call = None
+        if self.summon_at:
+            self.__summon_call = self.game.call_at_tick(self.summon_at, self.summon_enemy)
+
+    def __set_phase_event(self, ticks: int) -> None:
+        """
+        Schedule the next phase change the given number of steps from now, or
+        none if ticks is 0
+        """
+        self.phase_at = self.game.ticks + ticks if ticks else 0
+        self.schedule_phase()
+
     def update(self) -> None:
         # there is nothing to update, unless home is allowed to moved. Yes, I know.
-        player_x = self.game.player.x
-        player_y = self.game.player.y
-        direction = [player_x - self.x, player_y - self.y]
+        world = self.game.world
+        dx, dy = world.player_x - self.x, world.player_y - self.y
 
         # check the direction which way player approach
-        if not self.second_phase and -60 < direction[0] < 60 and -55 < direction[1] < 55:
-            if direction[1] > 0:
+        if not self.second_phase and -60 < dx < 60 and -55 < dy < 55:
+            if dy > 0:
                 self.y_speed = -8
-            elif direction[1] < 0:
+            elif dy < 0:
                 self.y_speed = 8
         # if player near in first phase surprise him
         if not self.second_phase and self.y_speed != 0:
             self.y += self.y_speed
-            self.intro = 1
-            self.time += self.intro
-        # animation begin second phase
-        if self.time % 40 == 0 and not self.second_phase:
-            self.y_speed = 0
-            self.x, self.y = 400, 250
-            self.time, self.intro = 1, 0
-
-            for delete_enemy in [FencingEnemy, RandomWalkEnemy, StalkerEnemy, ChasingEnemy]:
-                self.game.delete_all_enemy(delete_enemy)
-
-            self.second_phase = True
+            if not self.intro:
+                self.intro = 1
+                self.__set_phase_event(self.game.stage.home.intro_ticks)
 
         # running when user is near animation
-        if self.second_phase and -50 < direction[0] < 50 and -50 < direction[1] < 50 and not self.begin:
+        if self.second_phase and -50 < dx < 50 and -50 < dy < 50 and not self.begin:
             self.x_speed = 10
 
         # show second phase text
@@ -155,53 +357,62 @@ class Home(TurtleGameElement):
             self.x, self.y = -10, -10
             self.intro = 1
             self.second_phase_text()
+            # give time for player to read
+            self.__set_phase_event(self.game.stage.home.reading_ticks)
 
         self.x -= self.x_speed
 
-        # give time for player to read
-        self.time += self.intro
-        if self.time % 60 == 0 and not self.begin:
-            self.canvas.delete("intro")
-            self.time = 1
-            self.begin = True
-            self.summon_enemy()
-
-        if self.begin and self.time % 40 == 0:
-            self.summon_enemy()
-
-        # 10 second pass
-        if self.time % 210 == 0:
-            self.move = True
-
         if self.move:
             # move to player when 10 second has passed
-            if direction[0] > 0:
+            if dx > 0:
                 self.x += 20
-            elif direction[0] < 0:
+            elif dx < 0:
                 self.x -= 20
 
-            if direction[1] > 0:
+            if dy > 0:
                 self.y += 20
-            elif direction[1] < 0:
+            elif dy < 0:
                 self.y -= 20
 
+    def enter_second_phase(self) -> None:
+        """
+        Clear the enemies and move home to the middle of the playfield
+        """
+        self.y_speed = 0
+        self.x, self.y = 400, 250
+        self.intro = 0
+
+        for delete_enemy in [FencingEnemy, RandomWalkEnemy, StalkerEnemy, ChasingEnemy]:
+            self.game.delete_all_enemy(delete_enemy)
+
+        self.second_phase = True
+        self.__set_phase_event(0)
+
+    def start_summoning(self) -> None:
+        """
+        Hide the second phase text and start summoning enemies
+        """
+        self.canvas.delete("intro")
+        self.begin = True
+        self.summon_enemy()
+        # 10 second pass
+        self.__set_phase_event(self.game.stage.home.chase_after)
+
+    def start_chasing(self) -> None:
+        """
+        Start moving towards the player
+        """
+        self.move = True
+        self.__set_phase_event(0)
+
     def summon_enemy(self):
         """This code use for add enemy overtime during phase 2"""
 
-        color = ["#0B2447", "#19376D", "#576CBC", "#1C6758"]
-
         if self.begin:
-            for _ in range(4):
-                random_walk = RandomWalkEnemy(self.game, random.randint(15, 20), random.choice(color))
-                random_walk.x = random.randint(90, 600)
-                random_walk.y = random.randint(0, 500)
-                self.game.add_enemy(random_walk)
-
-            for _ in range(2):
-                teleporter = StalkerEnemy(self.game, 20, "purple", random.randrange(45, 85, 15))
-                teleporter.x = 650
-                teleporter.y = 200
-                self.game.add_enemy(teleporter)
+            for spec in self.game.stage.home.summon:
+                self.game.enemy_generator.spawn(spec)
+            self.summon_at = self.game.ticks + self.game.stage.home.summon_every
+            self.schedule_summon()
 
     def second_phase_text(self):
         """show introduction text"""
@@ -217,22 +428,15 @@ class Home(TurtleGameElement):
                                 text="Victory awaits if you can endure for 10 seconds!",
                                 font=font2, fill="black", tags="intro")
 
-    def hits_player(self):
-        """
-        Check whether the enemy is hitting the player
-        """
-        return (
-                (self.x - self.size / 2 < self.game.player.x < self.x + self.size / 2)
-                and
-                (self.y - self.size / 2 < self.game.player.y < self.y + self.size / 2)
-        )
-
     def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2)
+        if self.game.sprites is not None:
+            self.game.render_batch.coords(self.__id, self.x, self.y)
+            return
+        self.game.render_batch.coords(self.__id,
+                                      self.x - self.size / 2,
+                                      self.y - self.size / 2,
+                                      self.x + self.size / 2,
+                                      self.y + self.size / 2)
 
     def contains(self, x: float, y: float):
         """
@@ -245,26 +449,56 @@ class Home(TurtleGameElement):
 
 class Player(TurtleGameElement):
     """
-    Represent the main player, implemented using Python's turtle.
+    Represent the main player, drawn using Python's turtle.  The player keeps
+    its position and heading as plain floats and moves itself; the turtle is
+    only synchronized once per frame when rendering, and there is no turtle at
+    all in a headless game.  When the game renders sprites, the player is an
+    image item turned by swapping pre-rotated sprites, and no turtle is used.
     """
 
+    __slots__ = ("__speed", "__heading", "__turtle", "__item", "__image")
+
     def __init__(self,
                  game: "TurtleAdventureGame",
-                 turtle: RawTurtle,
+                 turtle: Optional["RawTurtle"] = None,
                  speed: float = 5):
         super().__init__(game)
         self.__speed: float = speed
-        self.__turtle: RawTurtle = turtle
+        self.__heading: float = 0
+        self.__turtle: Optional["RawTurtle"] = turtle
+        self.__item: Optional[int] = None
+        self.__image = None
+
+    @property
+    def extent(self) -> float:
+        # half the size of turtle's "turtle" shape
+        return 17
 
     def create(self) -> None:
-        turtle = RawTurtle(self.canvas)
-        turtle.getscreen().tracer(False)  # disable turtle's built-in animation
+        if self.game.is_headless:
+            self.__turtle = None
+            return
+        sprites = self.game.sprites
+        if sprites is not None:
+            self.__turtle = None
+            self.__image = sprites.turtle(self.heading)
+            self.__item = self.canvas.create_image(0, 0, image=self.__image)
+            return
+        if self.__turtle is None:
+            # pylint: disable=import-outside-toplevel
+            from turtle import RawTurtle
+            self.__turtle = RawTurtle(self.canvas)
+        turtle = self.__turtle
+        screen = turtle.getscreen()
+        screen.tracer(False)  # disable turtle's built-in animation
+        # set turtle screen's origin to the top-left corner; this resets the
+        # turtle, so it is styled afterwards
+        screen.setworldcoordinates(0, self.game.screen_height - 1,
+                                   self.game.screen_width - 1, 0)
         turtle.shape("turtle")
         turtle.color("green")
         turtle.penup()
 
-        self.__turtle = turtle
-
     @property
     def speed(self) -> float:
         """
@@ -274,7 +508,24 @@ class Player(TurtleGameElement):
 
     @speed.setter
     def speed(self, val: float) -> None:
-        self.__speed = val
+        if val != self.__speed:
+            self.__speed = val
+            # the planned path steps at the old speed
+            self.game.waypoint.replan()
+
+    @property
+    def heading(self) -> float:
+        """
+        Get or set the player's heading in degrees, as turtle.heading() would
+        report it
+        """
+        return self.__heading
+
+    @heading.setter
+    def heading(self, val: float) -> None:
+        if val != self.__heading:
+            self.__heading = val
+            self.mark_dirty()
 
     def delete(self) -> None:
         pass
@@ -283,44 +534,114 @@ class Player(TurtleGameElement):
         # check if player has arrived home
         if self.game.home.contains(self.x, self.y) and self.game.home.second_phase:
             self.game.game_over_win()
-        turtle = self.__turtle
         waypoint = self.game.waypoint
-        if self.game.waypoint.is_active:
-            turtle.setheading(turtle.towards(waypoint.x, waypoint.y))
-            turtle.forward(self.speed)
-            if turtle.distance(waypoint.x, waypoint.y) < self.speed:
-                waypoint.deactivate()
+        if waypoint.is_active and self.__speed > 0:
+            self.__follow(waypoint)
+        self.game.world.refresh(self, waypoint)
+
+    def __follow(self, waypoint: Waypoint) -> None:
+        """
+        Take the next step along the planned path, landing exactly on the
+        waypoint at the end of a segment
+        """
+        self.heading = waypoint.heading
+        if waypoint.steps_left > 1:
+            self.x += waypoint.step_x
+            self.y += waypoint.step_y
+        else:
+            self.x, self.y = waypoint.x, waypoint.y
+        waypoint.advance()
 
     def render(self) -> None:
-        self.__turtle.goto(self.x, self.y)
-        self.__turtle.getscreen().update()
+        sprites = self.game.sprites
+        if sprites is not None:
+            batch = self.game.render_batch
+            image = sprites.turtle(self.heading)
+            if image is not self.__image:
+                self.__image = image
+                batch.itemconfigure(self.__item, image=image)
+            batch.coords(self.__item, self.x, self.y)
+            return
+        turtle = self.__turtle
+        if turtle is None:
+            return
+        turtle.setheading(self.heading)
+        turtle.goto(self.x, self.y)
+        turtle.getscreen().update()
 
-    # override original property x's getter/setter to use turtle's methods
-    # instead
-    @property
-    def x(self) -> float:
-        return self.__turtle.xcor()
 
-    @x.setter
-    def x(self, val: float) -> None:
-        self.__turtle.setx(val)
+class WorldContext:
+    """
+    The state of the world enemies react to, computed once per simulation
+    step right after the player has moved: the player's position, velocity
+    per step and heading, and the offset from the player to the waypoint.
+    Elements updated before the player see the previous step's values.
+    Enemies read these instead of querying the player and the waypoint, so
+    their own work is plain arithmetic.
+    """
 
-    # override original property y's getter/setter to use turtle's methods
-    # instead
-    @property
-    def y(self) -> float:
-        return self.__turtle.ycor()
+    __slots__ = ("player_x", "player_y", "velocity_x", "velocity_y", "heading",
+                 "waypoint_dx", "waypoint_dy", "waypoint_active")
 
-    @y.setter
-    def y(self, val: float) -> None:
-        self.__turtle.sety(val)
+    def __init__(self):
+        self.player_x: float = 0
+        self.player_y: float = 0
+        self.velocity_x: float = 0
+        self.velocity_y: float = 0
+        self.heading: float = 0
+        self.waypoint_dx: float = 0
+        self.waypoint_dy: float = 0
+        self.waypoint_active: bool = False
+
+    def refresh(self, player: Player, waypoint: Waypoint) -> None:
+        """
+        Take the state of the player and the waypoint after a step
+        """
+        x, y = player.x, player.y
+        self.velocity_x, self.velocity_y = x - self.player_x, y - self.player_y
+        self.player_x, self.player_y = x, y
+        self.heading = player.heading
+        self.waypoint_dx, self.waypoint_dy = waypoint.x - x, waypoint.y - y
+        self.waypoint_active = waypoint.is_active
+
+    def reset(self, player: Player, waypoint: Waypoint) -> None:
+        """
+        Take the state of the player and the waypoint, with the player
+        standing still, e.g., after the player has been placed
+        """
+        self.refresh(player, waypoint)
+        self.velocity_x = self.velocity_y = 0
+
+    def predict(self, ticks: int) -> tuple[float, float]:
+        """
+        Predict where the player will be after the given number of steps if
+        it keeps its current velocity
+        """
+        return (self.player_x + self.velocity_x * ticks,
+                self.player_y + self.velocity_y * ticks)
 
 
 class Enemy(TurtleGameElement):
     """
-    Define an abstract enemy for the Turtle's adventure game
+    Define an abstract enemy for the Turtle's adventure game.  An enemy
+    attached to an EnemyBatch is a view of its batch slot: x and y read and
+    write the batch's arrays, and the batch updates it.  Any other enemy
+    keeps its cell of the game's collision grid up to date as it moves.
     """
 
+    __slots__ = ("__size", "__color", "__batch", "__slot", "__item", "__timer",
+                 "__grid", "__cell")
+
+    # names of the attributes holding the enemy's mutable state, besides its
+    # position, e.g., for saving and restoring the game state
+    state_fields: tuple[str, ...] = ()
+
+    # shape and fill of the enemy's sprite; a fill of None uses its color
+    sprite_shape: str = "oval"
+    sprite_fill: Optional[str] = None
+
+    despawnable = True
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int,
@@ -328,6 +649,84 @@ class Enemy(TurtleGameElement):
         super().__init__(game)
         self.__size = size
         self.__color = color
+        self.__batch = None
+        self.__slot: int = -1
+        self.__item: Optional[int] = None
+        self.__timer: Optional[int] = None
+        self.__grid: Optional[SpatialGrid] = None
+        # the bounds of the enemy's grid cell, as (x1, y1, x2, y2)
+        self.__cell: Optional[tuple[float, float, float, float]] = None
+
+    @property
+    def x(self) -> float:
+        if self.__batch is None:
+            return _get_x(self)
+        return float(self.__batch.xs[self.__slot])
+
+    @x.setter
+    def x(self, val: float) -> None:
+        if self.__batch is None:
+            _set_x(self, val)
+            cell = self.__cell
+            if cell is not None and not cell[0] <= val < cell[2]:
+                self.__cell = self.__grid.move(self)
+        else:
+            self.__batch.xs[self.__slot] = val
+
+    @property
+    def y(self) -> float:
+        if self.__batch is None:
+            return _get_y(self)
+        return float(self.__batch.ys[self.__slot])
+
+    @y.setter
+    def y(self, val: float) -> None:
+        if self.__batch is None:
+            _set_y(self, val)
+            cell = self.__cell
+            if cell is not None and not cell[1] <= val < cell[3]:
+                self.__cell = self.__grid.move(self)
+        else:
+            self.__batch.ys[self.__slot] = val
+
+    @property
+    def batch(self):
+        """
+        Get the EnemyBatch storing this enemy's state, or None when the enemy
+        updates itself
+        """
+        return self.__batch
+
+    @property
+    def slot(self) -> int:
+        """
+        Get the index of this enemy within its batch
+        """
+        return self.__slot
+
+    def enter_grid(self, grid: SpatialGrid) -> None:
+        """
+        Put this enemy into the collision grid, which it then keeps up to
+        date whenever it moves into another cell
+        """
+        self.__grid = grid
+        self.__cell = grid.insert(self)
+
+    def leave_grid(self) -> None:
+        """
+        Take this enemy out of its collision grid
+        """
+        if self.__grid is not None:
+            self.__grid.remove(self)
+            self.__grid = self.__cell = None
+
+    def bind_batch(self, batch, slot: int) -> None:
+        """
+        Make this enemy a view of the given batch slot, or detach it when
+        batch is None
+        """
+        self.__batch = batch
+        self.__slot = slot
 
     @property
     def size(self) -> float:
@@ -343,71 +742,154 @@ class Enemy(TurtleGameElement):
         """
         return self.__color
 
-    def hits_player(self):
+    @property
+    def extent(self) -> float:
+        return self.__size / 2
+
+    @property
+    def item(self) -> Optional[int]:
         """
-        Check whether the enemy is hitting the player
+        Get or set the id of the canvas item representing the enemy
         """
-        return (
-                (self.x - self.size / 2 < self.game.player.x < self.x + self.size / 2)
-                and
-                (self.y - self.size / 2 < self.game.player.y < self.y + self.size / 2)
-        )
+        return self.__item
+
+    @item.setter
+    def item(self, val: Optional[int]) -> None:
+        self.__item = val
+
+    @abstractmethod
+    def create_item(self) -> int:
+        """
+        Create a new canvas item representing the enemy, and return its id
+        """
+
+    def sprite(self):
+        """
+        Get the enemy's sprite from the game's sprite cache
+        """
+        return self.game.sprites.get(self.sprite_shape, self.size,
+                                     self.sprite_fill or self.color)
+
+    def create(self) -> None:
+        sprites = self.game.sprites
+        if self.__item is None:
+            if sprites is None:
+                self.__item = self.create_item()
+            else:
+                self.__item = self.canvas.create_image(0, 0, image=self.sprite())
+        elif self.game.is_headless:
+            # a recycled item of a headless game has nothing to show, and
+            # nothing would ever flush the render batch
+            pass
+        elif sprites is None:
+            # a canvas item recycled from the game's enemy pool, colored like
+            # create_item() colors a new one
+            self.game.render_batch.itemconfigure(self.__item, state="normal",
+                                                 fill=self.sprite_fill or self.color)
+        else:
+            self.game.render_batch.itemconfigure(self.__item, state="normal",
+                                                 image=self.sprite())
+        self.mark_dirty()
+        if self.__batch is None:
+            self.schedule_events()
+
+    @property
+    def timer_call(self) -> Optional[int]:
+        """
+        Get the id of the enemy's pending timed event callback
+        """
+        return self.__timer
+
+    def schedule_events(self) -> None:
+        """
+        Schedule the enemy's next timed event, if it has any; called when
+        the enemy enters the game as an element of its own
+        """
+
+    def set_timer(self, tick: int, func: Callable) -> None:
+        """
+        Call func at the start of the given simulation step, replacing the
+        enemy's pending timed event
+        """
+        if self.__timer is not None:
+            self.game.cancel_call(self.__timer)
+        self.__timer = self.game.call_at_tick(tick, func)
+
+    def render(self) -> None:
+        if self.game.sprites is not None:
+            self.game.render_batch.coords(self.__item, self.x, self.y)
+            return
+        self.game.render_batch.coords(self.__item,
+                                      self.x - self.size / 2,
+                                      self.y - self.size / 2,
+                                      self.x + self.size / 2,
+                                      self.y + self.size / 2)
+
+    def delete(self) -> None:
+        if self.__timer is not None:
+            self.game.cancel_call(self.__timer)
+            self.__timer = None
+        self.game.enemy_pool.retire(self)
 
     def hit_wall(self) -> bool:
-        return self.x < 10 or self.x > 790 or self.y < 10 or self.y > 490
+        """
+        Check whether the enemy is within 10 pixels of the screen's edges
+        """
+        game = self.game
+        return (self.x < 10 or self.x > game.screen_width - 10
+                or self.y < 10 or self.y > game.screen_height - 10)
 
 
 # * Define your enemy classes
-# * Implement all methods required by the GameElement abstract class
+# * Implement create_item() to create the enemy's canvas item; rendering and
+#   deletion are shared by all enemies through the Enemy class
 # * Define enemy's update logic in the update() method
-# * Check whether the player hits this enemy, then call the
-#   self.game.game_over_lose() method in the TurtleAdventureGame class.
+# * Hitting the player is detected by TurtleAdventureGame's collision grid,
+#   which calls self.game.on_collision() instead of every enemy checking it.
 
 class RandomWalkEnemy(Enemy):
     """
     Random walking enemy
     """
 
+    __slots__ = ("turn_at", "update_x", "update_y")
+    state_fields = __slots__
+
+    # simulation steps between two changes of direction
+    turn_every: int = 30
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int,
                  color: str):
         super().__init__(game, size, color)
-        self.__id = None
-        self.time = 0
-        self.update_x = random.randint(-1, 1)
-        self.update_y = random.randint(-1, 1)
+        self.turn_at = game.ticks + self.turn_every
+        self.update_x = self.game.rng.randint(-1, 1)
+        self.update_y = self.game.rng.randint(-1, 1)
 
-    def create(self) -> None:
-        self.__id = self.canvas.create_oval(0, 0, 0, 0, fill=self.color, outline="black")
+    def create_item(self) -> int:
+        return self.canvas.create_oval(0, 0, 0, 0, fill=self.color, outline="black")
 
-    def update(self) -> None:
-        self.time += 1
+    def schedule_events(self) -> None:
+        self.set_timer(self.turn_at, self.turn)
 
-        if self.time % 30 == 0:
-            self.update_x = random.randint(-3, 3)
-            self.update_y = random.randint(-3, 3)
+    def turn(self) -> None:
+        """
+        Pick a new random direction
+        """
+        self.update_x = self.game.rng.randint(-3, 3)
+        self.update_y = self.game.rng.randint(-3, 3)
+        self.turn_at = self.game.ticks + self.turn_every
+        self.set_timer(self.turn_at, self.turn)
 
+    def update(self) -> None:
         self.x += self.update_x
         self.y += self.update_y
-        if self.hits_player():
-            self.game.game_over_lose()
-
         if self.hit_wall():
-            self.time = 0
             self.update_x *= -1
             self.update_y *= -1
-
-    def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2,
-                           )
-
-    def delete(self) -> None:
-        self.canvas.delete(self.__id)
+            self.turn_at = self.game.ticks + self.turn_every
+            self.set_timer(self.turn_at, self.turn)
 
 
 class ChasingEnemy(Enemy):
@@ -415,79 +897,71 @@ class ChasingEnemy(Enemy):
     Chasing enemy
     """
 
+    __slots__ = ("time", "speed", "update_x", "update_y")
+    state_fields = __slots__
+    sprite_shape = "box"
+    sprite_fill = "red"
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int,
                  color: str):
         super().__init__(game, size, color)
-        self.__id = None
         self.time = 0
         self.speed = 0
-        self.update_x = random.randint(-1, 1)
-        self.update_y = random.randint(-1, 1)
+        self.update_x = self.game.rng.randint(-1, 1)
+        self.update_y = self.game.rng.randint(-1, 1)
 
-    def create(self) -> None:
-        self.__id = self.canvas.create_rectangle(0, 0, 0, 0, outline="black", fill="red", width=2)
+    def create_item(self) -> int:
+        return self.canvas.create_rectangle(0, 0, 0, 0, outline="black", fill="red", width=2)
 
     def update(self) -> None:
-        player_x = self.game.player.x
-        player_y = self.game.player.y
-        direction = [player_x - self.x, player_y - self.y]
+        world = self.game.world
+        dx, dy = world.player_x - self.x, world.player_y - self.y
 
-        if direction[0] > 100 or direction[0] < -100:
+        if dx > 100 or dx < -100:
             self.speed = 6
         else:
             self.speed = 3
 
-        if direction[0] > 0 > self.speed:
+        if dx > 0 > self.speed:
             self.speed *= -1
 
-        elif direction[0] < 0 < self.speed:
+        elif dx < 0 < self.speed:
             self.speed *= -1
 
         self.x += self.speed
 
-        if direction[1] > 0:
+        if dy > 0:
             self.y += 3
-        elif direction[1] < 0:
+        elif dy < 0:
             self.y -= 3
 
-        if self.hits_player():
-            self.game.game_over_lose()
-
         if self.hit_wall():
             self.time = 0
             self.update_x *= -1
             self.update_y *= -1
 
-    def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2,
-                           )
-
-    def delete(self) -> None:
-        self.canvas.delete(self.__id)
-
 
 class FencingEnemy(Enemy):
     """
     This enemy will move around finish point in square shape
     """
 
+    __slots__ = ("x_speed", "y_speed")
+    state_fields = __slots__
+    sprite_fill = "blue"
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int,
                  color: str):
         super().__init__(game, size, color)
-        self.__id = None
         self.x_speed = -3
         self.y_speed = 0
 
-    def create(self) -> None:
-        self.__id = self.canvas.create_oval(0, 0, 0, 0, fill="blue")
+    def create_item(self) -> int:
+        return self.canvas.create_oval(0, 0, 0, 0, fill="blue")
 
     def update(self) -> None:
 
@@ -508,20 +982,6 @@ class FencingEnemy(Enemy):
         self.x += self.x_speed
         self.y += self.y_speed
 
-        if self.hits_player():
-            self.game.game_over_lose()
-
-    def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2,
-                           )
-
-    def delete(self) -> None:
-        self.canvas.delete(self.__id)
-
 
 class StalkerEnemy(Enemy):
     """
@@ -529,83 +989,207 @@ class StalkerEnemy(Enemy):
     This enemy will teleport to in front of the player then run toward to player.
     """
 
+    __slots__ = ("teleport_at", "speed", "teleport", "timer", "__teleport_due")
+    state_fields = ("teleport_at", "speed", "teleport", "timer")
+    sprite_shape = "box"
+    sprite_fill = "purple"
+
+    # steps ahead of the player's current course to teleport to; 0 teleports
+    # in front of where the player is now
+    lead_ticks: int = 0
+
     def __init__(self,
                  game: "TurtleAdventureGame",
                  size: int,
                  color: str,
                  timer: int):
         super().__init__(game, size, color)
-        self.__id = None
-        self.time = 0
+        self.teleport_at = game.ticks + 1
         self.speed = 2
         self.teleport = 150
         self.timer = timer
+        self.__teleport_due: bool = False
 
-    def create(self) -> None:
-        self.__id = self.canvas.create_rectangle(0, 0, 0, 0, outline="black", fill="purple", width=2)
+    def create_item(self) -> int:
+        return self.canvas.create_rectangle(0, 0, 0, 0, outline="black", fill="purple", width=2)
 
-    def update(self) -> None:
+    def schedule_events(self) -> None:
+        self.set_timer(self.teleport_at, self.teleport_soon)
+
+    def teleport_soon(self) -> None:
+        """
+        Teleport at this step's update, once the player has moved, like the
+        batched stalkers do
+        """
+        self.__teleport_due = True
 
-        if self.game.waypoint.x - self.game.player.x > 0:
+    def teleport_to_player(self) -> None:
+        """
+        Appear in front of the player, then wait for the next teleport
+        """
+        self.__teleport_due = False
+        world = self.game.world
+        if world.waypoint_dx > 0:
             self.teleport = 100
         else:
             self.teleport = -85
+        target_x, target_y = world.predict(self.lead_ticks)
+        self.x = target_x + self.teleport
+        self.y = target_y
+        self.teleport_at = self.game.ticks + self.timer
+        self.set_timer(self.teleport_at, self.teleport_soon)
 
-        # teleport to player
-        if self.time % self.timer == 0:
-            self.x = self.game.player.x + self.teleport
-            self.y = self.game.player.y
-        self.time += 1
-
-        direction = [self.game.player.x - self.x, self.game.player.y - self.y]
+    def update(self) -> None:
+        if self.__teleport_due:
+            self.teleport_to_player()
+        world = self.game.world
+        dx, dy = world.player_x - self.x, world.player_y - self.y
 
-        if direction[0] > 0 > self.speed:
+        if dx > 0 > self.speed:
             self.speed *= -1
 
-        elif direction[0] < 0 < self.speed:
+        elif dx < 0 < self.speed:
             self.speed *= -1
 
         self.x += self.speed
 
-        if direction[1] > 0:
+        if dy > 0:
             self.y += 2
-        elif direction[1] < 0:
+        elif dy < 0:
             self.y -= 2
 
-        if self.hits_player():
-            self.game.game_over_lose()
 
-    def render(self) -> None:
-        self.canvas.coords(self.__id,
-                           self.x - self.size / 2,
-                           self.y - self.size / 2,
-                           self.x + self.size / 2,
-                           self.y + self.size / 2,
-                           )
+class EnemyPool:
+    """
+    Keep the canvas items of retired enemies, hidden, so that new enemies of
+    the same kind reuse them instead of creating new items.  Optionally cap
+    the number of live enemies in the game.
+    """
 
-    def delete(self) -> None:
-        self.canvas.delete(self.__id)
+    def __init__(self,
+                 game: "TurtleAdventureGame",
+                 max_live: Optional[int] = None,
+                 max_pooled: int = 256):
+        self.__game: "TurtleAdventureGame" = game
+        self.__max_live: Optional[int] = max_live
+        self.__max_pooled: int = max_pooled
+        self.__items: dict[type, list[int]] = {}
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__rejected: int = 0
+
+    @property
+    def max_live(self) -> Optional[int]:
+        """
+        Get or set the maximum number of live enemies, or None for no limit
+        """
+        return self.__max_live
+
+    @max_live.setter
+    def max_live(self, val: Optional[int]) -> None:
+        self.__max_live = val
+
+    @property
+    def hits(self) -> int:
+        """
+        Get the number of enemies that reused a pooled canvas item
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Get the number of enemies that needed a new canvas item
+        """
+        return self.__misses
+
+    @property
+    def rejected(self) -> int:
+        """
+        Get the number of enemies refused because of the live enemy cap
+        """
+        return self.__rejected
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.__items.values())
+
+    def acquire(self, enemy: Enemy) -> bool:
+        """
+        Hand a pooled canvas item of the same kind to a new enemy, if there is
+        one.  Return False if the live enemy cap does not admit the enemy.
+        """
+        if self.__max_live is not None and len(self.__game.enemies) >= self.__max_live:
+            self.__rejected += 1
+            return False
+        items = self.__items.get(type(enemy))
+        if items:
+            enemy.item = items.pop()
+            self.__hits += 1
+        else:
+            self.__misses += 1
+        return True
+
+    def retire(self, enemy: Enemy) -> None:
+        """
+        Hide the canvas item of a removed enemy and keep it for reuse
+        """
+        if enemy.item is None:
+            return
+        items = self.__items.setdefault(type(enemy), [])
+        if len(items) < self.__max_pooled:
+            if not self.__game.is_headless:
+                self.__game.render_batch.itemconfigure(enemy.item, state="hidden")
+            items.append(enemy.item)
+        else:
+            self.__game.canvas.delete(enemy.item)
+        enemy.item = None
+
+
+# enemy classes by their kind names in stage files
+SPAWN_KINDS: dict[str, type] = {
+    "random_walk": RandomWalkEnemy,
+    "chasing": ChasingEnemy,
+    "fencing": FencingEnemy,
+    "stalker": StalkerEnemy,
+}
+# enemy classes in the order of their kind codes, e.g., in snapshots and in
+# the observations of adventure_env
+ENEMY_KINDS: Final[tuple[type, ...]] = (RandomWalkEnemy, ChasingEnemy,
+                                        FencingEnemy, StalkerEnemy)
+# the values of TurtleAdventureGame.outcome in the order of their codes
+OUTCOMES: Final = (None, "win", "lose")
+# the size of the playfield the game is designed for
+SCREEN_WIDTH: Final = 800
+SCREEN_HEIGHT: Final = 500
 
 
 # Complete the EnemyGenerator class by inserting code to generate enemies
 # based on the given game level; call TurtleAdventureGame's add_enemy() method
 # to add enemies to the game at certain points in time.
 #
-# Hint: the 'game' parameter is a tkinter's frame, so it's after()
-# method can be used to schedule some future events.
+# Hint: the 'game' parameter schedules future events on the simulation clock
+# with call_later() or call_at_tick(); its after() method does the same, so
+# the events keep their timing in headless games and replays.
 
 class EnemyGenerator:
     """
     An EnemyGenerator instance is responsible for creating enemies of various
-    kinds and scheduling them to appear at certain points in time.
+    kinds and scheduling them to appear at certain points in time.  The
+    enemies and their times come from the waves of the game's stage; only the
+    next wave is scheduled at a time.
     """
 
     def __init__(self, game: "TurtleAdventureGame", level: int):
         self.__game: TurtleAdventureGame = game
         self.__level: int = level
+        self.__wave: int = 0
+        self.__call: Optional[int] = None
 
-        # example
-        self.__game.after(100, self.create_enemy)
+        stage = game.stage
+        for spec in [spec for wave in stage.waves for spec in wave.spawns] + stage.home.summon:
+            if spec.kind not in SPAWN_KINDS:
+                raise ValueError(f"unknown enemy kind in stage {stage.name}: {spec.kind}")
+        self.schedule()
 
     @property
     def game(self) -> "TurtleAdventureGame":
@@ -621,95 +1205,236 @@ class EnemyGenerator:
         """
         return self.__level
 
-    def create_enemy(self) -> None:
+    @property
+    def wave(self) -> int:
         """
-        Create a new enemy, possibly based on the game level
+        Get or set the index of the next wave to be spawned
         """
-        color = ["#0B2447", "#19376D", "#576CBC", "#1C6758"]
-
-        chaser_1 = ChasingEnemy(self.__game, 20, "red")
-        chaser_1.x, chaser_1.y = 200, 100
-
-        self.game.add_enemy(chaser_1)
+        return self.__wave
 
-        chaser_2 = ChasingEnemy(self.__game, 20, "red")
-        chaser_2.x, chaser_2.y = 400, 400
+    @wave.setter
+    def wave(self, val: int) -> None:
+        self.__wave = val
 
-        self.game.add_enemy(chaser_2)
-
-        # create enemy depend on level difficulty
-        for _ in range((self.level * 10) - 5):
-            random_walk = RandomWalkEnemy(self.__game, random.randint(15, 20), random.choice(color))
-            random_walk.x = random.randint(90, 600)
-            random_walk.y = random.randint(0, 500)
-            self.game.add_enemy(random_walk)
-
-        shield_locate = [(-50, -50), (-50, 50), (50, -50), (50, 52)]
-        for i in range(4):
-            square_walk = FencingEnemy(self.__game, 20, "blue")
-            square_walk.x = self.game.home.x + shield_locate[i][0]
-            square_walk.y = self.game.home.y + shield_locate[i][1]
-            self.game.add_enemy(square_walk)
-
-        teleporter = StalkerEnemy(self.__game, 20, "purple", 40)
-        teleporter.x, teleporter.y = 650, 200
+    @property
+    def call(self) -> Optional[int]:
+        """
+        Get the id of the callback spawning the next wave
+        """
+        return self.__call
 
-        self.game.add_enemy(teleporter)
+    def schedule(self) -> None:
+        """
+        Schedule the next wave, if any is left, at its time
+        """
+        if self.__call is not None:
+            self.__game.cancel_call(self.__call)
+            self.__call = None
+        waves = self.__game.stage.waves
+        if self.__wave < len(waves):
+            self.__call = self.__game.call_later(
+                max(waves[self.__wave].time - self.__game.clock, 0), self.create_enemy)
 
+    def create_enemy(self) -> None:
+        """
+        Create the enemies of the next wave, based on the game level
+        """
+        wave = self.__game.stage.waves[self.__wave]
+        self.__wave += 1
+        for spec in wave.spawns:
+            self.spawn(spec)
+        self.schedule()
 
-class TurtleAdventureGame(Game):  # pylint: disable=too-many-ancestors
+    def spawn(self, spec: SpawnSpec) -> None:
+        """
+        Create a group of enemies described by the stage and add them to the
+        game
+        """
+        game = self.__game
+        rng = game.rng
+        kind = SPAWN_KINDS[spec.kind]
+        origin_x, origin_y = (game.home.x, game.home.y) if spec.around == "home" else (0, 0)
+        for i in range(spec.count(self.level)):
+            size, color = spec.size(rng), spec.color(rng)
+            if spec.timer is None:
+                enemy = kind(game, size, color)
+            else:
+                enemy = kind(game, size, color, spec.timer(rng))
+            if spec.positions is None:
+                x, y = spec.x(rng), spec.y(rng)
+            else:
+                x, y = spec.positions[i]
+            enemy.x, enemy.y = origin_x + x, origin_y + y
+            game.add_enemy(enemy)
+
+
+class TurtleAdventureGame(Game):
     """
-    The main class for Turtle's Adventure.
+    The main class for Turtle's Adventure.  Pass None as the parent to run
+    the game headless, e.g., for simulations.  Waypoint clicks go through
+    click(), which also records them to input_log when one is attached;
+    shift-clicks queue waypoints after the current one.  fixed_step and
+    max_updates_per_tick select Game's fixed-step loop.
+    The enemy waves and home's timings come from a stage file, see
+    level_loader.
     """
 
-    # pylint: disable=too-many-instance-attributes
-    def __init__(self, parent, screen_width: int, screen_height: int, level: int = 1):
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+    def __init__(self, parent, screen_width: int, screen_height: int, level: int = 1,
+                 batched: bool = False, max_enemies: Optional[int] = None,
+                 seed: Optional[int] = None, stage: str = "default",
+                 sprites: bool = False, despawn_margin: Optional[float] = None,
+                 batch_group=None, fixed_step: bool = False,
+                 max_updates_per_tick: int = 5):
         self.level: int = level
+        self.__use_sprites: bool = sprites
+        self.sprites = None
+        self.stage_name: str = stage
+        self.stage: Stage = load_stage(stage)
+        # a group of enemy batches shared with other games implies batching
+        self.batched: bool = batched or batch_group is not None
+        self.__batch_group = batch_group
+        self.enemy_batches = None
         self.screen_width: int = screen_width
         self.screen_height: int = screen_height
         self.waypoint: Waypoint
         self.player: Player
         self.home: Home
-        self.enemies: list[Enemy] = []
+        self.enemies = ElementRegistry()
+        self.world = WorldContext()
         self.enemy_generator: EnemyGenerator
-        super().__init__(parent)
+        # the enemies that update themselves, bucketed by position as they move
+        # so that only those near the player are tested after every step;
+        # batched enemies are tested by their batches
+        self.collision_grid = SpatialGrid(screen_width, screen_height)
+        self.enemy_pool = EnemyPool(self, max_live=max_enemies)
+        self.__largest_enemy: float = 0
+        self.input_log = None
+        self.outcome: Optional[str] = None
+        super().__init__(parent, fixed_step=fixed_step,
+                         max_updates_per_tick=max_updates_per_tick, seed=seed)
+        self.despawn_margin = despawn_margin
 
     def init_game(self):
         self.canvas.config(width=self.screen_width, height=self.screen_height)
-        turtle = RawTurtle(self.canvas)
-        # set turtle screen's origin to the top-left corner
-        turtle.screen.setworldcoordinates(0, self.screen_height - 1, self.screen_width - 1, 0)
+        self.set_viewport(0, 0, self.screen_width, self.screen_height)
+        if self.__use_sprites and not self.is_headless:
+            # pylint: disable=import-outside-toplevel
+            from sprites import SpriteCache, turtle_keys
+            self.sprites = SpriteCache(self.canvas)
+            self.sprites.preload(turtle_keys() + self.sprite_keys())
 
         self.waypoint = Waypoint(self)
         self.add_element(self.waypoint)
         self.home = Home(self, (self.screen_width - 100, self.screen_height // 2), 20)
         self.add_element(self.home)
-        self.player = Player(self, turtle)
+        self.player = Player(self)
         self.add_element(self.player)
-        self.canvas.bind("<Button-1>", lambda e: self.waypoint.activate(e.x, e.y))
+        if self.batched:
+            # pylint: disable=import-outside-toplevel
+            from enemy_batch import EnemyBatchManager
+            self.enemy_batches = EnemyBatchManager(self, seed=self.rng.getrandbits(64),
+                                                   group=self.__batch_group)
+            self.add_element(self.enemy_batches)
+        self.canvas.bind("<Button-1>", lambda e: self.click(e.x, e.y))
+        self.canvas.bind("<Shift-Button-1>", lambda e: self.click(e.x, e.y, append=True))
 
         self.enemy_generator = EnemyGenerator(self, level=self.level)
 
         self.player.x = 50
         self.player.y = self.screen_height // 2
+        self.world.reset(self.player, self.waypoint)
 
-    def add_enemy(self, enemy: Enemy) -> None:
+    def sprite_keys(self) -> list[tuple[str, int, str]]:
+        """
+        List the sprites of the enemies the stage can spawn
+        """
+        keys = []
+        stage = self.stage
+        for spec in [spec for wave in stage.waves for spec in wave.spawns] + stage.home.summon:
+            kind = SPAWN_KINDS[spec.kind]
+            colors = [kind.sprite_fill] if kind.sprite_fill else spec.colors
+            keys += [(kind.sprite_shape, size, color)
+                     for size in spec.sizes for color in colors]
+        return list(dict.fromkeys(keys))
+
+    def click(self, x: float, y: float, append: bool = False) -> None:
+        """
+        Handle a click on the playfield by moving the waypoint there, or with
+        append, e.g., on a shift-click, by queueing a waypoint there
+        """
+        if self.input_log is not None:
+            self.input_log.add(self.ticks, x, y, append)
+        if append:
+            self.waypoint.append(x, y)
+        else:
+            self.waypoint.activate(x, y)
+
+    def add_enemy(self, enemy: Enemy) -> bool:
+        """
+        Add a new enemy into the current game, reusing a pooled canvas item
+        when possible.  Return False if the enemy cap refused the enemy.
+        """
+        if not self.enemy_pool.acquire(enemy):
+            return False
+        self.enemies.add(enemy)
+        if self.enemy_batches is not None and self.enemy_batches.supports(enemy):
+            self.enemy_batches.add(enemy)
+        else:
+            self.add_element(enemy)
+            enemy.enter_grid(self.collision_grid)
+            self.__largest_enemy = max(self.__largest_enemy, enemy.size)
+        return True
+
+    def remove_enemy(self, enemy: Enemy) -> None:
+        """
+        Remove an enemy from the current game
+        """
+        if enemy.batch is not None:
+            self.enemy_batches.remove(enemy)
+        else:
+            enemy.leave_grid()
+            self.delete_element(enemy)
+        self.enemies.remove(enemy)
+
+    def despawn_candidates(self) -> list[Enemy]:
+        return list(self.enemies)
+
+    def despawn(self, element: Enemy) -> None:
+        self.remove_enemy(element)
+
+    def post_update(self) -> None:
+        """
+        Detect enemies hitting the player, looking only at the collision grid
+        cells the largest enemy could reach the player from
+        """
+        player_x, player_y = self.player.x, self.player.y
+        reach = self.__largest_enemy / 2
+        for enemy in self.collision_grid.query(player_x - reach, player_y - reach,
+                                               player_x + reach, player_y + reach):
+            if box_hits(enemy.x, enemy.y, enemy.size, player_x, player_y):
+                self.on_collision(enemy)
+                return
+
+    def on_collision(self, enemy: Enemy) -> None:
         """
-        Add a new enemy into the current game
+        Called when an enemy hits the player; the player loses the game
         """
-        self.enemies.append(enemy)
-        self.add_element(enemy)
+        self.game_over_lose()
 
-    def delete_all_enemy(self, enemy: Enemy):
+    def delete_all_enemy(self, enemy: type):
         """delete all of the enemy of that specific type"""
-        for remove in [i for i in self.enemies if isinstance(i, enemy)]:
-            self.delete_element(remove)
-            self.enemies.remove(remove)
+        self.enemies.remove_type(enemy)
+        if self.enemy_batches is not None:
+            self.enemy_batches.remove_type(enemy)
+        for remove in self.delete_elements_of_type(enemy):
+            remove.leave_grid()
 
     def game_over_win(self) -> None:
         """
         Called when the player wins the game and stop the game
         """
+        self.outcome = "win"
         self.stop()
         font = ("Arial", 36, "bold")
         self.canvas.create_text(self.screen_width / 2,
@@ -722,6 +1447,7 @@ class TurtleAdventureGame(Game):  # pylint: disable=too-many-ancestors
         """
         Called when the player loses the game and stop the game
         """
+        self.outcome = "lose"
         self.stop()
         font = ("Arial", 36, "bold")
         self.canvas.create_text(self.screen_width / 2,